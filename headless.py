@@ -0,0 +1,71 @@
+import argparse
+import random
+import time
+from src.game import HeadlessSimulation, EventStats, TraceRecorder, TracePlayer
+from src.game.replay import ReplayKeys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the mining simulation without a display.")
+    parser.add_argument("--ticks", type=int, default=None, help="stop after this many simulation ticks")
+    parser.add_argument("--caves", type=int, default=None, help="stop after this many cleared caves")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tick-rate", type=int, default=60)
+    parser.add_argument("--grid-size", type=int, default=None)
+    parser.add_argument("--miners", type=int, default=3, help="miners of every type")
+    parser.add_argument("--engine", choices=HeadlessSimulation.ENGINES, default="scheduler",
+                        help="what drives the miners: the event scheduler, the column engine or polling every miner")
+    parser.add_argument("--event-stats", metavar="FILE", help="count game events and time their handlers, written to FILE")
+    parser.add_argument("--record", metavar="TRACE", help="record the run's game events to a trace file")
+    parser.add_argument("--replay", metavar="TRACE",
+                        help="rerun a recorded trace (same --miners, --grid-size and --engine) and check its game events")
+    args = parser.parse_args()
+    if args.ticks is None and args.caves is None:
+        args.caves = 1
+
+    player = TracePlayer(args.replay) if args.replay else None
+    if player:
+        args.seed, args.tick_rate = player.seed, player.tick_rate
+    elif args.record and args.seed is None:
+        args.seed = random.randrange(2 ** 32) # a trace needs the seed to be replayed
+
+    simulation = HeadlessSimulation(seed=args.seed, tick_rate=args.tick_rate, grid_size=args.grid_size,
+                                    fire_miners=args.miners, lightning_miners=args.miners, light_miners=args.miners,
+                                    engine=args.engine)
+    bus = simulation.event_handler.bus
+    if args.event_stats:
+        bus.set_stats(EventStats())
+    recorder = TraceRecorder(args.record, args.seed, args.tick_rate) if args.record else None
+    if recorder:
+        recorder.attach(bus)
+    if player:
+        player.attach(bus)
+
+    start = time.perf_counter()
+    if player:
+        # one recorded frame per tick, there is no input to feed back
+        while player.next_frame() is not None:
+            simulation.tick()
+        player.close()
+    else:
+        no_keys = ReplayKeys([])
+        record_tick = (lambda: recorder.record_frame(simulation.tick_length, [], no_keys, (0, 0))) if recorder else None
+        simulation.run(ticks=args.ticks, caves=args.caves, before_tick=record_tick)
+    elapsed = time.perf_counter() - start
+    if recorder:
+        recorder.close()
+
+    print(f"ticks: {simulation.ticks} ({simulation.ticks * simulation.tick_length:.1f}s of game time)")
+    print(f"caves cleared: {simulation.caves_cleared}")
+    print(f"gold: {int(simulation.upgrade_manager.gold)}")
+    print(f"frontier: {len(simulation.terrain.frontier)} minable tiles")
+    print(f"wall time: {elapsed:.2f}s ({simulation.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    if player:
+        diverged_at = player.report()["diverged_at"]
+        print("replay matched the recording" if diverged_at is None else f"game events diverged from the recording at frame {diverged_at}")
+    if args.event_stats:
+        bus.stats.dump(args.event_stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,29 @@
-from src.game import Terrain, EventHandler, Miner, UpgradesManager, FireMiner, LightningMiner, LightMiner
+from src.game import Terrain, EventHandler, GameEvents, Miner, UpgradesManager, FireMiner, LightningMiner, LightMiner, FixedTimestep, MinerScheduler, TraceRecorder, TracePlayer, EventStats
 import src.graphics as gfx
 import pygame as pg
+import argparse
+import random
 import math
 
+parser = argparse.ArgumentParser(description="Mining Haven")
+parser.add_argument("--seed", type=int, default=None, help="seed of the game's randomness")
+parser.add_argument("--record", metavar="TRACE", help="record the session to a trace file")
+parser.add_argument("--replay", metavar="TRACE", help="replay a recorded trace at full speed and print frame times")
+parser.add_argument("--event-stats", metavar="FILE", help="count game events and time their handlers, written to FILE on exit")
+args, _ = parser.parse_known_args()
+
+# a seed and the recorded frame times and input reproduce a session exactly
+player = TracePlayer(args.replay) if args.replay else None
+seed = player.seed if player else (args.seed if args.seed is not None else random.randrange(2 ** 32))
+random.seed(seed)
+tick_rate = player.tick_rate if player else 60
+recorder = TraceRecorder(args.record, seed, tick_rate) if args.record else None
+
 pg.init()
 
 # order in all creation is important
 terrain = Terrain()
 
-cave_surface = gfx.CaveSurface()
-miner_surface = gfx.MinerSurface()
-ui_surface = gfx.UISurface()
-special_gfx_surface = gfx.SpecialEffectSurface()
-
-upgrade_manager = UpgradesManager(terrain)
-ui_surface.set_upgrades_manager(upgrade_manager)
-
-surfaces = [cave_surface, miner_surface, ui_surface, special_gfx_surface]
 miners = []
 lightning_miner_amount = 3
 fire_miner_amount = 3
@@ -30,6 +37,16 @@ for i in range(lightning_miner_amount):
 for i in range(light_miner_amount):
     miners.append(LightMiner(terrain))
 
+cave_surface = gfx.CaveSurface()
+miner_surface = gfx.MinerSurface()
+ui_surface = gfx.UISurface()
+special_gfx_surface = gfx.SpecialEffectSurface(miners)
+
+upgrade_manager = UpgradesManager(terrain)
+ui_surface.set_upgrades_manager(upgrade_manager)
+
+surfaces = [cave_surface, miner_surface, ui_surface, special_gfx_surface]
+
 Miner.set_miners(miners)
 
 upgrade_manager.set_miners(miners)
@@ -39,6 +56,7 @@ terrain.set_miner_surface(miner_surface)
 terrain.set_ui_surface(ui_surface)
 terrain.set_special_gfx_surface(special_gfx_surface)
 terrain.set_miners(miners)
+terrain.set_miner_scheduler(MinerScheduler())
 for surface in surfaces:
     surface.set_terrain(terrain)
 
@@ -50,16 +68,82 @@ graphics_engine.set_renderer_to_surfaces()
 terrain.initialize_terrain()
 graphics_engine.load_new_cave()
 
+def on_tile_broken(event):
+    # a revealed cave breaks many tiles at once, so the whole batch is handled in one pass
+    terrain.break_terrain_many(event.positions, event.initialization, event.new_grid)
+    graphics_engine.break_terrain_many(event.positions)
+    terrain.check_if_cleared()
+
+def on_screen_darkening(event):
+    graphics_engine.darkening = True
+    # the next cave is built while the screen fades out, CAVE_CLEARED only swaps it in
+    terrain.prepare_next_cave()
+    graphics_engine.prepare_new_cave()
+
+def on_screen_lightening(event):
+    graphics_engine.lightening = True
+
+def on_cave_cleared(event):
+    terrain.initialize_terrain()
+    graphics_engine.set_initial_offset()
+    graphics_engine.load_new_cave()
+
+def on_luck_upgraded(event):
+    if upgrade_manager.buy_ore_luck(event.multiplier, event.levels):
+        ui_surface.update_gold()
+
+def on_ore_value_upgraded(event):
+    if upgrade_manager.buy_ore_value(event.multiplier, event.levels):
+        ui_surface.update_gold()
+
+def on_gold_given(event):
+    # all gold of a frame arrives summed up, the text is redrawn once
+    upgrade_manager.increment_gold(event.amount)
+    ui_surface.update_gold()
+
+def on_miner_boost_clicked(event):
+    upgrade_manager.incre_global_miner_speed_mult()
+    ui_surface.update_text("Miner Boost", f"Current Boost: {round(Miner.global_miner_speed_boost, 3)}x", color=(255, 255, 255), button=True)
+
+bus = events_handler.bus
+bus.subscribe(GameEvents.TILE_BROKEN, on_tile_broken)
+bus.subscribe(GameEvents.SCREEN_DARKENING, on_screen_darkening)
+bus.subscribe(GameEvents.SCREEN_LIGHTENING, on_screen_lightening)
+bus.subscribe(GameEvents.CAVE_CLEARED, on_cave_cleared)
+bus.subscribe(GameEvents.LUCK_UPGRADED, on_luck_upgraded)
+bus.subscribe(GameEvents.ORE_VALUE_UPGRADED, on_ore_value_upgraded)
+bus.subscribe(GameEvents.GOLD_GIVEN, on_gold_given)
+bus.subscribe(GameEvents.MINER_BOOST_CLICKED, on_miner_boost_clicked)
+if recorder:
+    recorder.attach(bus)
+if player:
+    player.attach(bus)
+if args.event_stats:
+    bus.set_stats(EventStats())
+
 def main():
     clock = pg.time.Clock()
     running = True
     dt = 0
     fps = 60
+    timestep = FixedTimestep(tick_rate=tick_rate, max_catch_up=5) # simulation runs at a fixed rate, whatever the frame rate
     events_handler.call_lightening_screen()
     ui_surface.create_ore_panel(terrain)
 
     while running:
-        keys = pg.key.get_pressed()
+        if player:
+            frame = player.next_frame()
+            if frame is None:
+                break
+            dt, frame_events, keys, mouse_pos = frame
+            frame_events += [event for event in pg.event.get() if event.type == pg.QUIT]
+        else:
+            keys = pg.key.get_pressed()
+            mouse_pos = pg.mouse.get_pos()
+            frame_events = pg.event.get()
+            if recorder:
+                recorder.record_frame(dt, frame_events, keys, mouse_pos)
+
         if keys[pg.K_LEFT] or keys[pg.K_RIGHT] or keys[pg.K_PERIOD]:
             graphics_engine.handle_miner_camera(keys, dt)
         elif keys[pg.K_w] or keys[pg.K_a] or keys[pg.K_s] or keys[pg.K_d]:
@@ -67,66 +151,50 @@ def main():
         if keys[pg.K_q]:
             graphics_engine.switch_to_miner_UI()
 
-        mouse_pos = pg.mouse.get_pos()
         graphics_engine.handle_mouse_hover(mouse_pos)
 
-        for event in pg.event.get():
+        for event in frame_events:
             if event.type == pg.QUIT:
                 running = False
 
             if event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_pos = pg.mouse.get_pos()
-                events_handler.handle_mouse_click(mouse_pos)              
-
-            if event.type == events_handler.events.TILE_BROKEN.value:
-                for coord in event.positions:
-                    terrain.break_terrain(coord, event.initialization, event.new_grid)
-                    graphics_engine.break_terrain(coord)
-                    terrain.check_if_cleared()
+                events_handler.handle_mouse_click(event.pos)
+            elif event.type == pg.MOUSEBUTTONDOWN and event.button == 3: # right click buys upgrades in bulk
+                events_handler.handle_mouse_click(event.pos, buy_max=True)
 
-            if event.type == events_handler.events.SCREEN_DARKENING.value:
-                graphics_engine.darkening = True
-            if event.type == events_handler.events.SCREEN_LIGHTENING.value:
-                graphics_engine.lightening = True
-
-            if event.type == events_handler.events.CAVE_CLEARED.value:
-                terrain.initialize_terrain()
-                graphics_engine.set_initial_offset()
-                graphics_engine.load_new_cave()
-
-            if event.type == events_handler.events.LUCK_UPGRADED.value:
-                upgrade_manager.increment_ore_luck(event.multiplier)
-
-            if event.type == events_handler.events.ORE_VALUE_UPGRADED.value:
-                upgrade_manager.increment_ore_value(event.multiplier)
-
-            if event.type == events_handler.events.GOLD_GIVEN.value:
-                upgrade_manager.increment_gold(event.amount)
-                ui_surface.update_text("Gold Amount", f"Gold: {upgrade_manager.gold}")
-
-            if event.type == events_handler.events.MINER_BOOST_CLICKED.value:
-                upgrade_manager.incre_global_miner_speed_mult()
-                ui_surface.update_text("Miner Boost", f"Current Boost: {round(Miner.global_miner_speed_boost, 3)}x", color=(255, 255, 255), button=True)
+        # game events of the last frame, coalesced
+        bus.dispatch()
 
         upgrade_manager.incre_time_since_last(dt)
         if upgrade_manager.time_since_last_click >= 1.5:
             upgrade_manager.global_miner_speed_decay(dt)
             ui_surface.update_text("Miner Boost", f"Current Boost: {round(Miner.global_miner_speed_boost, 3)}x", color=(255, 255, 255), button=True)
 
-        Miner.handle_passive_abilities()
-        terrain.miner_decision_make(dt)
+        for _ in range(timestep.advance(dt)):
+            Miner.handle_passive_abilities()
+            terrain.miner_decision_make(timestep.tick_length)
+        graphics_engine.set_interpolation(timestep.alpha)
         graphics_engine.update_healthbars(dt)
         graphics_engine.check_miner_pos()
         graphics_engine.update_miner_camera()
 
         graphics_engine.render(dt, fps)
-        dt = clock.tick(gfx.FPS) / 1000
+        dt = clock.tick(0 if player else gfx.FPS) / 1000 # a replay runs uncapped, its dt comes from the trace
         fps = clock.get_fps()
         if math.isinf(fps) or math.isnan(fps):
             fps = 0
 
-
-
+    if recorder:
+        recorder.close()
+    if bus.stats:
+        bus.stats.dump(args.event_stats)
+    if player:
+        player.close()
+        report = player.report()
+        print(f"replayed {report['frames']} frames in {report['seconds']:.2f}s, "
+              f"frame time mean {report['mean_frame_ms']:.2f}ms, p95 {report['p95_frame_ms']:.2f}ms, max {report['max_frame_ms']:.2f}ms")
+        if report["diverged_at"] is not None:
+            print(f"game events diverged from the recording at frame {report['diverged_at']}")
 
     pg.quit()
         
@@ -1,9 +1,17 @@
-from .ores import terrainTypes, Ore
+from .ores import terrainTypes, Ore, OreGrid, OreSampler, TerrainChunk, DamageBuffer, CHUNK_SIZE, tile_key, key_to_coord
+from .pathing import DistanceField, Frontier
 from .world import Terrain
-from .events import EventHandler
+from .events import GameEvents, GameEvent, EventStats, EventBus, EventHandler
 from .caves import CaveHelper
 from .miners import Miner, FireMiner, LightningMiner, LightMiner
+from .miner_engine import MinerEngine
+from .scheduler import MinerScheduler
 from .objects import GameObject
+from .bignum import BigNumber
 from .progression import UpgradesManager
+from .timestep import FixedTimestep
+from .simulation import HeadlessSimulation
+from .offline import OfflineProgressEstimator
+from .replay import TraceRecorder, TracePlayer
 
 WALL_PROBABILITY = 50
\ No newline at end of file
@@ -0,0 +1,246 @@
+from decimal import Decimal
+from functools import lru_cache
+from math import floor, log10
+
+EXACT_LIMIT = 1e15 # below this the mantissa is the value itself, so whole amounts of gold stay exact
+SUFFIXES = ("", "K", "M", "B", "T", "Qa", "Qi", "Sx", "Sp", "Oc", "No", "Dc")
+
+
+def _normalize(mantissa: float, exponent: int) -> tuple[float, int]:
+    # values below EXACT_LIMIT keep exponent 0, larger ones a mantissa in [EXACT_LIMIT / 10, EXACT_LIMIT)
+    if mantissa == 0:
+        return 0.0, 0
+    if exponent <= 0:
+        if exponent < 0:
+            mantissa *= 10.0 ** exponent
+            exponent = 0
+        if -EXACT_LIMIT < mantissa < EXACT_LIMIT:
+            return mantissa, 0
+    if mantissa != mantissa or mantissa in (float("inf"), float("-inf")):
+        raise OverflowError("BigNumber cannot hold inf or nan")
+
+    shift = floor(log10(abs(mantissa))) - 14
+    if exponent + shift < 0:
+        shift = -exponent
+    if shift > 0:
+        mantissa /= 10.0 ** shift
+    elif shift < 0:
+        mantissa *= 10.0 ** -shift
+    exponent += shift
+    if abs(mantissa) >= EXACT_LIMIT: # rounding of the shift
+        mantissa /= 10
+        exponent += 1
+    return mantissa, exponent
+
+
+@lru_cache(maxsize=4096)
+def _abbreviate(negative: bool, digits: int, magnitude: int) -> str:
+    # digits are the three leading significant digits (100-999), magnitude the power of ten of the first one
+    sign = "-" if negative else ""
+    if magnitude < 3:
+        return f"{sign}{digits // 10 ** (2 - magnitude)}"
+    group, position = divmod(magnitude, 3)
+    if group >= len(SUFFIXES):
+        text = f"{digits / 100:.2f}".rstrip("0").rstrip(".")
+        return f"{sign}{text}e{magnitude}"
+    text = f"{digits / 10 ** (2 - position):.{2 - position}f}".rstrip("0").rstrip(".") if position < 2 else str(digits)
+    return f"{sign}{text}{SUFFIXES[group]}"
+
+
+class BigNumber:
+    """
+    Number kept as mantissa * 10 ** exponent, for gold and multipliers that outgrow floats
+    (ore values grow geometrically with every upgrade) without the cost of arbitrary
+    precision integers on every gold update.
+
+    Values below 1e15 are held in the mantissa with exponent 0, so small amounts of gold are
+    exact and behave like plain numbers. Above that the mantissa keeps 15 significant digits and
+    the exponent is an unbounded int. Instances are immutable and mix with ints and floats in
+    arithmetic and comparisons.
+
+    str() gives the abbreviated form shown to the player ("653", "4.5Qa", "1.23e45"). It is
+    cached per instance, and the formatting itself per three significant digits and magnitude,
+    so redrawing an unchanged amount costs a lookup.
+    """
+    __slots__ = ("mantissa", "exponent", "_text")
+
+    def __init__(self, value=0, exponent: int = 0):
+        if isinstance(value, BigNumber):
+            value, exponent = value.mantissa, value.exponent + exponent
+        elif isinstance(value, int) and not -EXACT_LIMIT < value < EXACT_LIMIT:
+            # too large to go through a float in one piece
+            shift = len(str(abs(value))) - 16
+            value, exponent = value // 10 ** shift if value > 0 else -(-value // 10 ** shift), exponent + shift
+        self.mantissa, self.exponent = _normalize(float(value), exponent)
+        self._text = None
+
+    @classmethod
+    def from_log10(cls, logarithm: float) -> "BigNumber":
+        # 10 ** logarithm
+        if logarithm < 15:
+            return cls(10.0 ** logarithm)
+        exponent = floor(logarithm) - 14
+        return cls(10.0 ** (logarithm - exponent), exponent)
+
+    @staticmethod
+    def _coerce(other) -> "BigNumber":
+        if isinstance(other, BigNumber):
+            return other
+        if isinstance(other, (int, float)):
+            return BigNumber(other)
+        return NotImplemented
+
+    def log10(self) -> float:
+        return log10(self.mantissa) + self.exponent
+
+    def _key(self) -> tuple:
+        # exponent 0 values are all below those with a higher exponent, so (exponent, mantissa) orders them
+        if self.mantissa > 0:
+            return (1, self.exponent, self.mantissa)
+        if self.mantissa < 0:
+            return (-1, -self.exponent, self.mantissa)
+        return (0, 0, 0.0)
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        big, small = (self, other) if self.exponent >= other.exponent else (other, self)
+        difference = big.exponent - small.exponent
+        if difference > 17: # below the mantissa's precision
+            return big
+        return BigNumber(big.mantissa + small.mantissa / 10.0 ** difference, big.exponent)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return BigNumber(-self.mantissa, self.exponent)
+
+    def __sub__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return self + -other
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return BigNumber(self.mantissa * other.mantissa, self.exponent + other.exponent)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return BigNumber(self.mantissa / other.mantissa, self.exponent - other.exponent)
+
+    def __rtruediv__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return other / self
+
+    def __pow__(self, power):
+        if self.mantissa <= 0:
+            return BigNumber(float(self) ** power)
+        logarithm = self.log10() * power
+        if self.exponent == 0 and logarithm < 300: # both within float range, as exact as a plain power
+            return BigNumber(self.mantissa ** power)
+        return BigNumber.from_log10(logarithm)
+
+    def __ceil__(self):
+        if self.exponent:
+            return self # no fractional part left at this size
+        return BigNumber(-(-self.mantissa // 1))
+
+    def __floor__(self):
+        if self.exponent:
+            return self
+        return BigNumber(self.mantissa // 1)
+
+    def __round__(self, ndigits: int = None):
+        if self.exponent:
+            return self
+        return BigNumber(round(self.mantissa, ndigits))
+
+    def __eq__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return self._key() == other._key()
+
+    def __lt__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return self._key() < other._key()
+
+    def __le__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return self._key() <= other._key()
+
+    def __gt__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return self._key() > other._key()
+
+    def __ge__(self, other):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        return self._key() >= other._key()
+
+    def __hash__(self):
+        # equal to the hash of the int or float of the same value while the value is held exactly
+        if self.exponent == 0:
+            return hash(self.mantissa)
+        return hash(self._key())
+
+    def __bool__(self):
+        return self.mantissa != 0
+
+    def __float__(self):
+        try:
+            return self.mantissa * 10.0 ** self.exponent
+        except OverflowError:
+            return float("inf") if self.mantissa > 0 else float("-inf")
+
+    def __int__(self):
+        if self.exponent:
+            return int(self.mantissa) * 10 ** self.exponent
+        return int(self.mantissa)
+
+    def __str__(self):
+        if self._text is None:
+            # truncated, never rounded up, so the amount shown is never more than there is
+            whole = str(int(abs(self.mantissa)))
+            if whole == "0":
+                self._text = "0"
+            else:
+                digits = int(whole[:3].ljust(3, "0"))
+                self._text = _abbreviate(self.mantissa < 0, digits, len(whole) - 1 + self.exponent)
+        return self._text
+
+    def __format__(self, spec: str):
+        if not spec:
+            return str(self)
+        if self.exponent == 0:
+            return format(self.mantissa, spec)
+        if spec[-1] in "bcdoxX":
+            return format(int(self), spec)
+        # a Decimal formats any exponent the way a float would format a value in its range
+        return format(Decimal(repr(self.mantissa)).scaleb(self.exponent), spec)
+
+    def __repr__(self):
+        return f"BigNumber({self.mantissa!r}, {self.exponent})"
+
+    def as_tuple(self) -> tuple[float, int]:
+        return self.mantissa, self.exponent
@@ -3,7 +3,7 @@ class CaveHelper:
     Manages cave generation, state, and interaction within the terrain grid.
 
     This class is responsible for creating randomized cave structures using cellular 
-    automata smoothing (`generate_caves`), determining when caves should be visually 
+    automata smoothing (`generate_chunk_caves`), determining when caves should be visually 
     revealed based on player proximity (`check_if_in_cave`), and resetting cave data 
     for world regeneration or transitions (`reset_caves`).
 
@@ -14,6 +14,11 @@ class CaveHelper:
         caves (dict[int: Cave]): Dictionary storing cave instances by their unique IDs.
         cave_amount (int): Count of caves generated so far, used as indexing.
         wall_probability (float): Chance that a tile is initialized as a wall during cave generation.
+        smoothing_iterations (int): Number of cellular automata smoothing steps run per cave.
+        cave_size (CaveSizes): Size used for every generated cave.
+        grid (OreGrid): Terrain grid the caves are generated into and labeled on.
+        rng (random.Random): Random source of the generation, the terrain's unless the helper
+            generates on another thread (see create_next()).
     """
     def __init__(self, terrain):
         from src.game import Terrain, terrainTypes
@@ -23,131 +28,182 @@ class CaveHelper:
         self.caves: dict[int: Cave] = {}
         self.cave_amount = 0
         self.wall_probability = 0.35
+        self.smoothing_iterations = 1
+        self.cave_size: CaveSizes = CaveSizes.Large
+        self.grid = None
+        self.rng = terrain.rng
 
-    def generate_caves(self):
+    def set_grid(self, grid):
+        self.grid = grid
+
+    def create_next(self) -> "CaveHelper":
+        """
+        Returns an empty helper with the same generation settings, used to generate the next
+        cave while this one is still being played.
+
+        The new helper gets its own random source seeded from this one, so generating on a
+        worker thread neither races the game for the global random state nor depends on thread
+        timing, and a seeded game replays the same caves. Must be called on the game thread.
+        """
+        import random
+        cave_helper = CaveHelper(self._terrain)
+        cave_helper.rng = random.Random(self.rng.getrandbits(64))
+        cave_helper.wall_probability = self.wall_probability
+        cave_helper.smoothing_iterations = self.smoothing_iterations
+        cave_helper.cave_size = self.cave_size
+        return cave_helper
+
+    def generate_chunk_caves(self, chunk_x: int, chunk_y: int):
         """
-        Generates multiple cave structures within the terrain grid.
+        Generates the cave structures belonging to a single terrain chunk.
 
-        This method calculates the number of caves to generate based on grid size,
-        selects a consistent cave size (currently 'Large'), and finds valid positions
-        within the terrain for each cave. Once a location is found, it invokes 
-        generate_cave() to create the cave structure and increments the cave counter.
+        Chunks are generated lazily by the terrain grid the first time they are touched, so
+        each chunk rolls its own caves inside its own bounds (clamped to the grid). The number
+        of caves is based on the size of the chunk region, a consistent cave size is used
+        (self.cave_size, 'Large' by default), and valid positions are searched within the chunk for each cave.
+        Once a location is found, it invokes generate_cave() to create the cave structure and
+        increments the cave counter.
+
+        Parameters:
+            chunk_x (int): Chunk column of the terrain grid.
+            chunk_y (int): Chunk row of the terrain grid.
 
         Requirements:
-        - grid_size must be between 20 and 50 inclusive.
+        - The grid must be at least twice the cave size wide and tall to hold caves, and the chunk
+          region at least the cave size.
         - Cave size is defined using the CaveSizes enum.
         - Relies on self.find_valid_cave_location() and self.generate_cave() to handle placement and generation.
+        - Stops early once the chunk has no valid position left for another cave.
         """
+        # Region of grid tiles covered by the chunk, edge chunks can be partial.
+        x_start, y_start, x_end, y_end = self.grid.chunk_bounds(chunk_x, chunk_y)
+        region_size = min(x_end - x_start, y_end - y_start)
+        cave_size = self.cave_size  # Same size used for all generated caves.
 
         cave_amount = 0
 
-        # Determine number of caves based on grid size.
-        if 100 >= self.grid_size >= 20:
-            cave_amount = (self.grid_size - 10) // 2
+        # Determine number of caves based on chunk region size. Whether caves of this size fit the
+        # world at all depends on the grid, a chunk only has to hold one.
+        if self.grid_size >= cave_size.value * 2 and region_size >= cave_size.value:
+            cave_amount = max((region_size - cave_size.value) // 2, 1)
 
         if cave_amount != 0:
             for i in range(1, cave_amount + 1):
-                cave_size = CaveSizes.Large  # Fixed size used for all generated caves.
+                # Attempt to find a valid location for the cave of given size inside the chunk.
+                cave_pos = self.find_valid_cave_location(cave_size.value, (x_start, y_start, x_end, y_end))
 
-                # Attempt to find a valid location for the cave of given size.
-                cave_pos = self.find_valid_cave_location(cave_size.value)
+                if not cave_pos:
+                    break  # The chunk is full, later attempts cannot succeed either.
 
-                if cave_pos:
-                    self.cave_amount += 1
-                    cave_x, cave_y = cave_pos
-                    width, height = cave_size.value, cave_size.value
+                self.cave_amount += 1
+                cave_x, cave_y = cave_pos
+                width, height = cave_size.value, cave_size.value
 
-                    # Generate the actual cave structure at the computed location.
-                    self.generate_cave(cave_x, cave_y, width, height)
+                # Generate the actual cave structure at the computed location.
+                self.generate_cave(cave_x, cave_y, width, height)
 
 
-    def find_valid_cave_location(self, size: int):
+    def find_valid_cave_location(self, size: int, bounds: tuple[int, int, int, int]):
         """
-        Attempts to find a valid location for placing a cave of the given size.
+        Picks a valid location for placing a cave of the given size.
 
-        The method makes up to 200 randomized placement attempts within the grid bounds,
-        ensuring each candidate location satisfies cave placement rules defined in 
-        is_cave_location_valid(). If a valid position is found, it returns the (x, y) 
-        coordinates; otherwise, it returns None.
+        Instead of trying random positions until one passes the placement rules, the method
+        builds the set of every valid top-left position inside the given bounds with
+        cave_placement_mask() and samples uniformly from it. Generation time no longer depends
+        on how crowded the region is, and None is only returned when no position is valid.
 
         Parameters:
             size (int): The width and height of the cave to place.
+            bounds (tuple[int, int, int, int]): Region (x_start, y_start, x_end, y_end) the cave must fit in, end exclusive.
 
         Returns:
             tuple[int, int] or None: Coordinates of the valid cave position, or None if none found.
         """
 
-        import random
-        attempts = 0
-
-        # Try up to 200 random positions within grid bounds to find a valid cave spot.
-        while attempts < 250:
-            x = random.randint(0, self.grid_size - size)
-            y = random.randint(0, self.grid_size - size)
-
-            # Check if this position satisfies cave placement criteria.
-            if self.is_cave_location_valid(x, y, size):
-                return x, y
-
-            attempts += 1
-
-        return None  # Return None if no valid position found after all attempts.
-    
-    def is_cave_location_valid(self, x, y, size):
+        x_start, y_start = bounds[0], bounds[1]
+
+        free_rows = self.cave_placement_mask(size, bounds)
+        valid_amount = sum(row.bit_count() for row in free_rows)
+        if valid_amount == 0:
+            return None  # Every position breaks a placement rule.
+
+        # Walk to the chosen valid position, row by row and then bit by bit.
+        choice = self.rng.randrange(valid_amount)
+        for row_index, row in enumerate(free_rows):
+            row_amount = row.bit_count()
+            if choice >= row_amount:
+                choice -= row_amount
+                continue
+            for _ in range(choice):
+                row &= row - 1  # drop the lowest valid position
+            return x_start + (row & -row).bit_length() - 1, y_start + row_index
+
+    def cave_placement_mask(self, size: int, bounds: tuple[int, int, int, int]) -> list[int]:
         """
-        Determines if a cave of the given size can be placed at position (x, y) without overlap
-        or violating proximity rules with existing caves or the grid's middle region.
+        Builds the valid top-left positions for a cave of the given size inside bounds, as one
+        bitmask per candidate row (bit i set = x_start + i is valid).
 
         Placement rules enforced:
-        - Each cave must maintain a `cave_buffer` of empty tiles around other caves.
-        - Caves cannot intersect the central area (within ± middle_buffer of terrain.middle).
+        - Each cave must stay fully outside the `cave_buffer` widened column band and row band of
+          every other cave, so each existing cave blocks a cross of positions.
+        - Once a cave exists, caves cannot intersect the central area (within ± middle_buffer of
+          terrain.middle).
         - Placement must be fully within bounds, considering size.
 
         Parameters:
-            x (int): Top-left x-coordinate of the potential cave.
-            y (int): Top-left y-coordinate of the potential cave.
             size (int): Width and height of the square cave.
+            bounds (tuple[int, int, int, int]): Region (x_start, y_start, x_end, y_end) the cave must fit in, end exclusive.
 
         Returns:
-            bool: True if the location is valid for cave placement, otherwise False.
+            list[int]: Free position bitmask for every candidate row, from y_start downwards.
         """
 
         cave_buffer = 1          # Minimum space to maintain between caves.
         middle_buffer = 3        # Buffer around the terrain's middle area.
-        end_x, end_y = x + size, y + size  # Bottom-right corner of cave.
-
-        # Iterate through all existing caves to validate placement.
-        for cave_id, cave_data in self.caves.items():
+        x_start, y_start, x_end, y_end = bounds
+        columns, rows = x_end - size - x_start + 1, y_end - size - y_start + 1
+        if columns <= 0 or rows <= 0:
+            return []
+
+        def span(low, high, origin, length):
+            # Bitmask of positions low..high (inclusive), relative to origin and clipped to length.
+            low, high = max(low - origin, 0), min(high - origin, length - 1)
+            return ((1 << (high - low + 1)) - 1) << low if low <= high else 0
+
+        # Existing caves block every position whose cave would reach into their buffered bands.
+        blocked_columns = blocked_rows = 0
+        for cave_data in self.caves.values():
             top_l_cave, bot_r_cave = cave_data.rect
-
-            # Check if the cave is completely outside the buffered area of another cave.
-            if (end_x <= top_l_cave[0] - cave_buffer or x >= bot_r_cave[0] + cave_buffer) and \
-            (end_y <= top_l_cave[1] - cave_buffer or y >= bot_r_cave[1] + cave_buffer):
-
-                # Check if cave intersects with the middle buffered zone of the terrain.
-                middle = self._terrain.middle
-                middle_min = middle - middle_buffer
-                middle_max = middle + middle_buffer
-
-                if x <= middle_max and end_x >= middle_min and \
-                y <= middle_max and end_y >= middle_min:
-                    return False  # Reject if overlapping with middle zone.
-
-                continue  # Valid with respect to this cave, check next.
-
-            return False  # Overlapping another cave, reject placement.
-
-        return True  # Valid placement — no overlaps or conflicts.
+            blocked_columns |= span(top_l_cave[0] - cave_buffer - size + 1, bot_r_cave[0] + cave_buffer - 1, x_start, columns)
+            blocked_rows |= span(top_l_cave[1] - cave_buffer - size + 1, bot_r_cave[1] + cave_buffer - 1, y_start, rows)
+
+        # The middle buffered zone blocks the positions whose cave would intersect it. Like the
+        # original per-position check, it only applies once a cave exists, so the first cave can
+        # go anywhere (on small grids every position touches the middle band).
+        middle_columns = middle_rows = 0
+        if self.caves:
+            middle = self._terrain.middle
+            middle_min = middle - middle_buffer
+            middle_max = middle + middle_buffer
+            middle_columns = span(middle_min - size, middle_max, x_start, columns)
+            middle_rows = span(middle_min - size, middle_max, y_start, rows)
+
+        free_row = ((1 << columns) - 1) & ~blocked_columns
+        return [
+            0 if (blocked_rows >> i) & 1 else free_row & ~middle_columns if (middle_rows >> i) & 1 else free_row
+            for i in range(rows)
+        ]
 
 
     def generate_cave(self, x_start, y_start, width, height):
         """
         Generates a cave at the specified grid location using cellular automata smoothing.
 
-        This method initializes a randomized grid of terrain types (Stone or Floor), then applies 
-        a two-pass smoothing algorithm:
-        1. Evaluates each tile's surrounding wall density and converts it to Stone if it meets 
-        a threshold.
+        The cave is held as one integer bitmask per row (bit x set = tile x is set), so every
+        smoothing step works on whole rows at once with shifts and bitwise adders instead of
+        visiting tiles one by one. After a randomized start, a two-pass smoothing algorithm runs:
+        1. Evaluates each tile's wall density against a threshold and converts it to Stone or
+        Floor (see smooth_walls()), repeated smoothing_iterations times.
         2. Refines sparse floor tiles by removing isolated ones based on cardinal neighbor count.
 
         Parameters:
@@ -156,73 +212,107 @@ class CaveHelper:
             width (int): Width of the cave.
             height (int): Height of the cave.
 
-        Cave details are stored in self.caves using cave_amount as the unique key.
+        Cave details are stored in self.caves using cave_amount as the unique key, and its floor
+        tiles are labeled with that key in the terrain grid for check_if_in_cave().
         """
 
-        import random
-
         # Clamp cave bounds within grid limits
         x_end, y_end = min(x_start + width, self.grid_size), min(y_start + height, self.grid_size)
         cave_rect = [(x_start, y_start), (x_end - 1, y_end - 1)]  # Bounding box of cave
-
-        # Step 1: Randomize initial grid with walls and floors based on wall_probability
-        cave_init = [
-            [
-                self.terrain_types.Stone if random.random() < self.wall_probability else self.terrain_types.Floor
-                for _ in range(width)
-            ]
-            for _ in range(height)
-        ]
-
-        # Initialize new grid for processed cave layout and store floor coordinates
-        new_grid = [[self.terrain_types.Floor for _ in range(width)] for _ in range(height)]
-        coords_broken = []
+        width, height = x_end - x_start, y_end - y_start
+
+        # Step 1: Randomize initial rows with walls and floors based on wall_probability
+        wall_rows = []
+        random = self.rng.random
+        for _ in range(height):
+            row = 0
+            for x in range(width):
+                if random() < self.wall_probability:
+                    row |= 1 << x
+            wall_rows.append(row)
 
         # Step 2: Apply cellular automata smoothing (1st pass)
-        for y in range(y_start, y_end):
-            for x in range(x_start, x_end):
-                local_y = y - y_start
-                local_x = x - x_start
-
-                # Count surrounding wall tiles (8 neighbors)
-                wall_count = sum(
-                    cave_init[local_y][local_x].value
-                    for dy in [-1, 0, 1]
-                    for dx in [-1, 0, 1]
-                    if not (dy == 0 and dx == 0)
-                    if 0 <= local_y + dy < height and 0 <= local_x + dx < width
-                )
-
-                # Determine transformation threshold based on current tile type
-                threshold = 4 if cave_init[local_y][local_x] == self.terrain_types.Stone else 5
-
-                # Transform tile based on neighborhood density
-                if wall_count >= threshold:
-                    new_grid[local_y][local_x] = self.terrain_types.Stone
-                else:
-                    coords_broken.append((x, y))  # Mark as a valid walkable tile
+        for _ in range(self.smoothing_iterations):
+            wall_rows = self.smooth_walls(wall_rows, width)
 
         # Step 3: Refine walkable areas (2nd pass) — remove isolated floors
-        for y in range(y_start, y_end):
-            for x in range(x_start, x_end):
-                local_y = y - y_start
-                local_x = x - x_start
-
-                # Count adjacent floor tiles in cardinal directions (N/S/E/W)
-                floor_count = sum(
-                    1
-                    for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]
-                    if 0 <= local_y + dy < height and 0 <= local_x + dx < width
-                    and new_grid[local_y + dy][local_x + dx] == self.terrain_types.Floor
-                )
-
-                # Remove orphaned floor tiles with few floor neighbors
-                if new_grid[local_y][local_x] == self.terrain_types.Floor and floor_count < 2:
-                    new_grid[local_y][local_x] = self.terrain_types.Stone
-                    coords_broken.remove((x, y))
+        full_row = (1 << width) - 1
+        floor_rows = self.remove_isolated_floors([~row & full_row for row in wall_rows])
 
         # Step 4: Store cave data
+        new_grid = [
+            [self.terrain_types.Floor if (row >> x) & 1 else self.terrain_types.Stone for x in range(width)]
+            for row in floor_rows
+        ]
+        coords_broken = [
+            (x_start + x, y_start + y)
+            for y, row in enumerate(floor_rows)
+            for x in range(width)
+            if (row >> x) & 1
+        ]
         self.caves[self.cave_amount] = Cave(coords_broken, new_grid, cave_rect)
+        self.grid.set_cave_ids(coords_broken, self.cave_amount)
+
+    @staticmethod
+    def smooth_walls(wall_rows: list[int], width: int) -> list[int]:
+        """
+        Runs one cellular automata step over row bitmasks. As in the original per-tile loop, a
+        tile's wall count is its own value summed once per neighbor inside the cave: a wall stays
+        a wall with 4 or more neighbors inside the cave and a floor never reaches its threshold
+        of 5, so the step only opens up the corner walls.
+        """
+        full_row = (1 << width) - 1
+        height = len(wall_rows)
+        smoothed = []
+        for y, row in enumerate(wall_rows):
+            up = full_row if y > 0 else 0
+            down = full_row if y < height - 1 else 0
+            at_least_4, _ = CaveHelper._neighbor_thresholds(up, full_row, down, full_row)
+            smoothed.append(row & at_least_4)
+        return smoothed
+
+    @staticmethod
+    def _neighbor_thresholds(up: int, row: int, down: int, full_row: int) -> tuple[int, int]:
+        # bit-sliced counter of the set bits among each tile's 8 neighbors, planes[i] holds bit i
+        # of every tile's count; returns the masks of tiles counting at least 4 and at least 5
+        planes = [0, 0, 0, 0]
+        for carry in ((up << 1) & full_row, up, up >> 1, (row << 1) & full_row, row >> 1,
+                      (down << 1) & full_row, down, down >> 1):
+            for i in range(4):
+                planes[i], carry = planes[i] ^ carry, planes[i] & carry
+                if not carry:
+                    break
+        return planes[2] | planes[3], planes[3] | (planes[2] & (planes[1] | planes[0]))
+
+    @staticmethod
+    def remove_isolated_floors(floor_rows: list[int]) -> list[int]:
+        """
+        Turns floor tiles with fewer than 2 cardinal floor neighbors into stone, in row-major order
+        so that each tile sees the already refined tiles above and to its left.
+
+        Everything that does not depend on the left neighbor is resolved for the whole row at once,
+        only tiles with exactly one other floor neighbor walk the row bit by bit.
+        """
+        height = len(floor_rows)
+        refined = []
+        for y, row in enumerate(floor_rows):
+            up = refined[y - 1] if y > 0 else 0
+            down = floor_rows[y + 1] if y < height - 1 else 0
+            right = row >> 1
+
+            any_floor = up | down | right
+            two_or_more = (up & down) | (up & right) | (down & right)
+            always_removed = row & ~any_floor             # at most the left neighbor, never enough
+            left_decides = row & any_floor & ~two_or_more # exactly one, needs a floor on the left
+
+            row &= ~always_removed
+            while left_decides:
+                lowest = left_decides & -left_decides
+                if not (row & (lowest >> 1)):
+                    row &= ~lowest
+                left_decides ^= lowest
+            refined.append(row)
+        return refined
     
 
     def render_cave(self, cave_id):
@@ -231,7 +321,8 @@ class CaveHelper:
 
         This method retrieves the cave data associated with the given ID and uses the
         terrain event handler to mark its walkable tiles as 'broken', enabling their
-        appearance in the game world.
+        appearance in the game world. The floor labels are cleared so the cave cannot be
+        discovered twice.
 
         Parameters:
             cave_id (int): Identifier for the cave to render.
@@ -239,6 +330,7 @@ class CaveHelper:
 
         cave_data: dict = self.caves[cave_id]  # Retrieve stored cave information.
         coords_visible = cave_data.floor       # Get all visible (walkable) tile coordinates.
+        self.grid.set_cave_ids(coords_visible, 0)
 
         # Invoke terrain system’s event to display the cave tiles.
         self._terrain._event_handler.call_tile_broken(coords_visible)
@@ -255,9 +347,10 @@ class CaveHelper:
         Checks whether the given coordinate is adjacent to an unrevealed cave
         and renders the cave if one is discovered.
 
-        This method scans nearby tiles (N, S, E, W) to detect if any neighbor lies within 
-        the bounds of a hidden cave and is marked as walkable. If such a cave is found, 
-        it is marked as rendered and visually revealed.
+        This method looks up the cave label of the nearby tiles (N, S, E, W) in the terrain
+        grid. Every floor tile of a hidden cave is labeled with its cave id, so discovery costs
+        four lookups no matter how many caves exist. If such a cave is found, it is marked
+        as rendered and visually revealed.
 
         Parameters:
             coord (tuple[int, int]): The (x, y) coordinate to check near for cave proximity.
@@ -266,38 +359,21 @@ class CaveHelper:
             - Updates the _rendered flag of discovered cave(s).
             - Calls render_cave() to visually show discovered cave tiles.
         """
+        from src.game.ores import tile_key, NEIGHBORS4
 
-        coord_x, coord_y = coord
-        cave_rendered = set()
-
-        # Loop through all caves that haven't been revealed yet
-        for cave_id, cave_data in self.caves.items():
-            if not cave_data._rendered:
-                rect: list[tuple[int, int], tuple[int, int]] = cave_data.rect
-                rect_x1, rect_y1 = rect[0]  # Top-left of cave
-                rect_x2, rect_y2 = rect[1]  # Bottom-right of cave
-
-                # Cardinal directions from the current coordinate
-                directions = [
-                    (coord_x + 1, coord_y),
-                    (coord_x - 1, coord_y),
-                    (coord_x, coord_y + 1),
-                    (coord_x, coord_y - 1)
-                ]
-
-                for x, y in directions:
-                    # If neighbor is inside this cave's rectangle
-                    if rect_x1 <= x <= rect_x2 and rect_y1 <= y <= rect_y2:
-                        cave_coord_x, cave_coord_y = x - rect_x1, y - rect_y1
+        grid = self.grid
+        key = tile_key(*coord)
 
-                        # If tile at local cave position is floor, reveal the cave
-                        if cave_data.cave_grid[cave_coord_y][cave_coord_x] == self.terrain_types.Floor:
-                            cave_data.update_rendered()
-                            self.render_cave(cave_id)
-                            cave_rendered.add(cave_id)
+        # Cardinal neighbors of the current coordinate
+        for offset in NEIGHBORS4:
+            cave_id = grid.cave_id_at(key + offset)
 
-        for cave in cave_rendered:
-            del self.caves[cave]
+            # If the neighbor is floor of a hidden cave, reveal the cave
+            if cave_id:
+                cave_data = self.caves[cave_id]
+                cave_data.update_rendered()
+                self.render_cave(cave_id)
+                del self.caves[cave_id]
 
 
 
@@ -325,4 +401,6 @@ class Cave:
 
 from enum import Enum
 class CaveSizes(Enum):
-    Large = 10
\ No newline at end of file
+    Large = 10
+    Huge = 16
+    Giant = 24
\ No newline at end of file
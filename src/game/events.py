@@ -4,7 +4,7 @@ from enum import Enum
 class GameEvents(Enum):
     """
     Defines custom game-specific event types used for triggering gameplay actions
-    via the pygame event queue.
+    via the game's EventBus.
 
     Events:
         TILE_BROKEN: Signals that terrain tiles have transitioned to a walkable state.
@@ -21,9 +21,156 @@ class GameEvents(Enum):
     ORE_VALUE_UPGRADED = pg.USEREVENT + 7
     MINER_BOOST_CLICKED = pg.USEREVENT + 8
 
+
+class GameEvent:
+    # one published event, its attributes are the event's fields (e.g. positions, amount)
+    def __init__(self, type: GameEvents, attributes: dict = None):
+        self.type = type
+        if attributes:
+            self.__dict__.update(attributes)
+
+
+class EventStats:
+    """
+    Instrumentation of an EventBus: per event type how many events were published (before
+    coalescing) and dispatched, and how long their handlers took, plus a sample of the queue
+    depth at every dispatch. Handler time is what a frame spends on events, so this shows
+    which event type frame time goes to when the number of miners grows.
+
+    summary() gives the numbers as a dict, dump() writes them to a JSON file.
+    """
+    def __init__(self, max_samples: int = 100_000):
+        from collections import deque
+        self.published: dict[GameEvents: int] = {event: 0 for event in GameEvents}
+        self.dispatched: dict[GameEvents: int] = {event: 0 for event in GameEvents}
+        self.handler_seconds: dict[GameEvents: float] = {event: 0.0 for event in GameEvents}
+        self.max_handler_seconds: dict[GameEvents: float] = {event: 0.0 for event in GameEvents}
+        self.dispatches = 0
+        self.depth_samples = deque(maxlen=max_samples) # (events published, events pending after coalescing) per dispatch
+        self._published_since_dispatch = 0
+
+    def count_published(self, event: GameEvents):
+        self.published[event] += 1
+        self._published_since_dispatch += 1
+
+    def count_dispatch(self, depth: int):
+        self.dispatches += 1
+        self.depth_samples.append((self._published_since_dispatch, depth))
+        self._published_since_dispatch = 0
+
+    def count_handled(self, event: GameEvents, seconds: float):
+        self.dispatched[event] += 1
+        self.handler_seconds[event] += seconds
+        if seconds > self.max_handler_seconds[event]:
+            self.max_handler_seconds[event] = seconds
+
+    def summary(self) -> dict:
+        depths = sorted(depth for _, depth in self.depth_samples)
+        published = sorted(amount for amount, _ in self.depth_samples)
+        count = len(depths)
+        events = {}
+        for event in GameEvents:
+            dispatched = self.dispatched[event]
+            events[event.name] = {
+                "published": self.published[event],
+                "dispatched": dispatched,
+                "handler_ms": self.handler_seconds[event] * 1000,
+                "mean_handler_ms": self.handler_seconds[event] * 1000 / dispatched if dispatched else 0,
+                "max_handler_ms": self.max_handler_seconds[event] * 1000,
+            }
+        return {
+            "dispatches": self.dispatches,
+            "queue_depth": {
+                "mean": sum(depths) / count if count else 0,
+                "p95": depths[int(count * 0.95)] if count else 0,
+                "max": depths[-1] if count else 0,
+                "mean_published": sum(published) / count if count else 0,
+                "max_published": published[-1] if count else 0,
+            },
+            "events": events,
+        }
+
+    def dump(self, path: str):
+        import json
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=4)
+
+
+class EventBus:
+    """
+    In-process event queue with a subscriber list per GameEvents type, replacing posting game
+    events to the pygame queue.
+
+    Published events wait until dispatch(), which is called once per frame (once per tick when
+    headless). Until then, tile breaks and gold are coalesced: all tiles broken since the last
+    event of another type are merged into one TILE_BROKEN event and their gold is summed into one
+    GOLD_GIVEN event, so many miners breaking tiles in the same frame cost one handler call each.
+    Events published while dispatching are delivered on the next dispatch. Counters and handler
+    times are collected while an EventStats is set (set_stats).
+    """
+    COALESCED = (GameEvents.TILE_BROKEN, GameEvents.GOLD_GIVEN)
+
+    def __init__(self):
+        self.subscribers: dict[GameEvents: list] = {event: [] for event in GameEvents}
+        self.pending: list[GameEvent] = []
+        self._open: dict[GameEvents: GameEvent] = {} # coalescable events nothing else was published after
+        self.stats: EventStats = None
+
+    def set_stats(self, stats: EventStats):
+        self.stats = stats
+
+    def subscribe(self, event: GameEvents, handler):
+        self.subscribers[event].append(handler)
+
+    def unsubscribe(self, event: GameEvents, handler):
+        self.subscribers[event].remove(handler)
+
+    def publish(self, event: GameEvents, attributes: dict = None):
+        if self.stats:
+            self.stats.count_published(event)
+        if event not in self.COALESCED:
+            self._open = {}
+            self.pending.append(GameEvent(event, attributes))
+            return
+
+        open_event = self._open.get(event)
+        if event == GameEvents.TILE_BROKEN and open_event is not None \
+                and (open_event.new_grid, open_event.initialization) != (attributes["new_grid"], attributes["initialization"]):
+            open_event = None # a different kind of break, keep it apart
+        if open_event is None:
+            if event == GameEvents.TILE_BROKEN:
+                attributes = dict(attributes, positions=list(attributes["positions"]))
+            open_event = GameEvent(event, attributes)
+            self._open[event] = open_event
+            self.pending.append(open_event)
+        elif event == GameEvents.TILE_BROKEN:
+            open_event.positions.extend(attributes["positions"])
+        else:
+            open_event.amount += attributes["amount"]
+
+    def dispatch(self):
+        pending, self.pending, self._open = self.pending, [], {}
+        subscribers = self.subscribers
+        stats = self.stats
+        if stats is None:
+            for event in pending:
+                for handler in subscribers[event.type]:
+                    handler(event)
+            return
+
+        import time
+        stats.count_dispatch(len(pending))
+        for event in pending:
+            start = time.perf_counter()
+            for handler in subscribers[event.type]:
+                handler(event)
+            stats.count_handled(event.type, time.perf_counter() - start)
+
+
 class EventHandler:
     def __init__(self, graphics_engine, terrain):
         self.events = GameEvents
+        self.bus = EventBus()
         self.graphics_engine = graphics_engine
         self.terrain = terrain
         self.buttons: dict = None
@@ -31,7 +178,7 @@ class EventHandler:
     def set_buttons(self, buttons):
         self.buttons = buttons
 
-    def handle_mouse_click(self, mouse_pos: tuple[int, int]):
+    def handle_mouse_click(self, mouse_pos: tuple[int, int], buy_max: bool = False):
         """
         Handles a mouse click by determining the clicked tile and triggering terrain modification
         if the tile is not already walkable.
@@ -42,6 +189,7 @@ class EventHandler:
 
         Parameters:
             mouse_pos (tuple[int, int]): The x and y screen position of the mouse click.
+            buy_max (bool): Buy as many levels of a clicked upgrade as the gold pays for instead of one.
         """
 
         import src.graphics as gfx
@@ -50,37 +198,38 @@ class EventHandler:
         mouse_x, mouse_y = mouse_pos
         for name, button in self.buttons.items():
             if button.collidepoint(mouse_x, mouse_y):
-                self.call_button_type(name)
+                self.call_button_type(name, buy_max)
 
 
         tile_x = int((mouse_x + self.graphics_engine.offset_x) // gfx.TILE_SIZE)
         tile_y = int((mouse_y + self.graphics_engine.offset_y) // gfx.TILE_SIZE)
 
-    def call_button_type(self, button_name):
+    def post(self, event: GameEvents, attributes: dict = None):
+        # every game event goes through here
+        self.bus.publish(event, attributes)
+
+    def call_button_type(self, button_name, buy_max=False):
+        from src.game.progression import ORE_LUCK_MULTIPLIER, ORE_VALUE_MULTIPLIER
+        levels = None if buy_max else 1 # None buys as many levels as affordable
         if button_name == "Ore Luck Upgrade":
-            pg.event.post(pg.event.Event(GameEvents.LUCK_UPGRADED.value, {'multiplier': 1.25}))
+            self.post(GameEvents.LUCK_UPGRADED, {'multiplier': ORE_LUCK_MULTIPLIER, 'levels': levels})
         elif button_name == "Ore Value Upgrade":
-            pg.event.post(pg.event.Event(GameEvents.ORE_VALUE_UPGRADED.value, {'multiplier': 1.5}))
+            self.post(GameEvents.ORE_VALUE_UPGRADED, {'multiplier': ORE_VALUE_MULTIPLIER, 'levels': levels})
         elif button_name == "Miner Boost":
-            pg.event.post(pg.event.Event(GameEvents.MINER_BOOST_CLICKED.value))
+            self.post(GameEvents.MINER_BOOST_CLICKED)
 
     def call_tile_broken(self, coords, new_grid=None, initialization=False, gold_amount=0):
         if isinstance(coords, tuple):
             coords = [coords]
-        pg.event.post(pg.event.Event(GameEvents.TILE_BROKEN.value, {'positions': coords, 'new_grid': new_grid,
-                                                                    "initialization": initialization}))
-        pg.event.post(pg.event.Event(GameEvents.GOLD_GIVEN.value, {'amount': gold_amount}))
+        self.post(GameEvents.TILE_BROKEN, {'positions': coords, 'new_grid': new_grid, "initialization": initialization})
+        self.post(GameEvents.GOLD_GIVEN, {'amount': gold_amount})
         
     def call_cave_cleared(self):
-        pg.event.post(pg.event.Event(GameEvents.CAVE_CLEARED.value))
-        pg.event.post(pg.event.Event(GameEvents.SCREEN_LIGHTENING.value))
+        self.post(GameEvents.CAVE_CLEARED)
+        self.post(GameEvents.SCREEN_LIGHTENING)
 
     def call_darkening_screen(self):
-        pg.event.post(pg.event.Event(GameEvents.SCREEN_DARKENING.value))
+        self.post(GameEvents.SCREEN_DARKENING)
 
     def call_lightening_screen(self):
-        pg.event.post(pg.event.Event(GameEvents.SCREEN_LIGHTENING.value))
-
-    
-
-
+        self.post(GameEvents.SCREEN_LIGHTENING)
@@ -0,0 +1,109 @@
+from array import array
+
+SEARCHING, MOVING, MINING = 0, 1, 2
+STATE_CODES = {"Searching": SEARCHING, "Moving": MOVING, "Mining": MINING}
+
+
+class MinerEngine:
+    """
+    Optional structure-of-arrays driver for the miners, used by Terrain.miner_decision_make
+    instead of calling decision_make on every Miner.
+
+    Positions, the waypoint each miner walks to, speeds, cooldowns and states are kept in flat
+    columns, and one step advances every walking and cooling down miner straight on those columns
+    with the same arithmetic as Miner.move and Miner.mine. Python miner code only runs for the
+    miners that hit a state transition this step (reaching a waypoint, a cooldown running out,
+    searching for a target), in miner order, after which their row is reloaded from the Miner
+    object. Miner.pos and prev_pos are still written for the renderers.
+
+    Walking and cooling down never touch the terrain, so a run gives the same result as polling
+    every miner. Speeds are cached in the columns, so anything changing movement_speed has to
+    call sync() for that miner (Miner.sync_engine does this).
+    """
+    def __init__(self):
+        import src.graphics as gfx
+        self.tile_size = gfx.TILE_SIZE
+        self.base_fps = gfx.BASE_FPS
+        self.miners = []
+        self.count = 0
+        self.states = bytearray()
+        self.pos_x, self.pos_y = array("d"), array("d")
+        self.way_x, self.way_y = array("d"), array("d")
+        self.has_waypoint = bytearray()
+        self.tile_speeds = array("d")
+        self.cd_timers = array("d")
+
+    def load(self, miners):
+        """
+        Rebuilds every column from the miner objects, e.g. after they were spawned in a new cave.
+        """
+        count = len(miners)
+        self.miners = list(miners)
+        self.count = count
+        self.states = bytearray(count)
+        self.pos_x, self.pos_y = array("d", bytes(8 * count)), array("d", bytes(8 * count))
+        self.way_x, self.way_y = array("d", bytes(8 * count)), array("d", bytes(8 * count))
+        self.has_waypoint = bytearray(count)
+        self.tile_speeds = array("d", bytes(8 * count))
+        self.cd_timers = array("d", bytes(8 * count))
+        for index, miner in enumerate(self.miners):
+            miner.engine_index = index
+            self.reload(index)
+
+    def reload(self, index: int):
+        miner = self.miners[index]
+        self.states[index] = STATE_CODES[miner._state]
+        if miner.pos is not None: # not spawned yet
+            self.pos_x[index], self.pos_y[index] = miner.pos
+        if miner._path:
+            self.way_x[index], self.way_y[index] = miner._path[0]
+            self.has_waypoint[index] = 1
+        else:
+            self.has_waypoint[index] = 0
+        self.tile_speeds[index] = miner.movement_speed / self.tile_size * self.base_fps
+        self.cd_timers[index] = miner.cd_timer
+
+    def sync(self, miner):
+        # picks up speed changes made on the miner object
+        index = getattr(miner, "engine_index", None)
+        if index is not None and index < self.count and self.miners[index] is miner:
+            self.tile_speeds[index] = miner.movement_speed / self.tile_size * self.base_fps
+
+    def step(self, dt):
+        states, has_waypoint = self.states, self.has_waypoint
+        pos_x, pos_y, way_x, way_y = self.pos_x, self.pos_y, self.way_x, self.way_y
+        tile_speeds, cd_timers = self.tile_speeds, self.cd_timers
+        miners = self.miners
+        transitions = []
+
+        # Column pass: walk and cool down everyone that is not changing state this step.
+        for index in range(self.count):
+            miner = miners[index]
+            miner.prev_pos = miner.pos
+            state = states[index]
+            if state == MINING:
+                cd_timer = cd_timers[index] - dt
+                if cd_timer > 0:
+                    cd_timers[index] = cd_timer
+                else:
+                    transitions.append(index) # hits this step
+            elif state == MOVING and has_waypoint[index]:
+                px, py = pos_x[index], pos_y[index]
+                dx, dy = way_x[index] - px, way_y[index] - py
+                distance = (dx**2 + dy**2) ** 0.5
+                step = tile_speeds[index] * dt
+                if distance <= step:
+                    transitions.append(index) # reaches the waypoint, Miner.move snaps it and pops its path
+                else:
+                    x, y = round(px + dx / distance * step, 2), round(py + dy / distance * step, 2)
+                    pos_x[index], pos_y[index] = x, y
+                    miner.pos = (x, y)
+            else:
+                transitions.append(index)
+
+        # Python pass: only the miners changing state run their own logic.
+        for index in transitions:
+            miner = miners[index]
+            miner.cd_timer = cd_timers[index]
+            miner.decision_make(dt)
+            self.reload(index)
@@ -1,15 +1,55 @@
 import pygame as pg
 
+MIN_MINE_CD = 0.001 # seconds, a cooldown upgraded down to nothing would otherwise hit forever within one tick
+
+class MinerSpatialHash:
+    """
+    Uniform grid of miner positions, rebuilt once per tick, so radius queries only look at the
+    cells around the query point instead of at every miner.
+    """
+    def __init__(self, cell_size: int = 5):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int]: list] = {}
+
+    def rebuild(self, miners):
+        cell_size = self.cell_size
+        cells = {}
+        for miner in miners:
+            if miner.pos is None:
+                continue
+            x, y = miner.pos
+            cells.setdefault((int(x // cell_size), int(y // cell_size)), []).append(miner)
+        self.cells = cells
+
+    def query(self, pos: tuple[float, float], radius: float) -> list:
+        # miners within radius tiles of pos on both axes
+        cell_size = self.cell_size
+        x, y = pos
+        found = []
+        for cell_y in range(int((y - radius) // cell_size), int((y + radius) // cell_size) + 1):
+            for cell_x in range(int((x - radius) // cell_size), int((x + radius) // cell_size) + 1):
+                for miner in self.cells.get((cell_x, cell_y), ()):
+                    other_x, other_y = miner.pos
+                    if abs(x - other_x) <= radius and abs(y - other_y) <= radius:
+                        found.append(miner)
+        return found
+
+
 class Miner():
     miner_amount = 0
     miners = []
     global_miner_speed_boost = 1
+    spatial_hash = MinerSpatialHash()
+    light_aura = set()            # miners inside a light aura this tick
+    light_boosted_miners = set()  # miners currently holding the light boost
+    light_damage_boost = 1.2
     def __init__(self, terrain):
         from src.game import Terrain
         Miner.miner_amount += 1
         self.id = Miner.miner_amount
         self.grid_pos = None
         self.pos = None
+        self.prev_pos = None # position at the start of the current tick, for render interpolation
         self.moving_pos = None
         self._terrain: Terrain = terrain
         self._state = "Searching"
@@ -34,8 +74,27 @@ class Miner():
 
     @staticmethod
     def handle_passive_abilities():
+        Miner.spatial_hash.rebuild(Miner.miners)
+        Miner.light_aura = set()
         for miner in Miner.miners:
             miner.handle_passive_ability()
+        Miner.apply_light_aura()
+
+    @staticmethod
+    def apply_light_aura():
+        # only miners entering or leaving every aura change, the boost is applied in effective_damage
+        for miner in Miner.light_aura - Miner.light_boosted_miners:
+            miner.light_boosted = True
+        for miner in Miner.light_boosted_miners - Miner.light_aura:
+            miner.light_boosted = False
+        Miner.light_boosted_miners = Miner.light_aura
+
+    @property
+    def effective_damage(self) -> float:
+        # damage itself only changes through upgrades, so the light boost can never drift
+        if self.light_boosted:
+            return self.damage * Miner.light_damage_boost
+        return self.damage
 
     def handle_passive_ability(self):
         pass
@@ -44,137 +103,157 @@ class Miner():
     def set_boost(self):
         self.movement_speed = round(self.base_movement_speed * Miner.global_miner_speed_boost, 3)
         self.mine_cd = round(self.base_mine_cd / Miner.global_miner_speed_boost, 3)
+        self.sync_engine()
+
+    def sync_engine(self):
+        # the miner engine caches speeds in its columns
+        engine = self._terrain.miner_engine
+        if engine:
+            engine.sync(self)
+
+    def set_state(self, state, sub_state=None):
+        # claims expire with the state they were made in, a miner continuing on its target claims it again
+        self._terrain.release_tile(self.id)
+        self._state = state
+        if sub_state:
+            self._sub_state = sub_state
 
     def spawn_miner(self):
         cave_mid = (self._terrain.middle, self._terrain.middle)
         self.grid_pos = cave_mid
         self.pos = cave_mid
+        self.prev_pos = cave_mid
         self._path = []
         self._target = (None, None)
+        self.set_state("Searching")
 
 
+    def render_pos(self, alpha: float) -> tuple[float, float]:
+        # position between the last two simulation ticks
+        if self.prev_pos is None or alpha >= 1:
+            return self.pos
+        (prev_x, prev_y), (x, y) = self.prev_pos, self.pos
+        return (prev_x + (x - prev_x) * alpha, prev_y + (y - prev_y) * alpha)
+
     def decision_make(self, dt):
-        if self._state == "Moving":
-            self.move()
-        elif self._state == "Searching":
-            self.choose_mining_direction()
-        elif self._state == "Mining":
-            self.mine(dt)
+        # the tick's time carries on through state changes (searching takes none), so how much a
+        # miner gets done does not depend on how long the tick is
+        remaining = dt
+        while True:
+            if self._state == "Searching":
+                self.choose_mining_direction()
+                if self._state == "Searching":
+                    return # nothing to mine
+            elif remaining <= 0:
+                return
+            elif self._state == "Moving":
+                remaining = self.move(remaining)
+            elif self._state == "Mining":
+                remaining = self.mine(remaining)
         
 
     def check_surroundings(self):
-        from collections import deque
-
-        visited = set()
-        queue = deque()
-        queue.append((self.grid_pos, []))  # (current_position, path_to_here)
-
-        while queue:
-            current_pos, path = queue.popleft()
-            x, y = current_pos
-
-            if current_pos in visited:
-                continue
-            visited.add(current_pos)
-
-            # Check if this tile is NOT a floor
-            if self._terrain.data[y][x].type != self._terrain.terrain_types.Floor:
-                self._target = path.pop()
-                self._path = path  # Save the full path to the target
-                self._state = "Moving"
-                self._sub_state = "Grid Moving"
-                return
-
-            # Explore neighbors (up, down, left, right)
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if (
-                    0 <= nx < self._terrain.grid_size and
-                    0 <= ny < self._terrain.grid_size and
-                    (nx, ny) not in visited
-                ):
-                    queue.append(((nx, ny), path + [(nx, ny)]))
-
-    def move(self):
+        # walks down the terrain's shared distance field to the closest wall
+        from src.game.ores import tile_key
+
+        route = self._terrain.distance_field.path_to_wall(self._terrain.grid, tile_key(*self.grid_pos),
+                                                          skip=self._terrain.tile_claims)
+        if route:
+            self._path, self._target = route
+            self.set_state("Moving", "Grid Moving")
+            self._terrain.claim_tile(self._target, self.id)
+
+    def move(self, dt) -> float:
+        # returns the part of dt left after reaching the end of the path
         import src.graphics as gfx
         if not self._path:
-            if self._sub_state == "Mining Block":
-                self._state = "Mining"
-            elif self._sub_state == "Grid Moving":
-                self._state = "Searching"
-            return
-
-        target_tile = self._path[0]
-        tx, ty = target_tile
-        px, py = self.pos
-
-        # Convert movement speed from pixels to tiles
-        tile_speed = self.movement_speed / gfx.TILE_SIZE
-
-        dx = tx - px
-        dy = ty - py
-        distance = (dx**2 + dy**2) ** 0.5
-        if distance < tile_speed:
-            # Snap to tile and pop from path
-            self.pos = (tx, ty)
-            self.grid_pos = target_tile
-            self._path.pop(0)
-
-            if not self._path:
-                if self._sub_state == "Mining Block":
-                    self._state = "Mining"
-                elif self._sub_state == "Grid Moving":
-                    self._state = "Searching"
-        else:
-            # Normalize direction and move in tile space
-            nx = dx / distance
-            ny = dy / distance
-            x, y = round(px + nx * tile_speed, 2), round(py + ny * tile_speed, 2)
-            self.pos = (x, y)
-
-    def mine(self, dt):
-        if self.cd_timer <= 0:
+            self.finish_moving()
+            return dt
+
+        # Convert movement speed (pixels per frame at BASE_FPS) to the tiles covered in dt
+        speed = self.movement_speed / gfx.TILE_SIZE * gfx.BASE_FPS
+        step = speed * dt
+
+        # a step can reach several waypoints, whatever is left after one carries on to the next
+        while step > 0:
+            target_tile = self._path[0]
+            tx, ty = target_tile
+            px, py = self.pos
+            dx = tx - px
+            dy = ty - py
+            distance = (dx**2 + dy**2) ** 0.5
+            if distance <= step:
+                # Snap to tile and pop from path
+                self.pos = (tx, ty)
+                self.grid_pos = target_tile
+                self._path.pop(0)
+                step -= distance
+
+                if not self._path:
+                    self.finish_moving()
+                    return step / speed
+            else:
+                # Normalize direction and move in tile space
+                nx = dx / distance
+                ny = dy / distance
+                x, y = round(px + nx * step, 2), round(py + ny * step, 2)
+                self.pos = (x, y)
+                return 0
+        return 0
+
+    def finish_moving(self):
+        if self._sub_state == "Mining Block":
+            self.set_state("Mining")
+            self._terrain.claim_tile(self._target, self.id)
+        elif self._sub_state == "Grid Moving":
+            self.set_state("Searching")
+            # keep the wall it walked to, otherwise a miner further away can take it first
             x, y = self._target
-            ore = self._terrain.data[y][x]
-            destroyed = True
-            if ore.health > 0:
-                destroyed = ore.take_damage(self.damage)
-            try:
-                self._terrain.ores_damaged[self._target] = ((ore.health / ore.max_health) * 100, 2.5)
-            except ZeroDivisionError:
-                self._terrain.ores_damaged[self._target] = ((0, 0.0))
-            if destroyed:
+            if x is not None and not self._terrain.grid.is_floor(x, y) and self._terrain.tile_health(self._target) > 0:
+                self._terrain.claim_tile(self._target, self.id)
+
+    def mine(self, dt) -> float:
+        # the cooldown carries over from hit to hit, so a cooldown shorter than the tick lands
+        # several hits in it, returns the part of dt left after the target broke
+        self.cd_timer -= dt
+        while self.cd_timer <= 0:
+            if self.strike(dt):
+                remaining = -self.cd_timer
+                self.cd_timer = self.mine_cd # the next wall starts with a full cooldown
                 self._path = [self._target]  # Move into the mined tile
-                self._state = "Moving"
-                self._sub_state = "Grid Moving"
-            self.cd_timer = self.mine_cd
-        else:
-            self.cd_timer = max(0, self.cd_timer - dt)
-
+                self.set_state("Moving", "Grid Moving")
+                return remaining
+            self.cd_timer += max(self.mine_cd, MIN_MINE_CD)
+        return 0
+
+    def strike(self, dt) -> bool:
+        # one hit on the target, returns True once it is broken
+        health = self._terrain.tile_health(self._target)
+        if health > 0:
+            health = self._terrain.damage_tile(self._target, self.effective_damage)
+        return health <= 0
         
 
     def choose_mining_direction(self):
-        import random
+        from src.game.ores import NEIGHBOR_STEPS4, IS_WALL, tile_key
         x, y = self.grid_pos
+        grid = self._terrain.grid
+        key = tile_key(x, y)
         candidates = []
 
-        # Gather all adjacent non-floor tiles
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nx, ny = x + dx, y + dy
-            if (
-                0 <= nx < self._terrain.grid_size and
-                0 <= ny < self._terrain.grid_size and
-                self._terrain.data[ny][nx].type != self._terrain.terrain_types.Floor
-            ):
-                candidates.append(((nx, ny), (dx, dy)))
+        # Gather all adjacent non-floor tiles no other miner has claimed
+        claims = self._terrain.tile_claims
+        for offset, dx, dy in NEIGHBOR_STEPS4:
+            if IS_WALL[grid.value_at(key + offset)] and claims.get((x + dx, y + dy), self.id) == self.id:
+                candidates.append(((x + dx, y + dy), (dx, dy)))
 
         if candidates:
             # Pick one at random
-            target, direction = random.choice(candidates)
+            target, direction = self._terrain.rng.choice(candidates)
             self._path = self.move_to_wall(self.pos, direction)
             self._target = target
-            self._state = "Moving"
-            self._sub_state = "Mining Block"
+            self.set_state("Moving", "Mining Block")
+            self._terrain.claim_tile(target, self.id)
 
         else:
             # No adjacent targets, fallback to BFS
@@ -188,8 +267,7 @@ class Miner():
         return [(x + xdir, y + ydir)]
     
     def passive_chance_roll(self):
-        import random
-        chance = random.random()
+        chance = self._terrain.rng.random()
         if chance <= self.passive_active_chance:
             return True
         return False
@@ -201,51 +279,37 @@ class FireMiner(Miner):
         self.passive_active_chance = 0.3
 
     def activate_passive_ability(self):
-        x, y = self._target
-        possible_targets = [(x + 1, y), (x, y + 1), (x - 1, y), (x, y - 1)]
+        from src.game.ores import NEIGHBORS4, IS_WALL, tile_key, key_to_coord
+        grid = self._terrain.grid
+        target_key = tile_key(*self._target)
         targets = [self._target]
-        for target_x, target_y in possible_targets:
-            if target_x < self._terrain.grid_size and target_y < self._terrain.grid_size:
-                if self._terrain.data[target_y][target_x].type != self._terrain.terrain_types.Floor and \
-                    (target_x, target_y) in self._terrain.visible_tiles:
-                        targets.insert(0, (target_x, target_y))
+        for offset in NEIGHBORS4:
+            if IS_WALL[grid.value_at(target_key + offset)]:
+                coord = key_to_coord(target_key + offset)
+                if coord in self._terrain.visible_tiles:
+                    targets.insert(0, coord)
 
         return targets
 
-    def mine(self, dt):
-        if self.cd_timer <= 0:
-            if self.passive_chance_roll():
-                targets = self.activate_passive_ability()
-            else:
-                targets = [self._target]
-
-            targets_to_animate = []
-
-            for target in targets:
-                x, y = target
-                ore = self._terrain.data[y][x]
-                if ore.health > 0:
-                    if target != self._target:
-                        dmg_factor = 0.1
-                    else:
-                        dmg_factor = 1
-                    destroyed = ore.take_damage(self.damage * dmg_factor)
-                    targets_to_animate.append(target)
-                try:
-                    self._terrain.ores_damaged[target] = ((ore.health / ore.max_health) * 100, 2.5)
-                except ZeroDivisionError:
-                    self._terrain.ores_damaged[target] = ((0, 0.0))
-                    
-            self._terrain._special_gfx_surface.animate_fire(dt, coords=targets_to_animate)
-
-            target_x, target_y = self._target
-            if self._terrain.data[target_y][target_x].health <= 0:
-                self._path = [self._target]  # Move into the mined tile
-                self._state = "Moving"
-                self._sub_state = "Grid Moving"
-            self.cd_timer = self.mine_cd
+    def strike(self, dt) -> bool:
+        if self.passive_chance_roll():
+            targets = self.activate_passive_ability()
         else:
-            self.cd_timer = max(0, self.cd_timer - dt)
+            targets = [self._target]
+
+        targets_to_animate = []
+
+        for target in targets:
+            if self._terrain.tile_health(target) > 0:
+                if target != self._target:
+                    dmg_factor = 0.1
+                else:
+                    dmg_factor = 1
+                self._terrain.damage_tile(target, self.effective_damage * dmg_factor)
+                targets_to_animate.append(target)
+
+        self._terrain.animate_fire(dt, targets_to_animate)
+        return self._terrain.tile_health(self._target) <= 0
 
 class LightningMiner(Miner):
     def __init__(self, terrain):
@@ -253,55 +317,43 @@ class LightningMiner(Miner):
         self.miner_type = "Lightning"
         self.passive_active_chance = 0.3
 
-    def mine(self, dt):
-        if self.cd_timer <= 0:
-            if self.passive_chance_roll():
-                path = self.get_chain_path()
-            else:
-                path = [self._target]
-            path_to_animate = []
-
-            for target in path:
-                x, y = target
-                ore = self._terrain.data[y][x]
-                if ore.health > 0:
-                    if target != self._target:
-                        dmg_factor = 0.1
-                    else:
-                        dmg_factor = 1
-                    destroyed = ore.take_damage(self.damage * dmg_factor)
-                    path_to_animate.append(target)
-                try:
-                    self._terrain.ores_damaged[target] = ((ore.health / ore.max_health) * 100, 2.5)
-                except ZeroDivisionError:
-                    self._terrain.ores_damaged[target] = ((0, 0.0))
-
-            self._terrain._special_gfx_surface.animate_electricity(dt, coords=path_to_animate)
-
-            target_x, target_y = self._target
-            if self._terrain.data[target_y][target_x].health <= 0:
-                self._path = [self._target]  # Move into the mined tile
-                self._state = "Moving"
-                self._sub_state = "Grid Moving"
-            self.cd_timer = self.mine_cd
+    def strike(self, dt) -> bool:
+        if self.passive_chance_roll():
+            path = self.get_chain_path()
         else:
-            self.cd_timer = max(0, self.cd_timer - dt)
+            path = [self._target]
+        path_to_animate = []
+
+        for target in path:
+            if self._terrain.tile_health(target) > 0:
+                if target != self._target:
+                    dmg_factor = 0.1
+                else:
+                    dmg_factor = 1
+                self._terrain.damage_tile(target, self.effective_damage * dmg_factor)
+                path_to_animate.append(target)
+
+        self._terrain.animate_electricity(dt, path_to_animate)
+        return self._terrain.tile_health(self._target) <= 0
 
     
     def get_chain_path(self):
+        from src.game.ores import NEIGHBORS4, IS_WALL, tile_key, key_to_coord
+        grid = self._terrain.grid
         visited = set()
         best_path = []
 
-        def dfs(pos, current_path):
+        def dfs(key, current_path):
             nonlocal best_path
+            pos = key_to_coord(key)
             x, y = pos
 
             if pos in visited:
                 return
             visited.add(pos)
 
-            # Skip if it's a floor tile or not visible
-            if self._terrain.data[y][x].type == self._terrain.terrain_types.Floor or pos not in self._terrain.visible_tiles:
+            # Skip if it's a floor tile or not visible (the border ring never is)
+            if not IS_WALL[grid.value_at(key)] or pos not in self._terrain.visible_tiles:
                 visited.remove(pos)
                 return
 
@@ -320,19 +372,16 @@ class LightningMiner(Miner):
                     return
 
                 # Explore neighbors
-                directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-                import random
-                random.shuffle(directions)
+                directions = list(NEIGHBORS4)
+                self._terrain.rng.shuffle(directions)
 
-                for dx, dy in directions:
-                    nx, ny = x + dx, y + dy
-                    if 0 <= nx < self._terrain.grid_size and 0 <= ny < self._terrain.grid_size:
-                        dfs((nx, ny), current_path)
+                for offset in directions:
+                    dfs(key + offset, current_path)
 
                 current_path.pop()  # Backtrack
             visited.remove(pos)
 
-        dfs(self._target, [])
+        dfs(tile_key(*self._target), [])
         return best_path
 
 class LightMiner(Miner):
@@ -343,17 +392,5 @@ class LightMiner(Miner):
         self.miner_type = "Light"
 
     def handle_passive_ability(self):
-        for miner in Miner.miners:
-            x, y = self.pos
-            other_x, other_y = miner.pos
-            difference_x, difference_y = abs(x - other_x), abs(y - other_y)
-            if difference_x <= self.passive_radius or difference_y <= self.passive_radius:
-                if not miner.light_boosted:
-                    miner.light_boosted = True
-                    if self.boost_type == "Damage":
-                        miner.damage *= 1.2
-            else:
-                miner.damage = miner.original_damage
-                miner.light_boosted = False
-
-            
+        if self.pos is not None and self.boost_type == "Damage":
+            Miner.light_aura.update(Miner.spatial_hash.query(self.pos, self.passive_radius))
@@ -0,0 +1,129 @@
+class OfflineProgressEstimator:
+    """
+    Estimates the gold, tiles and caves cleared over a stretch of idle time in closed form,
+    instead of replaying every tick.
+
+    The analytic model works per mined tile: the ore chances give the expected number of hits
+    (ore health against each miner's damage) and the expected gold of a tile, every hit costs one
+    mine cooldown and every tile costs one step of walking. This ignores passives, cave reveals,
+    searching and miners getting in each other's way, so calibrate() runs a short headless
+    sample with the same stats and stores how far reality is off from the model. Estimating
+    hours of idle time is then a handful of multiplications.
+
+    Offline there is nobody clicking, so the global miner speed boost is taken out of the
+    miners' current speeds.
+    """
+    def __init__(self, terrain, miners):
+        from src.game import Terrain, Miner
+        self.terrain: Terrain = terrain
+        self.miners: list[Miner] = miners
+        self.tile_factor = 1.0 # measured / predicted tiles cleared per second
+        self.gold_factor = 1.0 # measured / predicted gold per second
+        self.cave_transition_time = 255 / 300 # darkening fade, the miners are busy again once it ends
+
+    def expected_tile(self) -> tuple[dict[int: float], float]:
+        """
+        Returns the chance of every ore index being rolled for a revealed tile, and the expected base gold of a tile
+        (before the ore value multiplier).
+        """
+        chances = self.terrain._ore_chances
+        total = sum(chances.values())
+        probabilities = {ore_index: chance / total for ore_index, chance in chances.items()}
+        gold = sum(probability * self.terrain.ore_base_golds[ore_index - 1] for ore_index, probability in probabilities.items())
+        return probabilities, gold
+
+    def predicted_tile_rate(self) -> float:
+        """
+        Tiles per second all miners break according to the analytic model.
+        """
+        import math
+        import src.graphics as gfx
+        from src.game import Miner
+
+        probabilities, _ = self.expected_tile()
+        boost = Miner.global_miner_speed_boost
+        rate = 0.0
+        for miner in self.miners:
+            mine_cd = miner.mine_cd * boost
+            tiles_per_second_walking = miner.movement_speed / boost / gfx.TILE_SIZE * gfx.BASE_FPS # speed is per frame at BASE_FPS
+            hits = sum(probability * math.ceil(self.terrain.ore_base_healths[ore_index - 1] / miner.damage)
+                       for ore_index, probability in probabilities.items())
+            seconds_per_tile = hits * mine_cd + 1 / tiles_per_second_walking
+            rate += 1 / seconds_per_tile
+        return rate
+
+    def calibrate(self, caves: int = 5, seed: int = None):
+        """
+        Runs a short headless simulation with the current luck, ore value and miner stats over a
+        few whole caves (the mining rate changes a lot within one cave), and stores how far its
+        measured rates are from the analytic model.
+
+        The sample has its own random state and the miner class state (the miner list, speed
+        boost and light auras) is put back afterwards, so calibrating leaves the game untouched.
+        """
+        from src.game import HeadlessSimulation, Miner, FireMiner, LightningMiner, LightMiner
+        from src.game.miners import MinerSpatialHash
+
+        boost = Miner.global_miner_speed_boost
+        saved = (Miner.miners, boost, Miner.spatial_hash, Miner.light_aura, Miner.light_boosted_miners)
+        Miner.global_miner_speed_boost = 1 # only during the sample
+        Miner.spatial_hash, Miner.light_aura, Miner.light_boosted_miners = MinerSpatialHash(), set(), set()
+        try:
+            counts = {miner_class: sum(type(miner) is miner_class for miner in self.miners)
+                      for miner_class in (FireMiner, LightningMiner, LightMiner)}
+            simulation = HeadlessSimulation(seed=seed, grid_size=self.terrain.grid_size,
+                                            fire_miners=counts[FireMiner], lightning_miners=counts[LightningMiner],
+                                            light_miners=counts[LightMiner])
+            sample_terrain = simulation.terrain
+            sample_terrain.ore_luck = self.terrain.ore_luck
+            sample_terrain.modify_chances_with_luck()
+            sample_terrain.ore_value_mult = self.terrain.ore_value_mult
+
+            sample_miners = sorted(simulation.miners, key=lambda miner: miner.miner_type)
+            for sample_miner, miner in zip(sample_miners, sorted(self.miners, key=lambda miner: miner.miner_type)):
+                sample_miner.damage = sample_miner.original_damage = miner.damage
+                sample_miner.mine_cd = miner.mine_cd * boost
+                sample_miner.movement_speed = miner.movement_speed / boost
+
+            simulation.run(caves=caves)
+        finally:
+            (Miner.miners, Miner.global_miner_speed_boost, Miner.spatial_hash,
+             Miner.light_aura, Miner.light_boosted_miners) = saved
+
+        # the headless run replaces cleared caves at once, so every second of it was spent mining
+        busy_seconds = simulation.ticks * simulation.tick_length
+        tiles = simulation.caves_cleared * self.terrain.grid_size ** 2
+        predicted_rate = self.predicted_tile_rate()
+        _, tile_gold = self.expected_tile()
+        if predicted_rate > 0 and busy_seconds > 0:
+            self.tile_factor = tiles / busy_seconds / predicted_rate
+            if tile_gold > 0:
+                base_gold = float(simulation.upgrade_manager.gold / self.terrain.ore_value_mult)
+                self.gold_factor = base_gold / busy_seconds / (predicted_rate * tile_gold)
+
+    def estimate(self, seconds: float) -> dict[str: float]:
+        """
+        Expected progress over seconds of idle time.
+
+        Returns:
+            dict[str: float]: 'gold' (a BigNumber), 'tiles' and 'caves' (whole caves cleared) over the duration.
+        """
+        _, tile_gold = self.expected_tile()
+        predicted_rate = self.predicted_tile_rate()
+        tile_rate = predicted_rate * self.tile_factor
+        gold_rate = predicted_rate * tile_gold * self.gold_factor
+        if tile_rate <= 0:
+            return {"gold": 0, "tiles": 0, "caves": 0}
+
+        cave_tiles = self.terrain.grid_size ** 2
+        cave_seconds = cave_tiles / tile_rate + self.cave_transition_time
+        caves = int(seconds // cave_seconds)
+        busy_seconds = seconds - caves * self.cave_transition_time
+        gold = self.terrain.ore_value_mult * (gold_rate * busy_seconds)
+        return {"gold": gold, "tiles": tile_rate * busy_seconds, "caves": caves}
+
+    def apply(self, upgrade_manager, seconds: float) -> dict[str: float]:
+        # credits the estimated gold of the idle time, the current cave is left as it is
+        progress = self.estimate(seconds)
+        upgrade_manager.increment_gold(round(progress["gold"]))
+        return progress
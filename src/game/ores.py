@@ -1,4 +1,7 @@
+from array import array
+from bisect import bisect_left
 from enum import Enum
+from itertools import accumulate
 
 class terrainTypes(Enum):
     Floor = 0
@@ -12,27 +15,394 @@ class terrainTypes(Enum):
     Uranium = 8
     Emberrite = 9
 
+# enum values are contiguous from 0, so a tuple lookup replaces terrainTypes(value)
+TERRAIN_BY_VALUE: tuple[terrainTypes, ...] = tuple(terrainTypes)
+
+class OreSampler:
+    """
+    Precomputed weighted sampler for ore type indexes.
+
+    Keeps the ore indexes and their cumulative weights so a draw is a single bisect
+    instead of summing and scanning the chance table every time. Must be rebuilt
+    whenever the chances change.
+    """
+    def __init__(self, chances: dict[int, float] = None):
+        import random
+        self.rng = random # the global random state unless the terrain was given its own
+        self.ore_indexes: list[int] = []
+        self.cum_weights: list[float] = []
+        self.total = 0
+        if chances:
+            self.rebuild(chances)
+
+    def rebuild(self, chances: dict[int, float]):
+        self.ore_indexes = list(chances.keys())
+        self.cum_weights = list(accumulate(chances.values()))
+        self.total = self.cum_weights[-1] if self.cum_weights else 0
+
+    def sample(self) -> int:
+        if self.total <= 0:
+            return 1 # stone
+        return self.ore_indexes[bisect_left(self.cum_weights, self.rng.random() * self.total)]
+
+    def sample_many(self, amount: int) -> list[int]:
+        """
+        Draws ore indexes for a whole batch of tiles in one call.
+        """
+        if self.total <= 0:
+            return [1] * amount
+        return self.rng.choices(self.ore_indexes, cum_weights=self.cum_weights, k=amount)
+
+
+# 4-bit edge mask of a floor tile, a set bit means the neighbor in that direction is a wall
+EDGE_RIGHT = 1
+EDGE_LEFT = 2
+EDGE_DOWN = 4
+EDGE_UP = 8
+EDGE_BITS: tuple[tuple[str, int], ...] = (("Right", EDGE_RIGHT), ("Left", EDGE_LEFT), ("Down", EDGE_DOWN), ("Up", EDGE_UP))
+# direction names for every possible mask, so renderers never rebuild them
+EDGE_DIRECTIONS: tuple[tuple[str, ...], ...] = tuple(
+    tuple(name for name, bit in EDGE_BITS if mask & bit) for mask in range(16)
+)
+
+# Tiles are addressed by a single integer key in a padded key space: the grid is surrounded by a
+# one tile BORDER sentinel ring, so (x, y) lives at ((y + 1) << KEY_SHIFT) | (x + 1) and every
+# neighbor of an in-bounds tile is a valid key. Neighbor scans just add the offsets below.
+KEY_SHIFT = 16
+KEY_MASK = (1 << KEY_SHIFT) - 1
+ROW = 1 << KEY_SHIFT
+
+# same order as EDGE_BITS, so NEIGHBORS4[i] is the neighbor behind EDGE_BITS[i]
+NEIGHBORS4: tuple[int, ...] = (1, -1, ROW, -ROW) # Right, Left, Down, Up
+NEIGHBORS8: tuple[int, ...] = NEIGHBORS4 + (-ROW - 1, ROW - 1, ROW + 1, -ROW + 1) # + Up Left, Down Left, Down Right, Up Right
+# (offset, dx, dy) for callers that also need the direction of a neighbor
+NEIGHBOR_STEPS4: tuple[tuple[int, int, int], ...] = ((-1, -1, 0), (1, 1, 0), (-ROW, 0, -1), (ROW, 0, 1))
+# (offset, edge bit) pairs for building edge masks
+EDGE_NEIGHBORS: tuple[tuple[int, int], ...] = tuple(zip(NEIGHBORS4, (bit for _, bit in EDGE_BITS)))
+# neighbor offsets by the direction names the sprites use
+ADJACENT_OFFSETS: dict[str, int] = {"Up": -ROW, "Down": ROW, "Right": 1, "Left": -1}
+DIAGONAL_OFFSETS: dict[str, int] = {"Up Right": -ROW + 1, "Up Left": -ROW - 1, "Down Right": ROW + 1, "Down Left": ROW - 1}
+
+BORDER = 255 # type value of the sentinel ring around the grid
+# lookup tables indexed by raw type value, so scans never branch on the sentinel
+IS_WALL = bytes(1 if 0 < value < BORDER else 0 for value in range(256)) # minable, non floor tiles
+IS_FLOOR = bytes(1 if value == 0 else 0 for value in range(256))
+
+def tile_key(x: int, y: int) -> int:
+    return ((y + 1) << KEY_SHIFT) | (x + 1)
+
+def key_to_coord(key: int) -> tuple[int, int]:
+    return (key & KEY_MASK) - 1, (key >> KEY_SHIFT) - 1
+
+CHUNK_SIZE = 32
+CHUNK_SHIFT = 5 # log2(CHUNK_SIZE), turns padded coordinates into chunk coordinates with a shift
+CHUNK_MASK = CHUNK_SIZE - 1
+
+class TerrainChunk:
+    """
+    One CHUNK_SIZE x CHUNK_SIZE block of the padded key space, holding the tile columns
+    (type, health, max_health, gold, destroyed, edges, cave_ids) for that block, indexed by
+    (local_y << CHUNK_SHIFT) | local_x. Tiles of the block outside the grid read as BORDER.
+    """
+    def __init__(self, grid: "OreGrid", chunk_x: int, chunk_y: int):
+        tile_count = CHUNK_SIZE * CHUNK_SIZE
+        self.grid = grid
+        self.types = bytearray(tile_count)
+        self.health = array("d", bytes(8 * tile_count))
+        self.max_health = array("d", bytes(8 * tile_count))
+        self.gold = array("q", bytes(8 * tile_count))
+        self.destroyed = bytearray(tile_count)
+        self.edges = bytearray(tile_count)
+        self.cave_ids = array("I", bytes(4 * tile_count)) # hidden cave floor labels, 0 = none
+        self.reset(chunk_x, chunk_y)
+
+    def reset(self, chunk_x: int, chunk_y: int):
+        """
+        Moves the chunk to a new chunk coordinate and refills its columns in place
+        with the grid's default tile, marking the tiles outside the grid as BORDER.
+        """
+        tile_count = CHUNK_SIZE * CHUNK_SIZE
+        grid = self.grid
+        self.chunk_x, self.chunk_y = chunk_x, chunk_y
+        self.origin = (chunk_x << CHUNK_SHIFT, chunk_y << CHUNK_SHIFT) # in padded coordinates
+        self.types[:] = bytes((grid.fill_type.value,)) * tile_count
+        self.health[:] = array("d", (grid.fill_health,)) * tile_count
+        self.max_health[:] = array("d", (grid.fill_health,)) * tile_count
+        self.gold[:] = array("q", (grid.fill_gold,)) * tile_count
+        self.destroyed[:] = bytes(tile_count)
+        self.edges[:] = bytes(tile_count)
+        self.cave_ids[:] = array("I", bytes(4 * tile_count))
+
+        origin_x, origin_y = self.origin
+        limit = grid.size + 1 # padded coordinate of the far border
+        if origin_x == 0 or origin_y == 0 or origin_x + CHUNK_SIZE > limit or origin_y + CHUNK_SIZE > limit:
+            for local_y in range(CHUNK_SIZE):
+                padded_y = origin_y + local_y
+                for local_x in range(CHUNK_SIZE):
+                    padded_x = origin_x + local_x
+                    if padded_x == 0 or padded_y == 0 or padded_x >= limit or padded_y >= limit:
+                        self.types[(local_y << CHUNK_SHIFT) | local_x] = BORDER
+
+
+class OreGrid:
+    """
+    Chunked structure-of-arrays storage for every tile of the terrain.
+
+    The padded key space (see tile_key) is split into CHUNK_SIZE x CHUNK_SIZE TerrainChunks that
+    are only created the first time a tile inside them is touched, so memory and generation cost
+    follow what has been explored rather than size * size. A chunk generator (see
+    set_chunk_generator) is called for every new chunk to roll its caves. Resetting the grid
+    returns chunks to a pool and reuses their columns, so a new cave does not allocate any
+    per-tile objects.
+
+    Hot loops work on integer keys (value_at, edges_at_key, ...) and step to neighbors with the
+    NEIGHBORS4 / NEIGHBORS8 offsets; the BORDER ring means they never need a bounds check.
+    Callers that still want an object can index the grid with grid[x, y] to get an Ore view.
+    """
+    def __init__(self, size: int, event_handler=None):
+        if size + 2 > KEY_MASK:
+            raise ValueError(f"grid size {size} does not fit in the tile key space")
+        self.size = size
+        self.event_handler = event_handler
+        self.chunks: dict[int: TerrainChunk] = {}
+        self._free_chunks: list[TerrainChunk] = []
+        self._chunk_generator = None
+        self.fill_type: terrainTypes = terrainTypes.Stone
+        self.fill_health = 0
+        self.fill_gold = 0
+
+    def __getitem__(self, coord: tuple[int, int]) -> "Ore":
+        x, y = coord
+        key = tile_key(x, y)
+        return Ore(self.chunk_for(key), (((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK))
+
+    def set_chunk_generator(self, generator):
+        """
+        generator(chunk_x, chunk_y) is called once for every chunk when it is first created,
+        chunk_bounds() gives the grid tiles that chunk covers.
+        """
+        self._chunk_generator = generator
+
+    def chunk_for(self, key: int) -> TerrainChunk:
+        chunk = self.chunks.get(((key >> (KEY_SHIFT + CHUNK_SHIFT)) << KEY_SHIFT) | ((key & KEY_MASK) >> CHUNK_SHIFT))
+        if chunk is None:
+            chunk = self._create_chunk((key & KEY_MASK) >> CHUNK_SHIFT, key >> (KEY_SHIFT + CHUNK_SHIFT))
+        return chunk
+
+    def _create_chunk(self, chunk_x: int, chunk_y: int) -> TerrainChunk:
+        if self._free_chunks:
+            chunk = self._free_chunks.pop()
+            chunk.reset(chunk_x, chunk_y)
+        else:
+            chunk = TerrainChunk(self, chunk_x, chunk_y)
+        self.chunks[(chunk_y << KEY_SHIFT) | chunk_x] = chunk
+        if self._chunk_generator:
+            self._chunk_generator(chunk_x, chunk_y)
+        return chunk
+
+    def chunk_bounds(self, chunk_x: int, chunk_y: int) -> tuple[int, int, int, int]:
+        """
+        Returns the grid tiles (x_start, y_start, x_end, y_end), end exclusive, covered by a chunk.
+        """
+        x_start = max((chunk_x << CHUNK_SHIFT) - 1, 0)
+        y_start = max((chunk_y << CHUNK_SHIFT) - 1, 0)
+        x_end = min(((chunk_x + 1) << CHUNK_SHIFT) - 1, self.size)
+        y_end = min(((chunk_y + 1) << CHUNK_SHIFT) - 1, self.size)
+        return x_start, y_start, x_end, y_end
+
+    def ensure_chunks(self, x1: int, y1: int, x2: int, y2: int):
+        """
+        Creates every chunk overlapping the inclusive tile rectangle (x1, y1) - (x2, y2),
+        clamped to the grid bounds.
+        """
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, self.size - 1), min(y2, self.size - 1)
+        if x1 > x2 or y1 > y2:
+            return
+        for chunk_y in range((y1 + 1) >> CHUNK_SHIFT, ((y2 + 1) >> CHUNK_SHIFT) + 1):
+            for chunk_x in range((x1 + 1) >> CHUNK_SHIFT, ((x2 + 1) >> CHUNK_SHIFT) + 1):
+                if (chunk_y << KEY_SHIFT) | chunk_x not in self.chunks:
+                    self._create_chunk(chunk_x, chunk_y)
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def value_at(self, key: int) -> int:
+        """
+        Raw type value of a tile key, BORDER for the sentinel ring.
+        """
+        chunk = self.chunks.get(((key >> (KEY_SHIFT + CHUNK_SHIFT)) << KEY_SHIFT) | ((key & KEY_MASK) >> CHUNK_SHIFT)) or self.chunk_for(key)
+        return chunk.types[(((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)]
+
+    def type_at(self, x: int, y: int) -> terrainTypes:
+        return TERRAIN_BY_VALUE[self.value_at(tile_key(x, y))]
+
+    def is_floor(self, x: int, y: int) -> bool:
+        return self.value_at(tile_key(x, y)) == 0
+
+    def edges_at_key(self, key: int) -> int:
+        chunk = self.chunk_for(key)
+        return chunk.edges[(((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)]
+
+    def set_edges_at_key(self, key: int, mask: int):
+        chunk = self.chunk_for(key)
+        chunk.edges[(((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)] = mask
+
+    def cave_id_at(self, key: int) -> int:
+        """
+        Id of the hidden cave whose floor covers the tile key, 0 if none. Never creates a chunk,
+        a chunk that does not exist yet has not rolled its caves either.
+        """
+        chunk = self.chunks.get(((key >> (KEY_SHIFT + CHUNK_SHIFT)) << KEY_SHIFT) | ((key & KEY_MASK) >> CHUNK_SHIFT))
+        if chunk is None:
+            return 0
+        return chunk.cave_ids[(((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)]
+
+    def set_cave_ids(self, coords: list[tuple[int, int]], cave_id: int):
+        for x, y in coords:
+            key = tile_key(x, y)
+            chunk = self.chunk_for(key)
+            chunk.cave_ids[(((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)] = cave_id
+
+    def edges_at(self, x: int, y: int) -> int:
+        return self.edges_at_key(tile_key(x, y))
+
+    def fill(self, type: terrainTypes, health, gold):
+        """
+        Resets the grid so every tile reads as the given type, health and gold. Existing chunks
+        go back to the pool and are refilled when they are next needed.
+        """
+        self.fill_type, self.fill_health, self.fill_gold = type, health, gold
+        self._free_chunks.extend(self.chunks.values())
+        self.chunks = {}
+
+    def set_tile(self, x: int, y: int, type: terrainTypes, health, gold):
+        key = tile_key(x, y)
+        chunk = self.chunk_for(key)
+        index = (((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)
+        chunk.types[index] = type.value
+        chunk.health[index] = health
+        chunk.max_health[index] = health
+        chunk.gold[index] = gold
+        chunk.destroyed[index] = 0
+
+    def set_floor(self, x: int, y: int):
+        self.set_tile(x, y, terrainTypes.Floor, 0, 0)
+
+
 class Ore:
-    def __init__(self, type, health, gold, pos, event_handler):
-        from src.game import EventHandler
-        self.type: terrainTypes = type
-        self.max_health: int = health
-        self.health: int = health
-        self.gold: int = gold
-        self.pos = pos
-        self.event_handler: EventHandler = event_handler
-        self.destroyed = False
-
-    def take_damage(self, damage) -> str:
-        self.health -= damage
-        destroyed: str = self.check_status()
-        return destroyed
-
-    def check_status(self) -> str:
-        if self.destroyed:
-            return "Already Destroyed"
-        if self.health <= 0:
-            self.event_handler.call_tile_broken(self.pos, gold_amount=self.gold)
-            self.destroyed = True
-            return "Destroyed"
-        return "Alive"
\ No newline at end of file
+    """
+    Thin view over a single tile of a TerrainChunk, keeping the attribute interface
+    the rest of the game used when every tile was its own object.
+    """
+    __slots__ = ("_chunk", "_index")
+
+    def __init__(self, chunk: TerrainChunk, index: int):
+        self._chunk = chunk
+        self._index = index
+
+    def __eq__(self, other):
+        if not isinstance(other, Ore):
+            return NotImplemented
+        return self._chunk is other._chunk and self._index == other._index and self.type == other.type
+
+    def __hash__(self):
+        return hash((id(self._chunk), self._index))
+
+    @property
+    def type(self) -> terrainTypes:
+        return TERRAIN_BY_VALUE[self._chunk.types[self._index]]
+
+    @property
+    def health(self) -> float:
+        return self._chunk.health[self._index]
+
+    @health.setter
+    def health(self, value):
+        self._chunk.health[self._index] = value
+
+    @property
+    def max_health(self) -> float:
+        return self._chunk.max_health[self._index]
+
+    @property
+    def gold(self) -> int:
+        return self._chunk.gold[self._index]
+
+    @gold.setter
+    def gold(self, value):
+        self._chunk.gold[self._index] = value
+
+    @property
+    def pos(self) -> tuple[int, int]:
+        origin_x, origin_y = self._chunk.origin
+        return origin_x + (self._index & CHUNK_MASK) - 1, origin_y + (self._index >> CHUNK_SHIFT) - 1
+
+    @property
+    def destroyed(self) -> bool:
+        return bool(self._chunk.destroyed[self._index])
+
+    @property
+    def event_handler(self):
+        return self._chunk.grid.event_handler
+
+
+class DamageBuffer:
+    """
+    Damage dealt to tiles during one simulation tick, keyed by tile.
+
+    A hit only updates the buffered health of its tile, so any number of hits on a tile (splash,
+    lightning chains, several miners on one wall) cost one dict update each and miners hitting
+    the tile later in the tick already see the damage of the earlier hits. resolve() writes the
+    health of every hit tile back into its chunk in one pass, marks the tiles that broke and
+    hands them back together with their total gold, so a tick ends with a single break and
+    gold notification however many tiles broke.
+    """
+    def __init__(self):
+        self.healths: dict[int: float] = {} # tile key -> health after this tick's hits
+
+    def reset(self):
+        self.healths = {}
+
+    def __len__(self):
+        return len(self.healths)
+
+    def health_at(self, grid: OreGrid, key: int) -> float:
+        health = self.healths.get(key)
+        if health is None:
+            health = grid.chunk_for(key).health[(((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)]
+        return health
+
+    def add(self, grid: OreGrid, key: int, damage: float) -> float:
+        """
+        Buffers damage on the tile key and returns the health the tile is left with.
+        """
+        health = self.health_at(grid, key) - damage
+        self.healths[key] = health
+        return health
+
+    def resolve(self, grid: OreGrid) -> tuple[dict[tuple[int, int]: float], list[tuple[int, int]], int]:
+        """
+        Applies the buffered damage to grid and empties the buffer.
+
+        Returns:
+            tuple[dict[tuple[int, int]: float], list[tuple[int, int]], int]: The health percentage
+            of every hit tile (None for tiles without health), the tiles broken this tick and the
+            gold they give.
+        """
+        health_percents = {}
+        broken = []
+        gold = 0
+        for key, health in self.healths.items():
+            chunk = grid.chunk_for(key)
+            index = (((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)
+            chunk.health[index] = health
+            max_health = chunk.max_health[index]
+            coord = key_to_coord(key)
+            health_percents[coord] = (health / max_health) * 100 if max_health else None
+            if health <= 0 and not chunk.destroyed[index]:
+                chunk.destroyed[index] = 1
+                broken.append(coord)
+                gold += chunk.gold[index]
+        self.reset()
+        return health_percents, broken, gold
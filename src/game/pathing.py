@@ -0,0 +1,300 @@
+class DistanceField:
+    """
+    Shared multi-source distance map over the floor of the cave.
+
+    Every floor tile key maps to the number of steps to the nearest minable wall, so the
+    floor tiles next to a wall hold 1. All miners read the same field: a miner that has no
+    wall next to it follows the gradient down to a wall in O(path length) instead of running
+    its own breadth first search.
+
+    Breaking tiles only ever turns walls into floor, so distances can only grow. break_tiles()
+    repairs the field incrementally: it drops every tile whose distance could have been routed
+    through a broken wall and rebuilds just that region from its untouched border.
+    """
+    def __init__(self):
+        self.distances: dict[int: int] = {}
+
+    def reset(self):
+        self.distances = {}
+
+    def break_tiles(self, grid, keys: list[int]):
+        """
+        Updates the field after the tiles at keys (walls until now) were made floor in grid.
+        """
+        import heapq
+        from src.game.ores import NEIGHBORS4, IS_WALL
+
+        distances = self.distances
+
+        # Tiles whose distance may have depended on a broken wall, following strictly
+        # increasing distances away from it. The broken tiles count as distance 0.
+        invalid = set(keys)
+        stack = [(key, 0) for key in keys]
+        while stack:
+            key, distance = stack.pop()
+            for offset in NEIGHBORS4:
+                neighbor = key + offset
+                if neighbor not in invalid and distances.get(neighbor) == distance + 1:
+                    invalid.add(neighbor)
+                    stack.append((neighbor, distance + 1))
+
+        # Seed the invalid region from its walls and from the valid floor around it.
+        heap = []
+        for key in invalid:
+            distances.pop(key, None)
+        for key in invalid:
+            best = None
+            for offset in NEIGHBORS4:
+                neighbor = key + offset
+                if IS_WALL[grid.value_at(neighbor)]:
+                    best = 1
+                    break
+                distance = distances.get(neighbor)
+                if distance is not None and (best is None or distance + 1 < best):
+                    best = distance + 1
+            if best is not None:
+                heap.append((best, key))
+        heapq.heapify(heap)
+
+        # Rebuild the region, nothing outside it can get closer to a wall.
+        while heap:
+            distance, key = heapq.heappop(heap)
+            if key in distances:
+                continue
+            distances[key] = distance
+            for offset in NEIGHBORS4:
+                neighbor = key + offset
+                if neighbor in invalid and neighbor not in distances:
+                    heapq.heappush(heap, (distance + 1, neighbor))
+
+    def distance_at(self, key: int):
+        """
+        Steps from the floor tile key to the nearest wall, None if no wall can be reached.
+        """
+        return self.distances.get(key)
+
+    def path_to_wall(self, grid, key: int, skip=None):
+        """
+        Follows the gradient from the floor tile key to the closest wall. Walls whose coordinate
+        is in skip (e.g. tiles claimed by other miners) are passed over: every downhill route is
+        tried first, and if all the walls they lead to are skipped the floor is searched outwards
+        for the closest wall that is not.
+
+        Returns:
+            tuple[list[tuple[int, int]], tuple[int, int]] or None: The floor tiles to walk
+            through (excluding the start) and the wall to mine next to the last of them,
+            None if no wall can be reached.
+        """
+        from collections import deque
+        from src.game.ores import NEIGHBORS4, IS_WALL, IS_FLOOR, key_to_coord
+
+        def route(parents, current, wall):
+            path = []
+            while current != key:
+                path.append(key_to_coord(current))
+                current = parents[current]
+            path.reverse()
+            return path, wall
+
+        distances = self.distances
+        if distances.get(key) is None:
+            return None
+
+        # breadth first over downhill steps only, so every route found is a shortest one
+        parents = {key: None}
+        queue = deque((key,))
+        while queue:
+            current = queue.popleft()
+            distance = distances[current]
+            if distance == 1:
+                for offset in NEIGHBORS4:
+                    if IS_WALL[grid.value_at(current + offset)]:
+                        wall = key_to_coord(current + offset)
+                        if not skip or wall not in skip:
+                            return route(parents, current, wall)
+                continue
+            for offset in NEIGHBORS4:
+                neighbor = current + offset
+                if neighbor not in parents and distances.get(neighbor) == distance - 1:
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+        if not skip:
+            return None
+
+        # every closest wall is skipped, widen to breadth first over the whole floor
+        parents = {key: None}
+        queue = deque((key,))
+        while queue:
+            current = queue.popleft()
+            for offset in NEIGHBORS4:
+                neighbor = current + offset
+                value = grid.value_at(neighbor)
+                if IS_WALL[value]:
+                    wall = key_to_coord(neighbor)
+                    if wall not in skip:
+                        return route(parents, current, wall)
+                elif IS_FLOOR[value] and neighbor not in parents:
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+        return None
+
+
+class Frontier:
+    """
+    Index of the frontier: every wall tile with a floor tile right next to it, i.e. every tile a
+    miner can mine without breaking anything else first.
+
+    Tiles are kept in a set for membership and iteration (UI, analytics) and are also bucketed
+    into BUCKET_SIZE x BUCKET_SIZE blocks, so spatial queries only look at the buckets around the
+    query point instead of the whole frontier. Every tile's gold per point of health is cached
+    when it joins and refreshed when ores are rolled on it (refresh). Ore value upgrades scale
+    all gold alike, so they never change which tile is best.
+
+    Miners keep targeting through the DistanceField, whose routes respect walls; the frontier
+    answers the straight-line questions (nearest(), most_valuable()) in time that follows the
+    buckets around the query point, not the size of the cave.
+    """
+    BUCKET_SHIFT = 3
+    BUCKET_SIZE = 1 << BUCKET_SHIFT
+
+    def __init__(self):
+        self.keys: set[int] = set()
+        self.values: dict[int: float] = {} # key -> gold per point of health
+        self.buckets: dict[int: set[int]] = {}
+
+    def reset(self):
+        self.keys = set()
+        self.values = {}
+        self.buckets = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, coord: tuple[int, int]):
+        from src.game.ores import tile_key
+        return tile_key(*coord) in self.keys
+
+    def _bucket_of(self, key: int) -> int:
+        from src.game.ores import KEY_SHIFT, KEY_MASK
+        shift = self.BUCKET_SHIFT
+        return (((key >> KEY_SHIFT) >> shift) << KEY_SHIFT) | ((key & KEY_MASK) >> shift)
+
+    @staticmethod
+    def _value_of(grid, key: int) -> float:
+        from src.game.ores import KEY_SHIFT, CHUNK_SHIFT, CHUNK_MASK
+        chunk = grid.chunk_for(key)
+        index = (((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)
+        max_health = chunk.max_health[index]
+        return chunk.gold[index] / max_health if max_health > 0 else 0
+
+    def add(self, grid, key: int):
+        if key not in self.keys:
+            self.keys.add(key)
+            self.values[key] = self._value_of(grid, key)
+            self.buckets.setdefault(self._bucket_of(key), set()).add(key)
+
+    def discard(self, key: int):
+        if key in self.keys:
+            self.keys.discard(key)
+            del self.values[key]
+            bucket_key = self._bucket_of(key)
+            bucket = self.buckets[bucket_key]
+            bucket.discard(key)
+            if not bucket:
+                del self.buckets[bucket_key]
+
+    def break_tiles(self, grid, keys: list[int]):
+        """
+        Updates the frontier after the tiles at keys (walls until now) were made floor in grid:
+        they leave the frontier and the walls around them join it.
+        """
+        from src.game.ores import NEIGHBORS4, IS_WALL
+        for key in keys:
+            self.discard(key)
+        for key in keys:
+            for offset in NEIGHBORS4:
+                if IS_WALL[grid.value_at(key + offset)]:
+                    self.add(grid, key + offset)
+
+    def refresh(self, grid, coords: list[tuple[int, int]]):
+        # ores were rolled on coords, the cached values of those in the frontier are out of date
+        from src.game.ores import tile_key
+        for x, y in coords:
+            key = tile_key(x, y)
+            if key in self.keys:
+                self.values[key] = self._value_of(grid, key)
+
+    def coords(self) -> list[tuple[int, int]]:
+        from src.game.ores import key_to_coord
+        return [key_to_coord(key) for key in self.keys]
+
+    def nearest(self, coord: tuple[int, int], skip=None):
+        """
+        Returns the frontier tile closest (straight line) to coord, searching outwards ring by
+        ring of buckets until no closer tile can exist. Coordinates in skip (e.g. tiles claimed
+        by miners) are ignored, ties go to the tile with the lowest key.
+
+        Returns:
+            tuple[int, int] or None: Coordinate of the closest frontier tile, None if there is none.
+        """
+        from src.game.ores import KEY_SHIFT, KEY_MASK, key_to_coord
+        if not self.keys:
+            return None
+
+        shift, size = self.BUCKET_SHIFT, self.BUCKET_SIZE
+        origin_x, origin_y = coord[0] + 1, coord[1] + 1 # padded like the keys, coord may lie off the grid
+        bucket_x, bucket_y = origin_x >> shift, origin_y >> shift
+        max_ring = max(max(abs((bucket_key & KEY_MASK) - bucket_x), abs((bucket_key >> KEY_SHIFT) - bucket_y))
+                       for bucket_key in self.buckets)
+        best, best_distance = None, None
+
+        for ring in range(max_ring + 1):
+            # every tile in this ring is at least this far away on one axis
+            lower_bound = max(0, (ring - 1) * size + 1)
+            if best is not None and lower_bound * lower_bound > best_distance:
+                break
+            for ring_y in range(bucket_y - ring, bucket_y + ring + 1):
+                step = 1 if ring_y in (bucket_y - ring, bucket_y + ring) else 2 * ring
+                for ring_x in range(bucket_x - ring, bucket_x + ring + 1, max(step, 1)):
+                    bucket = self.buckets.get((ring_y << KEY_SHIFT) | ring_x) if ring_x >= 0 and ring_y >= 0 else None
+                    if not bucket:
+                        continue
+                    for key in bucket:
+                        if skip and key_to_coord(key) in skip:
+                            continue
+                        dx, dy = (key & KEY_MASK) - origin_x, (key >> KEY_SHIFT) - origin_y
+                        distance = dx * dx + dy * dy
+                        if best is None or distance < best_distance or (distance == best_distance and key < best):
+                            best, best_distance = key, distance
+
+        return key_to_coord(best) if best is not None else None
+
+    def most_valuable(self, coord: tuple[int, int], radius: int, skip=None):
+        """
+        Returns the frontier tile within radius (straight line) of coord that gives the most gold
+        per point of health. Coordinates in skip are ignored, ties go to the tile with the lowest key.
+
+        Returns:
+            tuple[int, int] or None: Coordinate of the best frontier tile, None if none is in range.
+        """
+        from src.game.ores import KEY_SHIFT, KEY_MASK, key_to_coord
+        shift = self.BUCKET_SHIFT
+        origin_x, origin_y = coord[0] + 1, coord[1] + 1 # padded like the keys, coord may lie off the grid
+        radius_squared = radius * radius
+        values = self.values
+        best, best_value = None, None
+
+        for bucket_y in range(max(origin_y - radius, 0) >> shift, ((origin_y + radius) >> shift) + 1):
+            for bucket_x in range(max(origin_x - radius, 0) >> shift, ((origin_x + radius) >> shift) + 1):
+                bucket = self.buckets.get((bucket_y << KEY_SHIFT) | bucket_x)
+                if not bucket:
+                    continue
+                for key in bucket:
+                    dx, dy = (key & KEY_MASK) - origin_x, (key >> KEY_SHIFT) - origin_y
+                    if dx * dx + dy * dy > radius_squared or (skip and key_to_coord(key) in skip):
+                        continue
+                    value = values[key]
+                    if best is None or value > best_value or (value == best_value and key < best):
+                        best, best_value = key, value
+
+        return key_to_coord(best) if best is not None else None
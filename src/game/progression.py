@@ -1,9 +1,65 @@
+from math import ceil, log10
+
+# Upgrade tuning: the price curve of every upgrade and how much one level multiplies.
+# The upgrade buttons and their price labels read these.
+ORE_LUCK_COST_BASE = 50
+ORE_LUCK_COST_GROWTH = 1.35
+ORE_LUCK_MULTIPLIER = 1.25
+ORE_VALUE_COST_BASE = 100
+ORE_VALUE_COST_GROWTH = 1.6 # each level multiplies all gold, so the price has to outgrow it
+ORE_VALUE_MULTIPLIER = 1.5
+
+
+class UpgradeCost:
+    """
+    Geometric cost curve of a levelled upgrade: level n costs base * growth ** n gold.
+
+    Buying several levels is a geometric series, so both the price of any number of levels
+    and the number of levels a budget buys are closed-form expressions, however many levels
+    are bought at once. Prices are BigNumbers, past a few hundred levels they outgrow floats.
+    """
+    def __init__(self, base: float, growth: float):
+        self.base = base
+        self.growth = growth
+
+    def cost(self, level: int, amount: int = 1):
+        """
+        Gold needed to buy amount levels on top of level.
+        """
+        from src.game import BigNumber
+        if amount <= 0:
+            return BigNumber(0)
+        growth = BigNumber(self.growth)
+        return ceil(self.base * growth ** level * (growth ** amount - 1) / (self.growth - 1))
+
+    def max_affordable(self, level: int, gold) -> int:
+        """
+        Largest amount of levels on top of level that gold pays for.
+        """
+        from src.game import BigNumber
+        growth = self.growth
+        first = self.base * BigNumber(growth) ** level
+        if gold < first:
+            return 0
+        amount = int((gold * (growth - 1) / first + 1).log10() / log10(growth))
+        # the logarithm can land one level off either way
+        while amount > 0 and self.cost(level, amount) > gold:
+            amount -= 1
+        while self.cost(level, amount + 1) <= gold:
+            amount += 1
+        return amount
+
+
 class UpgradesManager:
     def __init__(self, terrain, gold: int = 0, ore_luck: int = 1, ore_value: int = 1):
-        from src.game import Miner, Terrain
-        self.gold = gold
+        from src.game import Miner, Terrain, BigNumber
+        self.gold = BigNumber(gold)
         self.ore_luck = ore_luck
-        self.ore_value = ore_value
+        self.ore_value = BigNumber(ore_value)
+        self.ore_luck_level = 0
+        self.ore_value_level = 0
+        self.ore_luck_cost = UpgradeCost(base=ORE_LUCK_COST_BASE, growth=ORE_LUCK_COST_GROWTH)
+        self.ore_value_cost = UpgradeCost(base=ORE_VALUE_COST_BASE, growth=ORE_VALUE_COST_GROWTH)
         self.miners: dict[int: Miner] = None
         self.terrain: Terrain = terrain
         self.miner_speed_click_increase = 0.1
@@ -14,29 +70,54 @@ class UpgradesManager:
         self.decay_rate_timer = self.decay_rate
 
     def increment_gold(self, amount):
-        self.gold += amount
+        self.gold = self.gold + amount
 
     def set_miners(self, miners):
         self.miners = miners
 
-    def increment_ore_luck(self, amount):
-        self.ore_luck *= amount
+    def increment_ore_luck(self, amount, levels: int = 1):
+        # any number of levels is a single multiplication and one rebuild of the chances
+        self.ore_luck *= amount ** levels
         self.terrain.ore_luck = self.ore_luck
         self.terrain.modify_chances_with_luck()
 
-    def increment_ore_value(self, amount):
-        self.ore_value *= amount
+    def increment_ore_value(self, amount, levels: int = 1):
+        # tiles keep their base gold, the multiplier is applied when they pay out
+        from src.game import BigNumber
+        self.ore_value = self.ore_value * BigNumber(amount) ** levels
         self.terrain.ore_value_mult = self.ore_value
-        self.terrain.create_ore_golds()
-        for coord in self.terrain.visible_tiles:
-            x, y = coord
-            ore = self.terrain.data[y][x]
-            ore.gold = self.terrain.get_ore_gold(ore.type)
+
+    def buy_ore_luck(self, amount, levels: int = None) -> int:
+        """
+        Buys levels of ore luck (as many as the gold pays for when levels is None) and applies
+        them in one step. Returns the number of levels bought, none if they cannot be afforded.
+        """
+        levels = self.levels_to_buy(self.ore_luck_cost, self.ore_luck_level, levels)
+        if levels:
+            self.gold -= self.ore_luck_cost.cost(self.ore_luck_level, levels)
+            self.ore_luck_level += levels
+            self.increment_ore_luck(amount, levels)
+        return levels
+
+    def buy_ore_value(self, amount, levels: int = None) -> int:
+        # see buy_ore_luck
+        levels = self.levels_to_buy(self.ore_value_cost, self.ore_value_level, levels)
+        if levels:
+            self.gold -= self.ore_value_cost.cost(self.ore_value_level, levels)
+            self.ore_value_level += levels
+            self.increment_ore_value(amount, levels)
+        return levels
+
+    def levels_to_buy(self, upgrade_cost: UpgradeCost, level: int, levels: int = None) -> int:
+        if levels is None:
+            return upgrade_cost.max_affordable(level, self.gold)
+        return levels if upgrade_cost.cost(level, levels) <= self.gold else 0
 
     def upgrade_miner_speed(self, id, amount):
         from src.game import Miner
         miner: Miner = self.miners[id]
         miner.movement_speed += amount
+        miner.sync_engine()
 
     def upgrade_pickaxe_strength(self, id, amount):
         from src.game import Miner
@@ -0,0 +1,155 @@
+import pygame as pg
+
+# held keys main.py reads every frame, other keys never change the game
+WATCHED_KEYS = (pg.K_LEFT, pg.K_RIGHT, pg.K_PERIOD, pg.K_w, pg.K_a, pg.K_s, pg.K_d, pg.K_q)
+TRACE_VERSION = 2
+
+
+def encode_game_event(event) -> list:
+    # compact, comparable form of a dispatched GameEvent
+    from src.game import GameEvents, BigNumber
+    if event.type == GameEvents.TILE_BROKEN:
+        return [event.type.value, int(event.initialization), [value for position in event.positions for value in position]]
+    values = [getattr(event, name) for name in ("amount", "multiplier", "levels") if hasattr(event, name)]
+    return [event.type.value] + [list(value.as_tuple()) if isinstance(value, BigNumber) else value for value in values]
+
+
+class ReplayKeys:
+    # stands in for pg.key.get_pressed() during a replay
+    def __init__(self, pressed: list[int]):
+        self.pressed = set(pressed)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+
+class TraceRecorder:
+    """
+    Records a session so it can be replayed as an identical workload.
+
+    The trace is gzip compressed JSON lines: a header with the random seed the game was started
+    with, then one line per frame with the frame time, the held keys main.py reads, the mouse
+    position, the input events (clicks and quitting) and the game events dispatched during the
+    frame. Given the seed and the frame times and input, the game replays exactly, the game
+    events are kept so a replay can check it did not diverge.
+    """
+    def __init__(self, path: str, seed: int, tick_rate: int):
+        import gzip
+        import json
+        self.file = gzip.open(path, "wt")
+        self.file.write(json.dumps({"version": TRACE_VERSION, "seed": seed, "tick_rate": tick_rate}) + "\n")
+        self.frame: list = None
+        self.frames = 0
+
+    def attach(self, bus):
+        for event in bus.subscribers:
+            bus.subscribe(event, self.on_game_event)
+
+    def on_game_event(self, event):
+        if self.frame is not None:
+            self.frame[4].append(encode_game_event(event))
+
+    def record_frame(self, dt: float, input_events: list, keys, mouse_pos: tuple[int, int]):
+        # called at the start of every frame with everything the frame will read
+        self.flush_frame()
+        events = []
+        for event in input_events:
+            if event.type == pg.QUIT:
+                events.append([pg.QUIT])
+            elif event.type == pg.MOUSEBUTTONDOWN:
+                events.append([pg.MOUSEBUTTONDOWN, event.button, *event.pos])
+        pressed = [key for key in WATCHED_KEYS if keys[key]]
+        self.frame = [dt, pressed, list(mouse_pos), events, []]
+
+    def flush_frame(self):
+        import json
+        if self.frame is not None:
+            self.file.write(json.dumps(self.frame, separators=(",", ":")) + "\n")
+            self.frames += 1
+            self.frame = None
+
+    def close(self):
+        self.flush_frame()
+        self.file.close()
+
+
+class TracePlayer:
+    """
+    Feeds a recorded trace back into the game loop at full speed, frame by frame, and checks
+    the game events produced against the recorded ones. Reading the seed from the header has to
+    happen before the game is built, attach() subscribes to the bus once it exists.
+
+    report() gives the frame time statistics of the replay, which is what two builds are
+    compared on, and the first frame whose game events differed from the recording (None if
+    the replay matched).
+    """
+    def __init__(self, path: str):
+        import gzip
+        import json
+        self.file = gzip.open(path, "rt")
+        header = json.loads(self.file.readline())
+        if header.get("version") != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version {header.get('version')} in {path}")
+        self.seed: int = header["seed"]
+        self.tick_rate: int = header["tick_rate"]
+        self.frames = 0
+        self.frame_times: list[float] = []
+        self.diverged_at: int = None
+        self._expected: list = None
+        self._produced: list = []
+        self._frame_start: float = None
+
+    def attach(self, bus):
+        for event in bus.subscribers:
+            bus.subscribe(event, self.on_game_event)
+
+    def on_game_event(self, event):
+        self._produced.append(encode_game_event(event))
+
+    def check_frame(self):
+        if self._expected is not None and self.diverged_at is None and self._produced != self._expected:
+            self.diverged_at = self.frames
+        self._produced = []
+
+    def next_frame(self):
+        """
+        Returns the next frame's (dt, input events, held keys, mouse position), None at the end of the trace.
+        """
+        import json
+        import time
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append(now - self._frame_start)
+        self._frame_start = now
+        self.check_frame()
+
+        line = self.file.readline()
+        if not line:
+            self._expected = None
+            return None
+        dt, pressed, mouse_pos, events, self._expected = json.loads(line)
+        self.frames += 1
+        input_events = []
+        for event in events:
+            if event[0] == pg.MOUSEBUTTONDOWN:
+                input_events.append(pg.event.Event(pg.MOUSEBUTTONDOWN, {"button": event[1], "pos": (event[2], event[3])}))
+            else:
+                input_events.append(pg.event.Event(event[0]))
+        return dt, input_events, ReplayKeys(pressed), tuple(mouse_pos)
+
+    def close(self):
+        self.check_frame() # the last frame when the replay was quit early
+        self.file.close()
+
+    def report(self) -> dict:
+        frame_times = sorted(self.frame_times)
+        total = sum(frame_times)
+        count = len(frame_times)
+        return {
+            "frames": self.frames,
+            "seconds": total,
+            "mean_frame_ms": total / count * 1000 if count else 0,
+            "p95_frame_ms": frame_times[int(count * 0.95)] * 1000 if count else 0,
+            "max_frame_ms": frame_times[-1] * 1000 if count else 0,
+            "diverged_at": self.diverged_at,
+        }
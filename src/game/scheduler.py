@@ -0,0 +1,88 @@
+class MinerScheduler:
+    """
+    Event-driven alternative to polling every miner on every tick, used by
+    Terrain.miner_decision_make when set.
+
+    Miners sit in a heap of (next wake tick, miner order, miner). A mining miner sleeps through
+    its whole cooldown and wakes on the tick it would have hit, a walking miner wakes every tick,
+    and a searching miner that found nothing sleeps until new walls are revealed or a claimed
+    wall is given up (wake_sleeping). A wall given up mid tick wakes the sleepers after the miner
+    that gave it up within the same tick, the way polling would reach them, so due miners act in
+    the same order and with the same cooldowns as when polled, and a run gives the same result.
+    The work per tick follows the number of miners acting, not the number of miners.
+    """
+    def __init__(self):
+        self.tick_count = 0
+        self.dt = 0
+        self.queue: list[tuple[int, int, object]] = []
+        self.sleeping: list[tuple[int, object]] = [] # searching miners waiting for the terrain to change
+        self.cooling: dict[object: int] = {} # mining miner -> tick it went to sleep on, its cooldown is behind
+        self._acted = []
+
+    def load(self, miners):
+        import heapq
+        # cooldowns carry over into the next cave, bring the sleeping ones up to date first
+        for miner, since in self.cooling.items():
+            self.count_down(miner, self.tick_count - since)
+        self.queue = [(self.tick_count + 1, order, miner) for order, miner in enumerate(miners)]
+        heapq.heapify(self.queue)
+        self.sleeping = []
+        self.cooling = {}
+        self._acted = []
+
+    def wake_sleeping(self, after_order: int = None):
+        # sleepers after after_order in the miner order still get their turn this tick
+        import heapq
+        for order, miner in self.sleeping:
+            wake_tick = self.tick_count if after_order is not None and order > after_order else self.tick_count + 1
+            heapq.heappush(self.queue, (wake_tick, order, miner))
+        self.sleeping = []
+
+    def count_down(self, miner, ticks: int):
+        # one subtraction per tick like polling does, so the cooldown ends up the same to the bit
+        dt = self.dt
+        for _ in range(ticks):
+            miner.cd_timer -= dt
+
+    def tick(self, dt, walls_freed=None):
+        """
+        Runs every miner that is due this tick. walls_freed is called after each of them and
+        returns whether a wall was given up since the last call, which wakes the sleepers.
+        """
+        import heapq
+        self.tick_count += 1
+        self.dt = dt
+        queue = self.queue
+
+        # miners that acted last tick stop interpolating, everyone else has not moved since
+        for miner in self._acted:
+            miner.prev_pos = miner.pos
+        acted = []
+
+        while queue and queue[0][0] <= self.tick_count:
+            _, order, miner = heapq.heappop(queue)
+            since = self.cooling.pop(miner, None)
+            if since is not None:
+                self.count_down(miner, self.tick_count - since - 1)
+            miner.decision_make(dt)
+            acted.append(miner)
+            self.schedule(order, miner, dt)
+            if walls_freed is not None and walls_freed() and self.sleeping:
+                self.wake_sleeping(order)
+        self._acted = acted
+
+    def schedule(self, order: int, miner, dt):
+        import heapq
+        if miner._state == "Mining" and miner.cd_timer > dt:
+            # polling would count the cooldown down one tick at a time and hit on the tick it runs
+            # out, the ticks slept through are counted down when the miner wakes
+            ticks, cd_timer = 1, miner.cd_timer
+            while cd_timer > dt:
+                cd_timer -= dt
+                ticks += 1
+            self.cooling[miner] = self.tick_count
+            heapq.heappush(self.queue, (self.tick_count + ticks, order, miner))
+        elif miner._state == "Searching": # looked around and found nothing
+            self.sleeping.append((order, miner))
+        else:
+            heapq.heappush(self.queue, (self.tick_count + 1, order, miner))
@@ -0,0 +1,93 @@
+class HeadlessSimulation:
+    """
+    Runs the game simulation (terrain, caves, miners and upgrades) without a display or any
+    surfaces, as fast as the CPU allows. Used for balance runs and performance checks.
+
+    Events are handled like in main.py minus the rendering: a cleared cave is replaced at once
+    instead of after the screen fade.
+
+    engine picks what drives the miners each tick: "scheduler" (MinerScheduler, the default),
+    "columns" (MinerEngine) or "polling" (decision_make on every miner).
+    """
+    ENGINES = ("scheduler", "columns", "polling")
+
+    def __init__(self, seed: int = None, tick_rate: int = 60, grid_size: int = None,
+                 fire_miners: int = 3, lightning_miners: int = 3, light_miners: int = 3, engine: str = "scheduler"):
+        import random
+        from src.game import Terrain, EventHandler, Miner, FireMiner, LightningMiner, LightMiner, UpgradesManager, MinerEngine, MinerScheduler
+
+        if engine not in self.ENGINES:
+            raise ValueError(f"unknown miner engine {engine!r}, expected one of {', '.join(self.ENGINES)}")
+
+        self.rng = random.Random(seed) # its own random state, running a simulation leaves the game's alone
+        self.tick_length = 1 / tick_rate
+        self.ticks = 0
+        self.caves_cleared = 0
+        self._clearing = False
+
+        self.terrain = Terrain()
+        self.terrain.set_rng(self.rng)
+        if grid_size:
+            self.terrain.grid_size = grid_size
+            self.terrain._cave_helper.grid_size = grid_size
+        self.upgrade_manager = UpgradesManager(self.terrain)
+
+        self.miners = []
+        for amount, miner_class in ((fire_miners, FireMiner), (lightning_miners, LightningMiner), (light_miners, LightMiner)):
+            for i in range(amount):
+                self.miners.append(miner_class(self.terrain))
+        Miner.set_miners(self.miners)
+        self.upgrade_manager.set_miners(self.miners)
+        self.terrain.set_miners(self.miners)
+        if engine == "scheduler":
+            self.terrain.set_miner_scheduler(MinerScheduler())
+        elif engine == "columns":
+            self.terrain.set_miner_engine(MinerEngine())
+
+        self.event_handler = EventHandler(None, self.terrain) # no graphics engine to hand events to
+        for event in self.event_handler.events:
+            self.event_handler.bus.subscribe(event, self.handle_event)
+        self.terrain.set_event_handler(self.event_handler)
+        self.terrain.initialize_terrain()
+
+    def handle_event(self, event):
+        events = self.event_handler.events
+        if event.type == events.TILE_BROKEN:
+            self.terrain.break_terrain_many(event.positions, event.initialization, event.new_grid)
+            self.terrain.check_if_cleared()
+        elif event.type == events.GOLD_GIVEN:
+            self.upgrade_manager.increment_gold(event.amount)
+        elif event.type == events.SCREEN_DARKENING:
+            if not self._clearing: # no fade to wait for
+                self._clearing = True
+                self.event_handler.call_cave_cleared()
+        elif event.type == events.CAVE_CLEARED:
+            self._clearing = False
+            self.caves_cleared += 1
+            self.terrain.initialize_terrain()
+        elif event.type == events.LUCK_UPGRADED:
+            self.upgrade_manager.buy_ore_luck(event.multiplier, event.levels)
+        elif event.type == events.ORE_VALUE_UPGRADED:
+            self.upgrade_manager.buy_ore_value(event.multiplier, event.levels)
+        elif event.type == events.MINER_BOOST_CLICKED:
+            self.upgrade_manager.incre_global_miner_speed_mult()
+
+    def tick(self):
+        from src.game import Miner
+        self.event_handler.bus.dispatch()
+        Miner.handle_passive_abilities()
+        self.terrain.miner_decision_make(self.tick_length)
+        self.ticks += 1
+
+    def run(self, ticks: int = None, caves: int = None, before_tick=None):
+        """
+        Runs until the given number of ticks has passed or caves were cleared, whichever comes
+        first. At least one of them has to be given. before_tick is called before every tick,
+        e.g. to record it.
+        """
+        if ticks is None and caves is None:
+            raise ValueError("run() needs a tick or cave limit")
+        while (ticks is None or self.ticks < ticks) and (caves is None or self.caves_cleared < caves):
+            if before_tick:
+                before_tick()
+            self.tick()
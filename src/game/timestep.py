@@ -0,0 +1,33 @@
+class FixedTimestep:
+    """
+    Accumulates frame time and hands it out as fixed simulation ticks, so mining throughput no
+    longer depends on the frame rate.
+
+    Every frame adds its dt with advance(), which returns how many ticks of tick_length seconds to
+    run. At most max_catch_up ticks are run per frame, the time beyond that is dropped so a long
+    stall does not freeze the game while it catches up. alpha is how far the current frame is
+    between the last tick and the next one, for the renderers to interpolate with.
+    """
+    def __init__(self, tick_rate: int = 60, max_catch_up: int = 5):
+        self.tick_rate = tick_rate
+        self.tick_length = 1 / tick_rate
+        self.max_catch_up = max_catch_up
+        self.accumulator = 0.0
+
+    def set_tick_rate(self, tick_rate: int):
+        self.tick_rate = tick_rate
+        self.tick_length = 1 / tick_rate
+
+    def advance(self, dt: float) -> int:
+        self.accumulator += dt
+        ticks = int(self.accumulator / self.tick_length)
+        if ticks > self.max_catch_up:
+            ticks = self.max_catch_up
+            self.accumulator = 0.0 # too far behind, drop the rest instead of spiralling
+        else:
+            self.accumulator -= ticks * self.tick_length
+        return ticks
+
+    @property
+    def alpha(self) -> float:
+        return min(self.accumulator / self.tick_length, 1.0)
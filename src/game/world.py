@@ -2,8 +2,11 @@
 
 class Terrain:
     def __init__(self):
+        import random
         import src.graphics as gfx
-        from src.game import EventHandler, CaveHelper, Miner
+        from src.game import EventHandler, CaveHelper, Miner, MinerEngine, MinerScheduler, OreGrid, OreSampler, DamageBuffer, DistanceField, Frontier, BigNumber
+
+        self.rng = random # the global random state, a simulation can give the terrain its own (set_rng)
 
         self._cave_surface: gfx.CaveSurface = None
         self._miner_surface: gfx.MinerSurface = None
@@ -11,11 +14,23 @@ class Terrain:
         self._special_gfx_surface: gfx.SpecialEffectSurface = None
         self._event_handler: EventHandler = None
 
-        self.data = []
+        self.grid: OreGrid = None
+        self._spare_grid: OreGrid = None # previous cave's grid, reused to build the next one
+        self._next_cave: tuple[OreGrid, CaveHelper] = None
+        self._next_cave_thread = None
+        self.distance_field: DistanceField = DistanceField() # steps from every floor tile to the nearest wall, shared by all miners
+        self.frontier: Frontier = Frontier() # every wall with floor next to it, for the UI and analytics
+        self.tile_claims: dict[tuple[int, int]: int] = {} # tile -> id of the miner working towards it
+        self._miner_claims: dict[int: tuple[int, int]] = {} # miner id -> claimed tile
+        self._released_claims: list[tuple[int, int]] = [] # released since the miner scheduler last asked (walls_freed)
+        self.damage_buffer: DamageBuffer = DamageBuffer() # hits of the current tick, resolved at its end
 
         self._miners: list[Miner] = None
+        self.miner_engine: MinerEngine = None # optional, drives the miners from flat columns when set
+        self.miner_scheduler: MinerScheduler = None # optional, only wakes the miners that have something to do
 
         self.grid_size = 26
+        self.chunk_prefetch_radius = 2 # tiles around a broken tile whose chunks get generated ahead of time
         self.middle = None
         self.visible_tiles = None
 
@@ -26,36 +41,94 @@ class Terrain:
         self.ore_base_healths = []
         self.create_ore_healths()
         self.ore_base_golds = []
-        self.ore_value_mult = 1
+        self.ore_value_mult = BigNumber(1) # applied to a tile's base gold when it pays out
         self.create_ore_golds()
         self.ores_damaged: dict[tuple[int, int]: tuple[float, float]] = {}
 
         self._ore_chances = {}
+        self._ore_sampler: OreSampler = OreSampler()
         self.ore_luck = 1
         self.modify_chances_with_luck()
 
         from src.game import terrainTypes
         self.terrain_types = terrainTypes
 
-        self.edge_map = {}
         self._cave_helper: CaveHelper = CaveHelper(self)
 
         self._objects = {}
 
 
     def initialize_terrain(self):
-        from src.game import Ore
+        from src.game import OreGrid
         self.visible_tiles = set()
         self.middle = self.grid_size // 2
         self.restart_objects()
         self.tile_amount = self.grid_size * self.grid_size
+        self.distance_field.reset()
+        self.frontier.reset()
+        self.tile_claims, self._miner_claims = {}, {}
+        self._released_claims = []
+        self.damage_buffer.reset()
         stone_health = self.get_ore_health(self.terrain_types.Stone)
         stone_gold = self.get_ore_gold(self.terrain_types.Stone)
-        self.data = [[Ore(self.terrain_types.Stone, stone_health, stone_gold, (x, y), self._event_handler) for x in range(self.grid_size)] for y in range(self.grid_size)]
+        if not self.swap_in_next_cave(stone_health, stone_gold):
+            if self.grid is None or self.grid.size != self.grid_size:
+                self.grid = OreGrid(self.grid_size, self._event_handler)
+            self.grid.set_chunk_generator(self.generate_chunk)
+            self.grid.event_handler = self._event_handler
+            self.grid.fill(self.terrain_types.Stone, stone_health, stone_gold) # reuses the columns between caves
+            self._cave_helper.reset_caves()
+            self._cave_helper.set_grid(self.grid)
         self._event_handler.call_tile_broken([(self.middle, self.middle)])
-        self._cave_helper.generate_caves()
         self.spawn_miners()
 
+    def prepare_next_cave(self):
+        """
+        Starts building the next cave's grid and the caves around its middle on a worker thread,
+        called when the screen starts darkening so initialize_terrain() only has to swap it in.
+        """
+        import threading
+        if self._next_cave_thread is not None:
+            return
+        cave_helper = self._cave_helper.create_next()
+        self._next_cave_thread = threading.Thread(target=self.build_next_cave, args=(cave_helper,), daemon=True)
+        self._next_cave_thread.start()
+
+    def build_next_cave(self, cave_helper):
+        from src.game import OreGrid
+        grid = self._spare_grid
+        if grid is None or grid.size != self.grid_size:
+            grid = OreGrid(self.grid_size, self._event_handler)
+        grid.event_handler = self._event_handler
+        grid.fill(self.terrain_types.Stone, self.get_ore_health(self.terrain_types.Stone), self.get_ore_gold(self.terrain_types.Stone))
+
+        cave_helper.set_grid(grid)
+        grid.set_chunk_generator(cave_helper.generate_chunk_caves)
+
+        # the chunks the first break will touch, further ones are still generated lazily
+        middle, radius = self.grid_size // 2, self.chunk_prefetch_radius
+        grid.ensure_chunks(middle - radius, middle - radius, middle + radius, middle + radius)
+        self._next_cave = (grid, cave_helper)
+
+    def swap_in_next_cave(self, stone_health, stone_gold) -> bool:
+        # returns False when nothing was prepared or it is out of date, the caller builds the cave itself
+        if self._next_cave_thread is None:
+            return False
+        self._next_cave_thread.join() # normally finished long before the fade is
+        self._next_cave_thread = None
+        grid, cave_helper = self._next_cave
+        self._next_cave = None
+        if grid.size != self.grid_size or (grid.fill_health, grid.fill_gold) != (stone_health, stone_gold):
+            self._spare_grid = grid # stone was upgraded during the fade
+            return False
+        self._spare_grid, self.grid = self.grid, grid
+        self._cave_helper = cave_helper
+        return True
+
+    def generate_chunk(self, chunk_x: int, chunk_y: int):
+        # called by the grid the first time a chunk is touched
+        self._cave_helper.generate_chunk_caves(chunk_x, chunk_y)
+
     def clear_ores_damaged(self):
         self.ores_damaged = {}
 
@@ -66,10 +139,66 @@ class Terrain:
     def spawn_miners(self):
         for miner in self._miners:
             miner.spawn_miner()
+        if self.miner_engine:
+            self.miner_engine.load(self._miners)
+        if self.miner_scheduler:
+            self.miner_scheduler.load(self._miners)
+
+    def claim_tile(self, coord: tuple[int, int], miner_id: int) -> bool:
+        # a miner holds at most one claim, returns False if another miner already holds the tile
+        owner = self.tile_claims.get(coord)
+        if owner is not None and owner != miner_id:
+            return False
+        self.release_tile(miner_id)
+        self.tile_claims[coord] = miner_id
+        self._miner_claims[miner_id] = coord
+        return True
+
+    def release_tile(self, miner_id: int):
+        coord = self._miner_claims.pop(miner_id, None)
+        if coord is not None:
+            del self.tile_claims[coord]
+            if self.miner_scheduler:
+                self._released_claims.append(coord)
 
     def miner_decision_make(self, dt):
-        for miner in self._miners:
-            miner.decision_make(dt)
+        # one fixed simulation tick
+        if self.miner_scheduler:
+            self.miner_scheduler.tick(dt, self.walls_freed)
+        elif self.miner_engine:
+            self.miner_engine.step(dt)
+        else:
+            for miner in self._miners:
+                miner.prev_pos = miner.pos
+                miner.decision_make(dt)
+        self.resolve_damage()
+
+    def walls_freed(self) -> bool:
+        # whether a claimed wall was given up since the last call, for the miner scheduler's sleepers,
+        # a miner reclaiming its tile does not count
+        from src.game.ores import IS_WALL, tile_key
+        released, self._released_claims = self._released_claims, []
+        return any(coord not in self.tile_claims and IS_WALL[self.grid.value_at(tile_key(*coord))] for coord in released)
+
+    def damage_tile(self, coord: tuple[int, int], damage: float) -> float:
+        # buffered until the end of the tick, returns the health the tile is left with
+        from src.game.ores import tile_key
+        return self.damage_buffer.add(self.grid, tile_key(*coord), damage)
+
+    def tile_health(self, coord: tuple[int, int]) -> float:
+        # health including the hits buffered this tick
+        from src.game.ores import tile_key
+        return self.damage_buffer.health_at(self.grid, tile_key(*coord))
+
+    def resolve_damage(self):
+        # applies the tick's hits, every tile broken in it goes out in one break and gold event
+        if not self.damage_buffer:
+            return
+        health_percents, broken, gold = self.damage_buffer.resolve(self.grid)
+        for coord, health_percent in health_percents.items():
+            self.ores_damaged[coord] = (health_percent, 2.5) if health_percent is not None else (0, 0.0)
+        if broken:
+            self._event_handler.call_tile_broken(broken, gold_amount=self.ore_gold_value(gold))
 
     def create_object(self, name, pos, on_floor):
         from src.game import GameObject
@@ -78,84 +207,109 @@ class Terrain:
         
 
     def check_surroundings(self, og_coord: tuple[int, int]):
-        x, y = og_coord
+        from src.game.ores import NEIGHBORS8, BORDER, tile_key, key_to_coord
+        grid = self.grid
+        og_key = tile_key(*og_coord)
         changeable_terrain = []
-        coords_to_check: list[tuple[str, tuple[int, int]]] = [("Right", (x + 1, y)), ("Left", (x - 1, y)), ("Down", (x, y + 1)), ("Up", (x, y - 1)), 
-                        ("Top Left", (x - 1, y - 1)), ("Down Left", (x - 1, y + 1)), ("Down Right", (x + 1, y + 1)), ("Top Right", (x + 1, y - 1))]
-
-        adjacent_directions = ["Right", "Left", "Down", "Up"]
-        for direction, coord in coords_to_check:
-            new_x, new_y = coord
-            if (new_x >= 0 and new_x < self.grid_size) and (new_y >= 0 and new_y < self.grid_size): # check if in bounds
-
-                if direction in adjacent_directions:
-                    # edge map construction
-                    self.handle_edge_map(direction, og_coord, (new_x, new_y))
 
+        for offset in NEIGHBORS8:
+            key = og_key + offset
+            value = grid.value_at(key)
+            if value != BORDER: # the sentinel ring is never revealed
+                coord = key_to_coord(key)
                 if coord not in self.visible_tiles:
                     # visible terrain construction
                     self.visible_tiles.add(coord)
-                    if self.data[new_y][new_x].type != self.terrain_types.Floor:
+                    if value: # not floor
                         changeable_terrain.append(coord)
-                else:
-                    continue
 
         return changeable_terrain
     
-    def handle_edge_map(self, direction: str, og_coord: tuple[int, int], new_coord: tuple[int, int]):
-        new_x, new_y = new_coord
-        if self.data[new_y][new_x].type != self.terrain_types.Floor:
-            if og_coord in self.edge_map:
-                self.edge_map[og_coord].add(direction)
-            else:
-                self.edge_map[og_coord] = {direction}
-        else:
-            # if terrain being currently checked is a floor tile, remove its edge reference to the removed block
-            opposite_direction = {"Right": "Left", "Left": "Right", "Up": "Down", "Down": "Up"}[direction]
-            self.edge_map.get(new_coord, set()).discard(opposite_direction)
+    def compute_edge_masks(self, coords):
+        """
+        Computes the edge masks of a batch of freshly broken floor tiles (a single mined tile or a
+        whole revealed cave) in a single pass, and clears the edges neighboring floor tiles had
+        towards the batch. Every tile of the batch must already be floor.
+        """
+        from src.game.ores import EDGE_NEIGHBORS, IS_WALL, tile_key
+        grid = self.grid
+        batch = {tile_key(x, y) for x, y in coords}
+        outside_neighbors = set()
+        for key in batch:
+            mask = 0
+            for offset, edge_bit in EDGE_NEIGHBORS:
+                value = grid.value_at(key + offset)
+                mask |= edge_bit * IS_WALL[value]
+                if value == 0 and key + offset not in batch:
+                    outside_neighbors.add(key + offset)
+            grid.set_edges_at_key(key, mask)
+
+        # floor tiles bordering the batch lose the edges that pointed into it
+        for key in outside_neighbors:
+            mask = grid.edges_at_key(key)
+            for offset, edge_bit in EDGE_NEIGHBORS:
+                if key + offset in batch:
+                    mask &= ~edge_bit
+            grid.set_edges_at_key(key, mask)
+
+    def edge_directions(self, coord: tuple[int, int]) -> tuple[str, ...]:
+        from src.game.ores import EDGE_DIRECTIONS
+        x, y = coord
+        return EDGE_DIRECTIONS[self.grid.edges_at(x, y)]
 
     def create_ores(self, coords: list[tuple[int, int]]):
-        from src.game import Ore
         """
         As ore will be created when theyre revealed, or adjacent to a floor tile and in other terms everything starts
         as stone but gets converted to ore as theyre exposed as the player can upgrade their ore luck mid game, this will
         handle the creation of the ore dependant on the luck
         """
-        for coord in coords:
+        from src.game.ores import TERRAIN_BY_VALUE
+        ore_indexes = self._ore_sampler.sample_many(len(coords)) # one draw for the whole batch
+        for coord, ore_index in zip(coords, ore_indexes):
             x, y = coord
-            ore_type = self.terrain_types(self.choose_ore_type())
+            ore_type = TERRAIN_BY_VALUE[ore_index]
             ore_health = self.get_ore_health(ore_type)
             ore_gold = self.get_ore_gold(ore_type)
-            self.data[y][x] = Ore(ore_type, ore_health, ore_gold, coord, self._event_handler)
+            self.grid.set_tile(x, y, ore_type, ore_health, ore_gold)
+        self.frontier.refresh(self.grid, coords)
 
     def choose_ore_type(self, ) -> int:
-        import random
         """
         Picks an ore index based on weighted chances in self._ore_chances.
         """
-        chances = self._ore_chances
-        total = sum(chances.values())
-
-        rand_val = random.uniform(0, total)
-        cumulative = 0
-
-        for ore_index, weight in chances.items():
-            cumulative += weight
-            if rand_val <= cumulative:
-                return ore_index
-
-        # Fallback: just in case of float rounding edge cases
-        return 1
+        return self._ore_sampler.sample()
 
 
     def update_luck(self):
         self.ore_luck += 1
 
+    def set_rng(self, rng):
+        # random source of everything the terrain and its miners roll
+        self.rng = rng
+        self._ore_sampler.rng = rng
+        self._cave_helper.rng = rng
+
     def set_cave_surface(self, cave_surface):
         self._cave_surface = cave_surface
 
     def set_miners(self, miners):
         self._miners = miners
+        if self.miner_engine:
+            self.miner_engine.load(miners)
+        if self.miner_scheduler:
+            self.miner_scheduler.load(miners)
+
+    def set_miner_engine(self, miner_engine):
+        # replaces polling every miner each tick, a miner scheduler takes precedence
+        self.miner_engine = miner_engine
+        if miner_engine and self._miners is not None:
+            miner_engine.load(self._miners)
+
+    def set_miner_scheduler(self, miner_scheduler):
+        # replaces polling every miner each tick
+        self.miner_scheduler = miner_scheduler
+        if miner_scheduler and self._miners is not None:
+            miner_scheduler.load(self._miners)
 
     def set_miner_surface(self, miner_surface):
         self._miner_surface = miner_surface
@@ -169,25 +323,69 @@ class Terrain:
     def set_special_gfx_surface(self, gfx_surface):
         self._special_gfx_surface = gfx_surface
 
+    # rendering hooks, no-ops when running headless
+    def animate_fire(self, dt, coords):
+        if self._special_gfx_surface:
+            self._special_gfx_surface.animate_fire(dt, coords=coords)
+
+    def animate_electricity(self, dt, coords):
+        if self._special_gfx_surface:
+            self._special_gfx_surface.animate_electricity(dt, coords=coords)
+
     def wipe_terrain_data(self):
-        self.data = []
+        if self._next_cave_thread is not None:
+            self._next_cave_thread.join()
+            self._next_cave_thread, self._next_cave = None, None
+        self.grid = None
+        self._spare_grid = None
 
     def break_terrain(self, coord: tuple[int, int], initialization: bool, imported_grid=None):
-        from src.game import Ore
-        x, y = coord
+        self.break_terrain_many([coord], initialization, imported_grid)
+
+    def break_terrain_many(self, coords: list[tuple[int, int]], initialization: bool, imported_grid=None):
+        """
+        Turns a whole batch of tiles into floor at once (e.g. a revealed cave).
+
+        Every tile is made floor first, so tiles of the batch are never rolled into ores
+        just to be broken right after, then the edge masks of the batch are computed in one
+        pass and the ores revealed around the batch are created with a single draw.
+        """
         if imported_grid:
             grid = imported_grid
         else:
-            grid = self.data
-        if self.tile_amount > 0:
-            if grid[y][x].type != self.terrain_types.Floor:
-                self.tile_amount -= 1
-        grid[y][x] = Ore(self.terrain_types.Floor, 0, 0, (x, y), self._event_handler)
-        self.visible_tiles.add(coord)
-        self._cave_helper.check_if_in_cave((x, y))
+            grid = self.grid
+        if not coords:
+            return
+
+        from src.game.ores import tile_key
+        min_x = min_y = self.grid_size
+        max_x = max_y = 0
+        new_floor = []
+        for coord in coords:
+            x, y = coord
+            if not grid.is_floor(x, y):
+                new_floor.append(tile_key(x, y))
+                if self.tile_amount > 0:
+                    self.tile_amount -= 1
+            grid.set_floor(x, y)
+            self.visible_tiles.add(coord)
+            min_x, min_y, max_x, max_y = min(min_x, x), min(min_y, y), max(max_x, x), max(max_y, y)
+
+        # caves must exist before they can be discovered
+        radius = self.chunk_prefetch_radius
+        grid.ensure_chunks(min_x - radius, min_y - radius, max_x + radius, max_y + radius)
+        for coord in coords:
+            self._cave_helper.check_if_in_cave(coord)
+        self.distance_field.break_tiles(grid, new_floor)
+        self.frontier.break_tiles(grid, new_floor)
+        if self.miner_scheduler and new_floor:
+            self.miner_scheduler.wake_sleeping() # new walls to mine
 
         if not initialization:
-            surroundings_to_be_changed = self.check_surroundings(coord)
+            self.compute_edge_masks(coords)
+            surroundings_to_be_changed = []
+            for coord in coords:
+                surroundings_to_be_changed += self.check_surroundings(coord)
             self.create_ores(surroundings_to_be_changed)
 
 
@@ -233,6 +431,7 @@ class Terrain:
         # Force stone to be the remaining chance
         normalized[1] = round(100 - self._ore_appearance_rate, 2)
         self._ore_chances = normalized
+        self._ore_sampler.rebuild(normalized)
 
     def create_ore_healths(self):
         init_health = 5
@@ -244,7 +443,7 @@ class Terrain:
         self.ore_base_healths = healths
     
     def create_ore_golds(self):
-        init_gold = 1 * self.ore_value_mult
+        init_gold = 1
         change_rate = 2.5
         golds = []
         for i in range(self._ore_amount + 1): # + 1 because of stone
@@ -260,6 +459,10 @@ class Terrain:
         index = type.value - 1
         return self.ore_base_golds[index]
 
+    def ore_gold_value(self, base_gold):
+        # gold paid out for base_gold with the ore value multiplier
+        return round(self.ore_value_mult * base_gold)
+
     def check_if_cleared(self):
         if self.tile_amount == 0:
             self._event_handler.call_darkening_screen()
@@ -8,6 +8,7 @@ SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
 PADDING = 6
 SHADOW_PADDING = 2
+SURFACE_CHUNK_TILES = 8 # cave surfaces are drawn in chunks of this many tiles on a side
 BG_COLOR = (15, 15, 15)
 TILE_SIZE = 80
 BASE_FPS = 60
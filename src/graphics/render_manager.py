@@ -57,6 +57,12 @@ class RenderManager:
         self.offset_x = -(gfx.SCREEN_WIDTH - self.map_width) // 2
         self.offset_y = -(gfx.SCREEN_HEIGHT - self.map_height) // 2
 
+    def prepare_new_cave(self): # renders what the next cave opens with a step per frame while the screen darkens
+        initial_view = pg.Rect(-(gfx.SCREEN_WIDTH - self.map_width) // 2 - gfx.SHADOW_OFFSET[0],
+                               -(gfx.SCREEN_HEIGHT - self.map_height) // 2 - gfx.SHADOW_OFFSET[1],
+                               gfx.SCREEN_WIDTH, gfx.SCREEN_HEIGHT)
+        self._cave_surface.prepare_new(initial_view)
+
     def load_new_cave(self): # for drawing brand new caves
         self._cave_surface.set_objects()
         self._miner_surface.update_miner_amount()
@@ -64,11 +70,15 @@ class RenderManager:
         for surface in self.surfaces:
             surface.load_new()
 
+    def set_interpolation(self, alpha: float):
+        self._miner_surface.set_alpha(alpha)
+
     def check_miner_pos(self):
         miners_changed = False
+        alpha = self._miner_surface.alpha
         for miner in self._terrain._miners:
             id = miner.id
-            if miner.pos != self._miner_surface.miner_positions[id]:
+            if miner.render_pos(alpha) != self._miner_surface.miner_positions[id]:
                 miners_changed = True
                 break
         if miners_changed:
@@ -106,7 +116,7 @@ class RenderManager:
     def select_surfaces(self):
         surfaces = []
         if not self.cave_hidden:
-            surfaces.append((self._cave_surface.static_surface, (0, 0), self._shadow_visible_rect))
+            surfaces.extend(self._cave_surface.visible_blits(self._shadow_visible_rect))
             surfaces.append((self._special_gfx_surface.static_surface, (0, 0), self._visible_rect))
             surfaces.append((self._miner_surface.static_surface, (0, 0), self._visible_rect))
         surfaces.append((self._ui_surface.static_surface, (0, 0)))
@@ -114,23 +124,30 @@ class RenderManager:
 
 
     def break_terrain(self, coord: tuple[int, int]):
-        # updates the broken terrain and its surroundings
+        self.break_terrain_many([coord])
+
+    def break_terrain_many(self, coords: list[tuple[int, int]]):
+        # updates the broken terrain and its surroundings, every affected tile is redrawn exactly once
         self.dirty = True
-        x, y = coord
-        coords_to_check = [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1), 
-                            (x - 1, y - 1), (x - 1, y + 1), (x + 1, y + 1), (x + 1, y -1)]
-        
-        self._cave_surface.update_darkness((x, y), darken=False)
-        self._cave_surface.update_terrain_tile(coord)
-        self._cave_surface.update_object(coord)
-        self._cave_surface.update_tile_edges(coord)
-        for coord in coords_to_check:
-            x, y = coord
-            if (x >= 0 and x < self.grid_size) and (y >= 0 and y < self.grid_size):
-                type = self._terrain.data[y][x].type
-                if type != self._terrain.terrain_types.Floor and coord not in self._cave_surface.ores_damaged:
-                    self._cave_surface.update_darkness((x, y), darken=False)
-                    self._cave_surface.update_terrain_tile(coord)
+        from src.game.ores import NEIGHBORS8, IS_WALL, tile_key, key_to_coord
+        grid = self._terrain.grid
+        floor_tiles = set(coords)
+        wall_keys = set()
+        for coord in coords:
+            key = tile_key(*coord)
+            for offset in NEIGHBORS8:
+                value = grid.value_at(key + offset)
+                if value == 0:
+                    floor_tiles.add(key_to_coord(key + offset)) # its shadows and outlines depend on the broken tiles
+                elif IS_WALL[value]:
+                    wall_keys.add(key + offset)
+        wall_tiles = {key_to_coord(key) for key in wall_keys} - self._cave_surface.ores_damaged
+
+        for coord in wall_tiles:
+            self._cave_surface.update_darkness(coord, darken=False)
+            self._cave_surface.update_terrain_tile(coord)
+        for coord in floor_tiles:
+            self._cave_surface.redraw_floor_tile(coord)
 
     def update_visible_rects(self):
         self._visible_rect.topleft = (self.offset_x, self.offset_y)
@@ -173,9 +190,18 @@ class RenderManager:
 
             self.offset_x = max(self.MIN_OFFSET, min(self.offset_x, self.MAX_OFFSET_X))
             self.offset_y = max(self.MIN_OFFSET, min(self.offset_y, self.MAX_OFFSET_Y))
+            self.generate_visible_chunks()
             
             self.dirty = True
 
+    def generate_visible_chunks(self):
+        # terrain chunks are generated lazily, so let the camera generate the ones it is approaching
+        x1 = int(self.offset_x // gfx.TILE_SIZE) - 1
+        y1 = int(self.offset_y // gfx.TILE_SIZE) - 1
+        x2 = int((self.offset_x + gfx.SCREEN_WIDTH) // gfx.TILE_SIZE) + 1
+        y2 = int((self.offset_y + gfx.SCREEN_HEIGHT) // gfx.TILE_SIZE) + 1
+        self._terrain.grid.ensure_chunks(x1, y1, x2, y2)
+
     def handle_miner_camera(self, keys, dt):
         direction: str = ""
         if keys[pg.K_LEFT]:
@@ -192,6 +218,7 @@ class RenderManager:
             self.offset_x = max(self.MIN_OFFSET, min(pixel_x - gfx.SCREEN_WIDTH // 2, self.MAX_OFFSET_X))
             self.offset_y = max(self.MIN_OFFSET, min(pixel_y - gfx.SCREEN_HEIGHT // 2, self.MAX_OFFSET_Y))
             if self.miner_camera.camera_changed:
+                self.generate_visible_chunks()
                 self.dirty = True
 
     def darken_screen(self, dt):
@@ -204,6 +231,7 @@ class RenderManager:
         fade_surface.set_alpha(int(self.dark_alpha))
         fade_surface.fill((0, 0, 0))
         self._screen.blit(fade_surface, (0, 0))
+        self._cave_surface.prepare_step()
 
         if self.dark_alpha >= 255:
             self.darkening = False
@@ -265,7 +293,7 @@ class RenderManager:
         tile_y = int((mouse_y + self.offset_y) // gfx.TILE_SIZE)
 
         if 0 <= tile_x < self._terrain.grid_size and 0 <= tile_y < self._terrain.grid_size:
-                ore = self._terrain.data[tile_y][tile_x]
+                ore = self._terrain.grid[tile_x, tile_y]
                 if ore.type != self._terrain.terrain_types.Floor and (tile_x, tile_y) in self._terrain.visible_tiles and \
                     self._ui_surface.ore_hover_active:
                         self._ui_surface.update_ore_panel(pos, ore)
@@ -32,6 +32,12 @@ class CaveSurface(GameSurface):
         self.objects: dict[tuple[int, int]: GameObject] = {}
         self.ores_damaged: set[tuple[int, int]] = set()
         self.game_sprites: gfx.GameSprites = None
+        # square chunks of gfx.SURFACE_CHUNK_TILES tiles indexed in the padded tile space, created the
+        # first time they are drawn into or come into view, so memory follows what has been seen
+        self.chunks: dict[tuple[int, int]: pg.Surface] = {}
+        self._prepared_chunks: dict[tuple[int, int]: pg.Surface] = {}
+        self._prepared_size = None
+        self._preparing: list[tuple[int, int]] = [] # chunks of the next cave prepare_step() still has to render
 
     def set_game_sprites(self, game_sprites: gfx.GameSprites):
         self.game_sprites = game_sprites
@@ -39,48 +45,27 @@ class CaveSurface(GameSurface):
     def set_objects(self):
         self.objects = self._terrain._objects
 
-    def update_tile_edges(self, coord: tuple[int, int]):
+    def redraw_floor_tile(self, coord: tuple[int, int]):
+        # clears a floor tile and draws its terrain, object, shadows and outlines again
         x, y = coord
-        directions = []
-        if coord in self._terrain.edge_map:
-            directions = self._terrain.edge_map[coord]
-
-        surrounding_floor, shadow_surf = self.create_shadow_surf(directions, coord)
-        self.static_surface.blit(shadow_surf, ((x + self.padding) * gfx.TILE_SIZE, (y + self.padding) * gfx.TILE_SIZE))
-
-        outl_surf = self.create_outline_surf(directions)
-        self.static_surface.blit(outl_surf, ((x + self.padding) * gfx.TILE_SIZE, (y + self.padding) * gfx.TILE_SIZE))
-
-        direction_coords = {
-            "Up": (x, y - 1), "Down": (x, y + 1),
-            "Right": (x + 1, y), "Left": (x - 1, y),
-            "Up Right": (x + 1, y - 1), "Up Left": (x - 1, y - 1),
-            "Down Right": (x + 1, y + 1), "Down Left": (x - 1, y + 1)
-        }
-        for direction in surrounding_floor: # for all adjacent tiles that are floor
-            neighbor_floor_pos = direction_coords[direction]
-            neigh_x, neigh_y = neighbor_floor_pos
-
-            neighbor_directions = None
-            if neighbor_floor_pos in self._terrain.edge_map:
-                neighbor_directions = self._terrain.edge_map[neighbor_floor_pos]
-
-            self.static_surface.fill((0, 0, 0, 0), ((neigh_x + self.padding) * gfx.TILE_SIZE, (neigh_y + self.padding) * gfx.TILE_SIZE, 
-                                              gfx.TILE_SIZE, gfx.TILE_SIZE)) # clear out neighbor tile as to update the outlines there
-            
-            self.update_terrain_tile(neighbor_floor_pos)
-            self.update_object(neighbor_floor_pos)
-            
-            _, neighbor_surf = self.create_shadow_surf(neighbor_directions, neighbor_floor_pos)
-            self.static_surface.blit(neighbor_surf, ((neigh_x + self.padding) * gfx.TILE_SIZE, (neigh_y + self.padding) * gfx.TILE_SIZE))
-            if neighbor_directions:
-                neighbor_surf = self.create_outline_surf(neighbor_directions)
-                self.static_surface.blit(neighbor_surf, ((neigh_x + self.padding) * gfx.TILE_SIZE, (neigh_y + self.padding) * gfx.TILE_SIZE))
+        directions = self._terrain.edge_directions(coord)
+
+        self.update_darkness(coord, darken=False)
+        self.update_terrain_tile(coord)
+        self.update_object(coord)
+
+        surface, pos = self.tile_target(coord)
+        _, shadow_surf = self.create_shadow_surf(directions, coord)
+        surface.blit(shadow_surf, pos)
+        if directions:
+            outl_surf = self.create_outline_surf(directions)
+            surface.blit(outl_surf, pos)
 
     def update_terrain_tile(self, coord: tuple[int, int]):
         x, y = coord
-        tile = self.game_sprites.get_terrain_tile(self._terrain.data[y][x].type)
-        self.static_surface.blit(tile, ((x + self.padding) * gfx.TILE_SIZE, (y + self.padding) * gfx.TILE_SIZE))
+        tile = self.game_sprites.get_terrain_tile(self._terrain.grid.type_at(x, y))
+        surface, pos = self.tile_target(coord)
+        surface.blit(tile, pos)
 
     def create_outline_surf(self, edge_directions):
             direction_log = {"Up", "Right", "Down", "Left"}
@@ -108,23 +93,12 @@ class CaveSurface(GameSurface):
                 surrounding_floor (list[str]): Directions with adjacent floor tiles.
                 shadow_surface (pg.Surface): Composite shadow surface for this tile.
             """
-            from src.game import terrainTypes
-            x, y = coord
+            from src.game.ores import ADJACENT_OFFSETS, DIAGONAL_OFFSETS, IS_FLOOR, BORDER, tile_key
+            key = tile_key(*coord)
+            grid = self._terrain.grid
 
-            # neighbor positions
-            direction_coords = {"adjacent": {
-                "Up": (x, y - 1), "Down": (x, y + 1),
-                "Right": (x + 1, y), "Left": (x - 1, y)}, "diagonal": {
-                "Up Right": (x + 1, y - 1), "Up Left": (x - 1, y - 1),
-                "Down Right": (x + 1, y + 1), "Down Left": (x - 1, y + 1)}
-            }
-    
-            diagonal_data = {}
-            # Check bounds and collect terrain types from diagonal neighbors
-            for name, corner_coord in direction_coords["diagonal"].items():
-                corner_x, corner_y = corner_coord
-                if 0 <= corner_y < len(self._terrain.data) and 0 <= corner_x < len(self._terrain.data[0]):
-                    diagonal_data[name] = self._terrain.data[corner_y][corner_x]
+            # Collect floor state from diagonal neighbors, the border ring is never floor
+            diagonal_floor = {name: IS_FLOOR[grid.value_at(key + offset)] for name, offset in DIAGONAL_OFFSETS.items()}
 
             direction_log = ["Up", "Right", "Down", "Left"]
             shadow_surface = pg.Surface((gfx.TILE_SIZE, gfx.TILE_SIZE), pg.SRCALPHA).convert_alpha()
@@ -138,16 +112,14 @@ class CaveSurface(GameSurface):
 
             valid_directions = []
             for direction in direction_log:
-                checked_coord = direction_coords["adjacent"][direction]
-                checked_x, checked_y = checked_coord
-                if 0 <= checked_x < len(self._terrain.data[0]) and 0 <= checked_y < len(self._terrain.data):
+                if grid.value_at(key + ADJACENT_OFFSETS[direction]) != BORDER:
                     valid_directions.append(direction)
 
             surrounding_floor = valid_directions  # Remaining directions are floor-adjacent
 
             # Determine valid corner combos for lighting
             corner_combos = [("Up", "Right"), ("Up", "Left"), ("Down", "Right"), ("Down", "Left")]
-            corner_floors = [name for name, ore in diagonal_data.items() if ore.type == terrainTypes.Floor]
+            corner_floors = [name for name, is_floor in diagonal_floor.items() if is_floor]
 
             surrounding_floor += corner_floors  # Merge floor-adjacent cardinal and diagonal
 
@@ -161,44 +133,32 @@ class CaveSurface(GameSurface):
 
             return surrounding_floor, shadow_surface
 
-    def add_surrounding_shadow(self, tile_coord: tuple[int, int], direction: str):
-        shadow_tile = self.game_sprites.get_surrounding_shadow_tile(direction)
-        x, y = tile_coord
-        tile_size = gfx.TILE_SIZE
-
-        # Convert tile coords to pixel coords
-        pixel_x = x * tile_size
-        pixel_y = y * tile_size
-
-        self.static_surface.blit(shadow_tile, (pixel_x, pixel_y))
-
     def update_darkness(self, coord, darken=True):
-        x, y = coord
+        surface, pos = self.tile_target(coord)
         if darken:
-            self.static_surface.blit(self.dark_tile, ((x + self.padding) * gfx.TILE_SIZE, (y + self.padding) * gfx.TILE_SIZE))
+            surface.blit(self.dark_tile, pos)
         else:
-            self.static_surface.fill((0, 0, 0, 0), ((x + self.padding) * gfx.TILE_SIZE, (y + self.padding) * gfx.TILE_SIZE,
-                                                gfx.TILE_SIZE, gfx.TILE_SIZE))
+            surface.fill((0, 0, 0, 0), (pos, (gfx.TILE_SIZE, gfx.TILE_SIZE)))
             
     def update_object(self, coord):
         if coord in self.objects:
-            x, y = coord
             obj = self.objects[coord]
             if obj.on_floor:
                 obj_sprite = self.game_sprites.get_object_tile(obj.name)
-                self.static_surface.blit(obj_sprite, ((x + self.padding) * gfx.TILE_SIZE, (y + self.padding) * gfx.TILE_SIZE))
+                surface, pos = self.tile_target(coord)
+                surface.blit(obj_sprite, pos)
             else:
                 pass
 
     def update_ore_health(self, coord, health_percent, timer):
-        x, y = coord
         transparency = 255
         if timer <= 0.5 and timer > 0:
             transparency = timer * 255
 
         if health_percent > 0 and timer > 0:
             self.ores_damaged.add(coord)
-            pg.draw.rect(self.static_surface, (40, 40, 40, transparency), ((x + self.padding) * gfx.TILE_SIZE, (y + self.padding) * gfx.TILE_SIZE, gfx.TILE_SIZE, 10))
+            surface, pos = self.tile_target(coord)
+            pg.draw.rect(surface, (40, 40, 40, transparency), (pos, (gfx.TILE_SIZE, 10)))
 
             # Fill (e.g., green) — scaled to health percentage
             fill_width = int(gfx.TILE_SIZE * (health_percent / 100))
@@ -208,23 +168,82 @@ class CaveSurface(GameSurface):
                 color = (150, 150, 15)
             else:
                 color = (225, 0, 0)
-            pg.draw.rect(self.static_surface, (*color, transparency), ((x + self.padding) * gfx.TILE_SIZE, (y + self.padding) * gfx.TILE_SIZE, fill_width, 10))
+            pg.draw.rect(surface, (*color, transparency), (pos, (fill_width, 10)))
         elif health_percent <= 0 or timer <= 0:
             self.ores_damaged.discard(coord)
             if health_percent > 0:
                 self.update_terrain_tile((coord))
 
-    def load_new(self):
+    def tile_target(self, coord: tuple[int, int]) -> tuple[pg.Surface, tuple[int, int]]:
+        # the chunk surface a tile is drawn into and the tile's position on it
+        chunk_tiles = gfx.SURFACE_CHUNK_TILES
+        x, y = coord[0] + self.padding, coord[1] + self.padding
+        chunk_x, chunk_y = x // chunk_tiles, y // chunk_tiles
+        return self.get_chunk(chunk_x, chunk_y), ((x - chunk_x * chunk_tiles) * gfx.TILE_SIZE,
+                                                  (y - chunk_y * chunk_tiles) * gfx.TILE_SIZE)
+
+    def get_chunk(self, chunk_x: int, chunk_y: int) -> pg.Surface:
+        chunk = self.chunks.get((chunk_x, chunk_y))
+        if chunk is None:
+            chunk = self.chunks[chunk_x, chunk_y] = self.render_unexplored_chunk(chunk_x, chunk_y)
+        return chunk
+
+    def chunks_in(self, view: pg.Rect) -> list[tuple[int, int]]:
+        # chunks overlapping view, a rect on the padded cave in pixels
+        chunk_pixels = gfx.SURFACE_CHUNK_TILES * gfx.TILE_SIZE
+        last_chunk = ((self._terrain.grid_size + self.padding * 2) * gfx.TILE_SIZE - 1) // chunk_pixels
+        x1, y1 = max(view.left // chunk_pixels, 0), max(view.top // chunk_pixels, 0)
+        x2 = min((view.right - 1) // chunk_pixels, last_chunk)
+        y2 = min((view.bottom - 1) // chunk_pixels, last_chunk)
+        return [(chunk_x, chunk_y) for chunk_y in range(y1, y2 + 1) for chunk_x in range(x1, x2 + 1)]
+
+    def visible_blits(self, view: pg.Rect) -> list[tuple[pg.Surface, tuple[int, int]]]:
+        # blits drawing the part of the cave in view to the screen, chunks coming into view are rendered now
+        chunk_pixels = gfx.SURFACE_CHUNK_TILES * gfx.TILE_SIZE
+        return [(self.get_chunk(chunk_x, chunk_y), (chunk_x * chunk_pixels - view.x, chunk_y * chunk_pixels - view.y))
+                for chunk_x, chunk_y in self.chunks_in(view)]
+
+    def prepare_new(self, view: pg.Rect):
+        # the chunks the next cave opens with are rendered one per frame while the screen darkens,
+        # on the game thread like every other pygame call
+        self._prepared_chunks = {}
+        self._prepared_size = self._terrain.grid_size
+        self._preparing = self.chunks_in(view)
+
+    def prepare_step(self):
+        if self._preparing:
+            chunk_x, chunk_y = self._preparing.pop()
+            self._prepared_chunks[chunk_x, chunk_y] = self.render_unexplored_chunk(chunk_x, chunk_y)
+
+    def render_unexplored_chunk(self, chunk_x: int, chunk_y: int) -> pg.Surface:
+        """
+        Renders a chunk of a cave nobody has explored yet: every tile dark, surrounded by the
+        shadows and the outline of the cave border.
+        """
         grid_size = self._terrain.grid_size
         tile_size = gfx.TILE_SIZE
         padding = self.padding
-
-        padded_size = (grid_size + padding * 2) * tile_size
-        self.create_static_surface(padded_size)
-
-        # Shift the surface origin so (0,0) is at top-left of padded area
-        self.origin_offset = (-padding * tile_size, -padding * tile_size)
-
+        chunk_pixels = gfx.SURFACE_CHUNK_TILES * tile_size
+        left, top = chunk_x * chunk_pixels, chunk_y * chunk_pixels
+
+        surface = pg.Surface((chunk_pixels, chunk_pixels), pg.SRCALPHA).convert_alpha()
+        chunk_rect = pg.Rect(left, top, chunk_pixels, chunk_pixels)
+        for direction, (x, y) in self.unexplored_shadows(grid_size, padding):
+            shadow_tile = self.game_sprites.get_surrounding_shadow_tile(direction)
+            if chunk_rect.colliderect(shadow_tile.get_rect(topleft=(x * tile_size, y * tile_size))):
+                surface.blit(shadow_tile, (x * tile_size - left, y * tile_size - top))
+
+        # every tile starts dark, one fill instead of a dark_tile blit per tile
+        grid_rect = pg.Rect(padding * tile_size, padding * tile_size, grid_size * tile_size, grid_size * tile_size)
+        surface.fill(self.dark_tile.get_at((0, 0)), grid_rect.move(-left, -top))
+
+        pg.draw.rect(surface, (175, 220, 240), grid_rect.inflate(4, 4).move(-left, -top), 2)
+        return surface
+
+    @staticmethod
+    def unexplored_shadows(grid_size: int, padding: int) -> list[tuple[str, tuple[int, int]]]:
+        # the shadow tiles around the cave border as (direction, tile position on the padded cave)
+        shadows = []
         for y in range(-padding, grid_size + padding, 2):
             for x in range(-padding, grid_size + padding, 2):
                 direction = None
@@ -247,26 +266,17 @@ class CaveSurface(GameSurface):
 
                 if direction:
                     # Shift tile coords to match padded surface origin
-                    draw_x = x + padding
-                    draw_y = y + padding
-                    self.add_surrounding_shadow((draw_x, draw_y), direction)
-
-        for y in range(self._terrain.grid_size):
-            for x in range(self._terrain.grid_size):
-                if (x, y) not in self._terrain.visible_tiles:
-                    self.update_darkness((x, y))
-                else:
-                    self.update_terrain_tile((x, y))
-
-        pg.draw.rect(self.static_surface, (175, 220, 240), (
-            -2 + (self.padding * gfx.TILE_SIZE),
-            -2 + (self.padding * gfx.TILE_SIZE),
-            (self._terrain.grid_size * gfx.TILE_SIZE) + 4,
-            (self._terrain.grid_size * gfx.TILE_SIZE) + 4
-        ), 2)
-
-    def create_static_surface(self, size):
-        self.static_surface = pg.Surface((size, size), pg.SRCALPHA).convert_alpha()
+                    shadows.append((direction, (x + padding, y + padding)))
+        return shadows
+
+    def load_new(self):
+        # usually rendered by prepare_new() while the screen was darkening, the rest come into view later
+        chunks, self._prepared_chunks, self._preparing = self._prepared_chunks, {}, []
+        self.chunks = chunks if self._prepared_size == self._terrain.grid_size else {}
+
+        for coord in self._terrain.visible_tiles:
+            self.update_darkness(coord, darken=False)
+            self.update_terrain_tile(coord)
 
 class MinerSurface(GameSurface):
     def __init__(self):
@@ -275,6 +285,10 @@ class MinerSurface(GameSurface):
         self.sprites = {}
         self.miners: list[Miner] = None
         self.miner_positions: dict[int: tuple[float, float]] = {}
+        self.alpha = 1.0 # how far the frame is between the last two simulation ticks
+
+    def set_alpha(self, alpha: float):
+        self.alpha = alpha
 
     def update_miner_amount(self):
         self.miners = self._terrain._miners
@@ -296,8 +310,7 @@ class MinerSurface(GameSurface):
     
     def update_pos(self):
         for miner in self.miners:
-            id, pos = miner.id, miner.pos
-            self.miner_positions[id] = pos
+            self.miner_positions[miner.id] = miner.render_pos(self.alpha)
 
     
     def update_static(self):
@@ -314,14 +327,14 @@ class MinerSurface(GameSurface):
         for miner in self.miners:
             sprite = self.get_sprite(miner.miner_type)
 
-            x, y = miner.pos
+            x, y = miner.render_pos(self.alpha)
             self.static_surface.blit(sprite, (x * gfx.TILE_SIZE, y * gfx.TILE_SIZE))
 
 
     def load_new(self):
         self.create_static_surface()
         for miner in self.miners:
-            self.miner_positions[miner.id] = miner.pos
+            self.miner_positions[miner.id] = miner.render_pos(self.alpha)
 
         self.update_static()
 
@@ -330,6 +343,7 @@ class UISurface(GameSurface):
         super().__init__()
         self.buttons = {}
         self.text = {}
+        self._rendered_text = {} # name -> arguments the text was last rendered with
         self.text_fonts = gfx.TextHandler()
         self.update_cd = 0.05
         self.cd_time = 0
@@ -422,12 +436,28 @@ class UISurface(GameSurface):
                            text_color=(255, 255, 255), height=50, width=250, x=gfx.SCREEN_WIDTH / 2, 
                            y=gfx.SCREEN_HEIGHT - 100, background_color=(10, 10, 10), rounded=True)
         
-        gold_amount = self.upgrades_manager.gold
-        self.text["Gold Amount"] = self.create_text(name="Gold Amount", text=f"Gold: {gold_amount}", 
-                                                    pos=(gfx.SCREEN_WIDTH - 200, 15), font="ubuntu", size=24,
-                                                    color=(200, 255, 200))
+        self.update_gold()
         
         self._terrain._event_handler.set_buttons(self.buttons)
+
+    def update_gold(self):
+        """
+        Redraws the gold amount and the upgrade price labels, which depend on it. A label shows
+        the price of the next level and how many levels a right click would buy, in red when
+        not even one level is affordable.
+        """
+        manager = self.upgrades_manager
+        self.update_text("Gold Amount", f"Gold: {manager.gold}", pos=(gfx.SCREEN_WIDTH - 200, 15))
+        upgrades = (("Ore Luck Upgrade", manager.ore_luck_cost, manager.ore_luck_level),
+                    ("Ore Value Upgrade", manager.ore_value_cost, manager.ore_value_level))
+        for name, upgrade_cost, level in upgrades:
+            button = self.buttons.get(name)
+            if button is None: # not on the cave UI
+                continue
+            affordable = upgrade_cost.max_affordable(level, manager.gold)
+            color = (200, 255, 200) if affordable else (255, 110, 110)
+            self.update_text(f"{name} Cost", f"{upgrade_cost.cost(level)} gold (max {affordable})",
+                             pos=(button.pos[0], button.pos[1] - 24), size=18, color=color)
         
     def load_miner_UI(self):
         self.ore_hover_active = False
@@ -477,11 +507,18 @@ class UISurface(GameSurface):
             self.update_text("FPS", f"fps {self.FPS}", pos=(0, 0), size=40)
 
     def update_text(self, name, new_text, pos=None, size=24, color=(200, 255, 200), button=False):
+        # gold arrives every frame but its abbreviated text changes far less often, same text is not rendered again
+        if not button and name in self.text and self._rendered_text.get(name) == (new_text, pos, size, color):
+            return
+        self._rendered_text[name] = (new_text, pos, size, color)
         if not pos:
             try:
                 _, pos = self.text[name]
             except KeyError:
                 pass
+        if not button and name in self.text: # the new text can be shorter than the old one
+            old_text, old_pos = self.text[name]
+            self.static_surface.fill((0, 0, 0, 0), pg.Rect(old_pos, old_text.get_size()))
 
         self.text[name] = self.create_text(name=name, text=new_text, pos=pos, font="ubuntu", size=size,
                                            color=color, button=button)
@@ -618,6 +655,7 @@ class OrePanel():
         self.ore_value = None
         self.ore_luck = None
         self.ore_health = None
+        self.ore_exposed = None
         self.panel_surface = pg.Surface((150, 165))
         self.panel_color = (0, 0, 0)
         self.panel_text = {}
@@ -632,7 +670,8 @@ class OrePanel():
         except KeyError:
             self.ore_luck = f"Chance: 0/100"
         self.ore_health = f"Health: {ore.health:.0f}/{ore.max_health:.0f}"
-        self.ore_value = f"Value: {ore.gold}"
+        self.ore_value = f"Value: {self._terrain.ore_gold_value(ore.gold)}"
+        self.ore_exposed = "Minable now" if ore.pos in self._terrain.frontier else "Buried"
         self.update_panel()
 
     def update_text(self, y_pos, text, font="ubuntu", size=20, color=(255, 255, 255)):
@@ -655,6 +694,7 @@ class OrePanel():
         self.update_text(30, self.ore_luck, size=16)
         self.update_text(50, self.ore_health, size=16)
         self.update_text(70, self.ore_value, size=16)
+        self.update_text(90, self.ore_exposed, size=16)
 
 class SpecialEffectSurface(GameSurface):
 
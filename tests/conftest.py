@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the game modules import pygame, nothing here opens a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
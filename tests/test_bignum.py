@@ -0,0 +1,78 @@
+import math
+
+import pytest
+
+from src.game.bignum import BigNumber
+
+
+def test_small_values_are_exact():
+    assert BigNumber(123456789012345).as_tuple() == (123456789012345.0, 0)
+    assert BigNumber(7) + 5 == 12
+    assert int(BigNumber(2 ** 40) * 3) == 3 * 2 ** 40
+
+
+def test_large_values_keep_fifteen_digits():
+    big = BigNumber(10 ** 400)
+    assert big.exponent == 386
+    assert big.log10() == pytest.approx(400)
+    assert big + 1 == big
+    assert big * 2 > big
+    assert int(BigNumber(12345678901234567890)) == 12345678901234500000
+
+
+def test_arithmetic_crosses_the_exact_limit():
+    value = BigNumber(9e14) + BigNumber(9e14)
+    assert value.exponent > 0
+    assert float(value) == pytest.approx(1.8e15)
+    assert float(value - BigNumber(9e14)) == pytest.approx(9e14)
+    assert float(BigNumber(1, 20) / BigNumber(1, 18)) == pytest.approx(100)
+
+
+def test_comparisons_order_by_sign_exponent_and_mantissa():
+    values = [BigNumber(-1, 30), BigNumber(-5), BigNumber(0), BigNumber(3), BigNumber(1e15), BigNumber(1, 30)]
+    assert sorted(reversed(values)) == values
+    assert BigNumber(5) == 5 and BigNumber(5) < 5.5 and BigNumber(1, 20) > 10 ** 19
+
+
+def test_hash_matches_int_and_float():
+    assert hash(BigNumber(5)) == hash(5)
+    assert hash(BigNumber(2.5)) == hash(2.5)
+    assert len({BigNumber(5), 5}) == 1
+
+
+def test_pow_beyond_float_range():
+    assert BigNumber(1, 400) ** 0.5 == BigNumber(1, 200)
+    assert (BigNumber(1.5) ** 2000).log10() == pytest.approx(2000 * math.log10(1.5))
+    assert float(BigNumber(1.6) ** 3) == 1.6 ** 3
+
+
+def test_float_overflows_to_inf():
+    assert float(BigNumber(1, 400)) == math.inf
+    assert float(-BigNumber(1, 400)) == -math.inf
+
+
+def test_format_specs_past_float_range():
+    assert format(BigNumber(1.5, 400), ".3e") == "1.500e+400"
+    text = format(BigNumber(1, 400), ".2f")
+    assert text == "1" + "0" * 400 + ".00"
+    assert format(BigNumber(5), ".1f") == "5.0"
+
+
+@pytest.mark.parametrize("value, text", [
+    (0, "0"),
+    (7, "7"),
+    (653, "653"),
+    (999.6, "999"),
+    (1000, "1K"),
+    (1234, "1.23K"),
+    (1239, "1.23K"),
+    (12345, "12.3K"),
+    (123456, "123K"),
+    (999999, "999K"),
+    (4.5e15, "4.5Qa"),
+    (1.23e45, "1.23e45"),
+    (-5300, "-5.3K"),
+])
+def test_abbreviated_text_truncates(value, text):
+    assert str(BigNumber(value)) == text
+    assert f"{BigNumber(value)}" == text
@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from src.game import Terrain, terrainTypes
+from src.game.caves import CaveHelper
+from src.game.ores import OreGrid, tile_key
+
+
+def make_helper(seed: int, size: int = 40) -> CaveHelper:
+    terrain = Terrain()
+    terrain.set_rng(random.Random(seed))
+    helper = terrain._cave_helper
+    helper.grid_size = size
+    helper.set_grid(OreGrid(size))
+    return helper
+
+
+def reference_cave(rng, grid_size, x_start, y_start, width, height, wall_probability):
+    # generate_cave before the bitmask rewrite, line for line, with the random source passed in
+    terrain_types = terrainTypes
+
+    # Clamp cave bounds within grid limits
+    x_end, y_end = min(x_start + width, grid_size), min(y_start + height, grid_size)
+
+    # Step 1: Randomize initial grid with walls and floors based on wall_probability
+    cave_init = [
+        [
+            terrain_types.Stone if rng.random() < wall_probability else terrain_types.Floor
+            for _ in range(width)
+        ]
+        for _ in range(height)
+    ]
+
+    # Initialize new grid for processed cave layout and store floor coordinates
+    new_grid = [[terrain_types.Floor for _ in range(width)] for _ in range(height)]
+    coords_broken = []
+
+    # Step 2: Apply cellular automata smoothing (1st pass)
+    for y in range(y_start, y_end):
+        for x in range(x_start, x_end):
+            local_y = y - y_start
+            local_x = x - x_start
+
+            # Count surrounding wall tiles (8 neighbors)
+            wall_count = sum(
+                cave_init[local_y][local_x].value
+                for dy in [-1, 0, 1]
+                for dx in [-1, 0, 1]
+                if not (dy == 0 and dx == 0)
+                if 0 <= local_y + dy < height and 0 <= local_x + dx < width
+            )
+
+            # Determine transformation threshold based on current tile type
+            threshold = 4 if cave_init[local_y][local_x] == terrain_types.Stone else 5
+
+            # Transform tile based on neighborhood density
+            if wall_count >= threshold:
+                new_grid[local_y][local_x] = terrain_types.Stone
+            else:
+                coords_broken.append((x, y))  # Mark as a valid walkable tile
+
+    # Step 3: Refine walkable areas (2nd pass) — remove isolated floors
+    for y in range(y_start, y_end):
+        for x in range(x_start, x_end):
+            local_y = y - y_start
+            local_x = x - x_start
+
+            # Count adjacent floor tiles in cardinal directions (N/S/E/W)
+            floor_count = sum(
+                1
+                for dy, dx in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                if 0 <= local_y + dy < height and 0 <= local_x + dx < width
+                and new_grid[local_y + dy][local_x + dx] == terrain_types.Floor
+            )
+
+            # Remove orphaned floor tiles with few floor neighbors
+            if new_grid[local_y][local_x] == terrain_types.Floor and floor_count < 2:
+                new_grid[local_y][local_x] = terrain_types.Stone
+                coords_broken.remove((x, y))
+
+    return coords_broken, new_grid
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("width, height", [(10, 10), (15, 15), (7, 3), (1, 6), (12, 1)])
+def test_generate_cave_matches_reference(seed, width, height):
+    helper = make_helper(seed)
+    helper.cave_amount = 1
+    helper.generate_cave(4, 6, width, height)
+    cave = helper.caves[1]
+
+    floor, grid = reference_cave(random.Random(seed), helper.grid_size, 4, 6, width, height, helper.wall_probability)
+    assert cave.floor == floor
+    assert cave.cave_grid == grid
+    assert cave.rect == [(4, 6), (4 + width - 1, 6 + height - 1)]
+
+
+def test_generate_cave_labels_floor():
+    helper = make_helper(1)
+    helper.cave_amount = 3
+    helper.generate_cave(2, 2, 10, 10)
+    for x, y in helper.caves[3].floor:
+        assert helper.grid.cave_id_at(tile_key(x, y)) == 3
+
+
+
+def placed_caves(terrain) -> int:
+    terrain.grid.ensure_chunks(0, 0, terrain.grid_size - 1, terrain.grid_size - 1)
+    return len(terrain._cave_helper.caves)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_default_terrain_gets_a_cave(seed):
+    from src.game.simulation import HeadlessSimulation
+    simulation = HeadlessSimulation(seed=seed, fire_miners=0, lightning_miners=0, light_miners=0)
+    assert placed_caves(simulation.terrain) >= 1
+
+
+@pytest.mark.parametrize("cave_size, grid_size", [("Huge", 40), ("Huge", 60), ("Giant", 50), ("Giant", 60)])
+def test_bigger_caves_are_placed(cave_size, grid_size):
+    from src.game.caves import CaveSizes
+    from src.game.simulation import HeadlessSimulation
+    simulation = HeadlessSimulation(seed=1, grid_size=grid_size, fire_miners=0, lightning_miners=0, light_miners=0)
+    terrain = simulation.terrain
+    terrain._cave_helper.cave_size = CaveSizes[cave_size]
+    terrain.initialize_terrain()
+    assert placed_caves(terrain) >= 1
+    for cave in terrain._cave_helper.caves.values():
+        (x1, y1), (x2, y2) = cave.rect
+        assert (x2 - x1 + 1, y2 - y1 + 1) == (CaveSizes[cave_size].value,) * 2
+        assert 0 <= x1 and x2 < grid_size and 0 <= y1 and y2 < grid_size
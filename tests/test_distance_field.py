@@ -0,0 +1,135 @@
+import random
+from collections import deque
+
+import pytest
+
+from src.game.ores import BORDER, IS_WALL, NEIGHBORS4, key_to_coord, tile_key
+from src.game.pathing import DistanceField
+
+
+class FloorGrid:
+    # stone everywhere inside size x size except the floor keys, the border ring outside
+    def __init__(self, size: int):
+        self.size = size
+        self.floor: set[int] = set()
+
+    def value_at(self, key: int) -> int:
+        if key in self.floor:
+            return 0
+        x, y = key_to_coord(key)
+        return 1 if 0 <= x < self.size and 0 <= y < self.size else BORDER
+
+    def walls_next_to_floor(self) -> list[int]:
+        return sorted({key + offset for key in self.floor for offset in NEIGHBORS4 if IS_WALL[self.value_at(key + offset)]})
+
+
+def recount(grid: FloorGrid) -> dict[int, int]:
+    # plain breadth first search from the floor next to a wall
+    distances = {}
+    queue = deque()
+    for key in grid.floor:
+        if any(IS_WALL[grid.value_at(key + offset)] for offset in NEIGHBORS4):
+            distances[key] = 1
+            queue.append(key)
+    while queue:
+        key = queue.popleft()
+        for offset in NEIGHBORS4:
+            neighbor = key + offset
+            if neighbor in grid.floor and neighbor not in distances:
+                distances[neighbor] = distances[key] + 1
+                queue.append(neighbor)
+    return distances
+
+
+def break_tiles(field: DistanceField, grid: FloorGrid, keys: list[int]):
+    grid.floor.update(keys)
+    field.break_tiles(grid, keys)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_incremental_matches_recount(seed):
+    rng = random.Random(seed)
+    grid, field = FloorGrid(24), DistanceField()
+    break_tiles(field, grid, [tile_key(12, 12)])
+    assert field.distances == recount(grid)
+
+    for _ in range(150):
+        walls = grid.walls_next_to_floor()
+        if not walls:
+            break
+        # sometimes a single mined tile, sometimes a revealed patch
+        break_tiles(field, grid, rng.sample(walls, min(len(walls), rng.choice((1, 1, 3, 8)))))
+        assert field.distances == recount(grid)
+
+
+def test_walled_in_floor_has_no_distance():
+    grid, field = FloorGrid(3), DistanceField()
+    break_tiles(field, grid, [tile_key(x, y) for y in range(3) for x in range(3)])
+    assert field.distances == {}
+    assert field.distance_at(tile_key(1, 1)) is None
+    assert field.path_to_wall(grid, tile_key(1, 1)) is None
+
+
+def check_path(grid, field, start, path, wall):
+    steps = [start] + [tile_key(*coord) for coord in path]
+    for a, b in zip(steps, steps[1:]):
+        assert b - a in NEIGHBORS4 and b in grid.floor
+    assert tile_key(*wall) - steps[-1] in NEIGHBORS4
+    assert IS_WALL[grid.value_at(tile_key(*wall))]
+    assert len(path) + 1 == field.distance_at(start) # a shortest route
+
+
+def test_path_to_wall_is_shortest():
+    rng = random.Random(4)
+    grid, field = FloorGrid(20), DistanceField()
+    break_tiles(field, grid, [tile_key(x, y) for y in range(4, 15) for x in range(5, 16)])
+    for _ in range(10):
+        break_tiles(field, grid, rng.sample(grid.walls_next_to_floor(), 3))
+
+    for start in grid.floor:
+        path, wall = field.path_to_wall(grid, start)
+        check_path(grid, field, start, path, wall)
+
+
+def test_path_to_wall_skips_claimed_walls():
+    grid, field = FloorGrid(9), DistanceField()
+    break_tiles(field, grid, [tile_key(x, y) for y in range(2, 7) for x in range(2, 7)]) # a 5x5 room
+    start = tile_key(4, 4)
+    assert field.distance_at(start) == 3
+
+    # the walls above and to the left of the room are claimed, the route goes down or right
+    claimed = {(x, 1) for x in range(2, 7)} | {(1, y) for y in range(2, 7)}
+    path, wall = field.path_to_wall(grid, start, skip=claimed)
+    check_path(grid, field, start, path, wall)
+    assert wall not in claimed
+
+    every_wall = {key_to_coord(key) for key in grid.walls_next_to_floor()}
+    assert field.path_to_wall(grid, start, skip=every_wall) is None
+
+
+def test_every_adjacent_wall_claimed():
+    grid, field = FloorGrid(9), DistanceField()
+    break_tiles(field, grid, [tile_key(x, 4) for x in range(1, 8)]) # a corridor, walls above and below
+    start = tile_key(4, 4)
+
+    # every wall along the corridor is claimed, only the two ends are left
+    claimed = {(x, y) for x in range(1, 8) for y in (3, 5)}
+    path, wall = field.path_to_wall(grid, start, skip=claimed)
+    assert wall in {(0, 4), (8, 4)}
+    assert path in ([(3, 4), (2, 4), (1, 4)], [(5, 4), (6, 4), (7, 4)])
+
+
+def test_nearest_walls_skipped_farther_wall_found():
+    grid, field = FloorGrid(9), DistanceField()
+    break_tiles(field, grid, [tile_key(x, y) for y in range(2, 7) for x in range(2, 7)]) # a 5x5 room
+    start = tile_key(4, 4)
+
+    # the four walls the gradient leads to are claimed, the corners of the room are one step further
+    nearest = {(4, 1), (1, 4), (7, 4), (4, 7)}
+    path, wall = field.path_to_wall(grid, start, skip=nearest)
+    steps = [start] + [tile_key(*coord) for coord in path]
+    for a, b in zip(steps, steps[1:]):
+        assert b - a in NEIGHBORS4 and b in grid.floor
+    assert tile_key(*wall) - steps[-1] in NEIGHBORS4
+    assert wall not in nearest and IS_WALL[grid.value_at(tile_key(*wall))]
+    assert len(path) == field.distance_at(start) # one step longer than the shortest route
@@ -0,0 +1,56 @@
+import pytest
+
+from src.game.ores import EDGE_NEIGHBORS, IS_FLOOR, IS_WALL, tile_key
+from src.game.simulation import HeadlessSimulation
+
+
+def expected_mask(grid, key):
+    return sum(edge_bit for offset, edge_bit in EDGE_NEIGHBORS if IS_WALL[grid.value_at(key + offset)])
+
+
+def check_floor_edges(terrain):
+    grid = terrain.grid
+    floor = 0
+    for y in range(terrain.grid_size):
+        for x in range(terrain.grid_size):
+            key = tile_key(x, y)
+            if IS_FLOOR[grid.value_at(key)]:
+                floor += 1
+                assert grid.edges_at_key(key) == expected_mask(grid, key), (x, y)
+    return floor
+
+
+def test_single_break_and_neighbors():
+    simulation = HeadlessSimulation(seed=1, fire_miners=0, lightning_miners=0, light_miners=0)
+    terrain = simulation.terrain
+    middle = terrain.middle
+    for coord in [(middle + 1, middle), (middle + 2, middle), (middle + 1, middle + 1)]:
+        terrain.break_terrain(coord, initialization=False)
+        check_floor_edges(terrain)
+
+
+def test_batch_matches_one_by_one():
+    batch = [(3, 3), (4, 3), (5, 3), (4, 4), (4, 5), (8, 8)]
+    together = HeadlessSimulation(seed=2, fire_miners=0, lightning_miners=0, light_miners=0).terrain
+    apart = HeadlessSimulation(seed=2, fire_miners=0, lightning_miners=0, light_miners=0).terrain
+    together.break_terrain_many(batch, initialization=False)
+    for coord in batch:
+        apart.break_terrain(coord, initialization=False)
+    for x, y in batch + [(2, 3), (6, 3), (4, 6), (8, 9)]:
+        key = tile_key(x, y)
+        assert IS_FLOOR[together.grid.value_at(key)] == IS_FLOOR[apart.grid.value_at(key)]
+        if IS_FLOOR[together.grid.value_at(key)]:
+            assert together.grid.edges_at_key(key) == apart.grid.edges_at_key(key) == expected_mask(together.grid, key)
+
+
+@pytest.mark.parametrize("seed", [3, 4])
+def test_masks_stay_right_while_mining(seed):
+    simulation = HeadlessSimulation(seed=seed)
+    checked = []
+
+    def before_tick():
+        if simulation.ticks % 150 == 0:
+            checked.append(check_floor_edges(simulation.terrain))
+
+    simulation.run(ticks=1500, before_tick=before_tick)
+    assert checked[-1] > checked[0] # the miners did break tiles
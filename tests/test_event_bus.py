@@ -0,0 +1,106 @@
+from src.game.events import EventBus, EventStats, GameEvents
+
+
+def recording_bus():
+    bus = EventBus()
+    received = []
+    for event in GameEvents:
+        bus.subscribe(event, received.append)
+    return bus, received
+
+
+def tile_broken(bus, positions, new_grid=None, initialization=False, gold=0):
+    bus.publish(GameEvents.TILE_BROKEN, {"positions": positions, "new_grid": new_grid, "initialization": initialization})
+    bus.publish(GameEvents.GOLD_GIVEN, {"amount": gold})
+
+
+def test_breaks_and_gold_coalesce_until_dispatch():
+    bus, received = recording_bus()
+    tile_broken(bus, [(1, 1)], gold=5)
+    tile_broken(bus, [(2, 1), (3, 1)], gold=7)
+    tile_broken(bus, [(4, 1)], gold=1)
+    assert received == []
+
+    bus.dispatch()
+    assert [event.type for event in received] == [GameEvents.TILE_BROKEN, GameEvents.GOLD_GIVEN]
+    assert received[0].positions == [(1, 1), (2, 1), (3, 1), (4, 1)]
+    assert received[1].amount == 13
+
+
+def test_other_events_split_the_batches():
+    bus, received = recording_bus()
+    tile_broken(bus, [(1, 1)], gold=2)
+    bus.publish(GameEvents.LUCK_UPGRADED, {"multiplier": 1.25, "levels": 1})
+    tile_broken(bus, [(2, 2)], gold=3)
+    bus.dispatch()
+
+    assert [event.type for event in received] == [GameEvents.TILE_BROKEN, GameEvents.GOLD_GIVEN, GameEvents.LUCK_UPGRADED,
+                                                  GameEvents.TILE_BROKEN, GameEvents.GOLD_GIVEN]
+    assert [received[0].positions, received[3].positions] == [[(1, 1)], [(2, 2)]]
+    assert [received[1].amount, received[4].amount] == [2, 3]
+
+
+def test_different_kinds_of_breaks_stay_apart():
+    bus, received = recording_bus()
+    grid = object()
+    bus.publish(GameEvents.TILE_BROKEN, {"positions": [(1, 1)], "new_grid": None, "initialization": True})
+    bus.publish(GameEvents.TILE_BROKEN, {"positions": [(2, 2)], "new_grid": None, "initialization": False})
+    bus.publish(GameEvents.TILE_BROKEN, {"positions": [(3, 3)], "new_grid": grid, "initialization": False})
+    bus.publish(GameEvents.TILE_BROKEN, {"positions": [(4, 4)], "new_grid": grid, "initialization": False})
+    bus.dispatch()
+
+    assert [event.positions for event in received] == [[(1, 1)], [(2, 2)], [(3, 3), (4, 4)]]
+    assert [event.initialization for event in received] == [True, False, False]
+
+
+def test_publisher_positions_are_not_extended():
+    bus, received = recording_bus()
+    first = [(1, 1)]
+    tile_broken(bus, first)
+    tile_broken(bus, [(2, 2)])
+    bus.dispatch()
+    assert first == [(1, 1)]
+    assert received[0].positions == [(1, 1), (2, 2)]
+
+
+def test_events_published_while_dispatching_wait():
+    bus = EventBus()
+    received = []
+
+    def on_cave_cleared(event):
+        received.append(event.type)
+        bus.publish(GameEvents.SCREEN_LIGHTENING)
+
+    bus.subscribe(GameEvents.CAVE_CLEARED, on_cave_cleared)
+    bus.subscribe(GameEvents.SCREEN_LIGHTENING, lambda event: received.append(event.type))
+    bus.publish(GameEvents.CAVE_CLEARED)
+    bus.dispatch()
+    assert received == [GameEvents.CAVE_CLEARED]
+    bus.dispatch()
+    assert received == [GameEvents.CAVE_CLEARED, GameEvents.SCREEN_LIGHTENING]
+
+
+def test_dispatch_starts_a_new_batch():
+    bus, received = recording_bus()
+    tile_broken(bus, [(1, 1)], gold=1)
+    bus.dispatch()
+    tile_broken(bus, [(2, 2)], gold=1)
+    bus.dispatch()
+    assert [event.positions for event in received if event.type == GameEvents.TILE_BROKEN] == [[(1, 1)], [(2, 2)]]
+
+
+def test_stats_count_before_and_after_coalescing():
+    bus, received = recording_bus()
+    stats = EventStats()
+    bus.set_stats(stats)
+    for x in range(10):
+        tile_broken(bus, [(x, 0)], gold=1)
+    bus.dispatch()
+
+    summary = stats.summary()
+    assert summary["dispatches"] == 1
+    assert summary["events"]["TILE_BROKEN"]["published"] == 10
+    assert summary["events"]["TILE_BROKEN"]["dispatched"] == 1
+    assert summary["events"]["GOLD_GIVEN"]["dispatched"] == 1
+    assert summary["queue_depth"]["max_published"] == 20
+    assert summary["queue_depth"]["max"] == 2
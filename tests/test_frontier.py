@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from src.game.ores import CHUNK_MASK, CHUNK_SHIFT, IS_FLOOR, IS_WALL, KEY_SHIFT, NEIGHBORS4, key_to_coord, tile_key
+from src.game.simulation import HeadlessSimulation
+
+
+def rescan(terrain) -> dict[int, float]:
+    # every wall with floor next to it and its gold per health, read straight from the grid
+    grid = terrain.grid
+    frontier = {}
+    for y in range(terrain.grid_size):
+        for x in range(terrain.grid_size):
+            key = tile_key(x, y)
+            if IS_WALL[grid.value_at(key)] and any(IS_FLOOR[grid.value_at(key + offset)] for offset in NEIGHBORS4):
+                chunk = grid.chunk_for(key)
+                index = (((key >> KEY_SHIFT) & CHUNK_MASK) << CHUNK_SHIFT) | (key & CHUNK_MASK)
+                max_health = chunk.max_health[index]
+                frontier[key] = chunk.gold[index] / max_health if max_health > 0 else 0
+    return frontier
+
+
+def squared_distance(key, coord):
+    x, y = key_to_coord(key)
+    return (x - coord[0]) ** 2 + (y - coord[1]) ** 2
+
+
+def brute_nearest(frontier, coord, skip):
+    candidates = [key for key in frontier if key_to_coord(key) not in skip]
+    if not candidates:
+        return None
+    return key_to_coord(min(candidates, key=lambda key: (squared_distance(key, coord), key)))
+
+
+def brute_most_valuable(frontier, coord, radius, skip):
+    candidates = [key for key in frontier
+                  if key_to_coord(key) not in skip and squared_distance(key, coord) <= radius * radius]
+    if not candidates:
+        return None
+    return key_to_coord(min(candidates, key=lambda key: (-frontier[key], key)))
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_frontier_matches_rescan_while_mining(seed):
+    simulation = HeadlessSimulation(seed=seed)
+    terrain = simulation.terrain
+    sizes = []
+
+    def before_tick():
+        if simulation.ticks % 100 == 0:
+            expected = rescan(terrain)
+            assert terrain.frontier.keys == set(expected)
+            assert terrain.frontier.values == expected
+            sizes.append(len(terrain.frontier))
+
+    simulation.run(ticks=2000, before_tick=before_tick)
+    assert max(sizes) > 4 # the cave grew past the first tile
+
+
+@pytest.mark.parametrize("seed", [3, 4])
+def test_queries_match_brute_force(seed):
+    simulation = HeadlessSimulation(seed=seed)
+    simulation.run(ticks=1500)
+    terrain = simulation.terrain
+    frontier = rescan(terrain)
+    rng = random.Random(seed)
+    size = terrain.grid_size
+
+    for _ in range(200):
+        coord = (rng.randrange(-3, size + 3), rng.randrange(-3, size + 3))
+        skip = set(rng.sample(sorted(key_to_coord(key) for key in frontier), min(len(frontier), rng.randrange(0, 10))))
+        radius = rng.randrange(0, 12)
+        assert terrain.frontier.nearest(coord, skip) == brute_nearest(frontier, coord, skip)
+        assert terrain.frontier.most_valuable(coord, radius, skip) == brute_most_valuable(frontier, coord, radius, skip)
+
+
+def test_empty_frontier():
+    simulation = HeadlessSimulation(seed=1, fire_miners=0, lightning_miners=0, light_miners=0)
+    frontier = simulation.terrain.frontier
+    frontier.reset()
+    assert len(frontier) == 0
+    assert frontier.nearest((5, 5)) is None
+    assert frontier.most_valuable((5, 5), 10) is None
+
+
+def test_ore_rolls_refresh_values():
+    simulation = HeadlessSimulation(seed=5, fire_miners=0, lightning_miners=0, light_miners=0)
+    terrain = simulation.terrain
+    simulation.tick() # the middle tile breaks
+    middle = terrain.middle
+    terrain.break_terrain((middle + 1, middle), initialization=False)
+    assert terrain.frontier.values == rescan(terrain)
+    assert (middle + 2, middle) in terrain.frontier and (middle + 1, middle) not in terrain.frontier
@@ -0,0 +1,43 @@
+import pytest
+
+from src.game import Miner
+from src.game.simulation import HeadlessSimulation
+
+
+def snapshots(seed, engine, ticks=2400, grid_size=None):
+    # miner rows and gold every 20 ticks, with a few speed boosts and upgrades on the way
+    simulation = HeadlessSimulation(seed=seed, grid_size=grid_size, engine=engine)
+    recorded = []
+
+    def before_tick():
+        if simulation.ticks in (300, 310, 320):
+            simulation.upgrade_manager.incre_global_miner_speed_mult()
+        if simulation.ticks == 900:
+            simulation.upgrade_manager.upgrade_miner_speed(0, 4)
+        if simulation.ticks % 20 == 0:
+            recorded.append((simulation.ticks, int(simulation.upgrade_manager.gold), simulation.caves_cleared,
+                             [(miner.pos, miner.prev_pos, miner._state, miner._target) for miner in simulation.miners]))
+
+    try:
+        simulation.run(ticks=ticks, before_tick=before_tick)
+    finally:
+        Miner.global_miner_speed_boost = 1
+    return recorded
+
+
+@pytest.mark.parametrize("seed", [1, 6])
+def test_columns_match_polling(seed):
+    polled = snapshots(seed, "polling")
+    columns = snapshots(seed, "columns")
+    assert polled[-1][1] > 0 and polled[-1][2] > 0 # the miners did earn gold and clear caves
+    for expected, actual in zip(polled, columns):
+        assert actual == expected, f"tick {expected[0]}"
+
+
+def test_columns_match_polling_in_a_bigger_cave():
+    assert snapshots(2, "columns", ticks=1200, grid_size=48) == snapshots(2, "polling", ticks=1200, grid_size=48)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        HeadlessSimulation(seed=1, engine="threads")
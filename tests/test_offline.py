@@ -0,0 +1,65 @@
+import pytest
+
+from src.game import BigNumber, Miner, OfflineProgressEstimator
+from src.game.simulation import HeadlessSimulation
+
+SECONDS = 120
+
+
+def upgrade(simulation, luck_levels, value_levels, damage_mult):
+    terrain = simulation.terrain
+    terrain.ore_luck = 1.25 ** luck_levels
+    terrain.modify_chances_with_luck()
+    terrain.ore_value_mult = BigNumber(1.5) ** value_levels
+    for miner in simulation.miners:
+        miner.damage = miner.original_damage = miner.original_damage * damage_mult
+
+
+@pytest.mark.parametrize("seed, luck_levels, value_levels, damage_mult", [(1, 0, 0, 1), (2, 4, 3, 2)])
+def test_estimate_matches_a_real_run(seed, luck_levels, value_levels, damage_mult):
+    game = HeadlessSimulation(seed=seed)
+    upgrade(game, luck_levels, value_levels, damage_mult)
+    estimator = OfflineProgressEstimator(game.terrain, game.miners)
+    estimator.calibrate(caves=8, seed=seed + 100) # enough caves to even out the rare ores
+    estimator.cave_transition_time = 0 # a headless run replaces a cleared cave at once
+    progress = estimator.estimate(SECONDS)
+
+    real = HeadlessSimulation(seed=seed + 200)
+    upgrade(real, luck_levels, value_levels, damage_mult)
+    real.run(ticks=round(SECONDS / real.tick_length))
+
+    gold = float(real.upgrade_manager.gold)
+    assert gold > 0
+    assert abs(float(progress["gold"]) / gold - 1) < 0.1
+    assert abs(progress["caves"] - real.caves_cleared) <= 1
+    assert abs(progress["tiles"] / (real.caves_cleared * real.terrain.grid_size ** 2) - 1) < 0.15
+
+
+def test_calibrate_leaves_the_game_alone():
+    game = HeadlessSimulation(seed=3)
+    Miner.global_miner_speed_boost = 1.5
+    try:
+        miners, ticks, gold = Miner.miners, game.ticks, game.upgrade_manager.gold
+        estimator = OfflineProgressEstimator(game.terrain, game.miners)
+        estimator.calibrate(caves=1, seed=4)
+        assert Miner.miners is miners and Miner.global_miner_speed_boost == 1.5
+        assert (game.ticks, game.upgrade_manager.gold) == (ticks, gold)
+    finally:
+        Miner.global_miner_speed_boost = 1
+
+
+def test_apply_credits_gold_once():
+    game = HeadlessSimulation(seed=5)
+    game.run(ticks=300)
+    estimator = OfflineProgressEstimator(game.terrain, game.miners)
+    estimator.calibrate(caves=1, seed=6)
+    expected = round(estimator.estimate(SECONDS)["gold"])
+    assert expected > 0
+
+    game.event_handler.bus.dispatch() # pay out the last tick's mining first
+    before = game.upgrade_manager.gold
+    progress = estimator.apply(game.upgrade_manager, SECONDS)
+    assert round(progress["gold"]) == expected
+    assert game.upgrade_manager.gold == before + expected
+    game.event_handler.bus.dispatch() # nothing is left queued to pay out a second time
+    assert game.upgrade_manager.gold == before + expected
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from src.game.ores import OreSampler
+
+
+def seeded_sampler(chances, seed=0):
+    sampler = OreSampler(chances)
+    sampler.rng = random.Random(seed)
+    return sampler
+
+
+@pytest.mark.parametrize("chances", [None, {}, {2: 0, 3: 0}])
+def test_without_weight_everything_is_stone(chances):
+    sampler = seeded_sampler(chances)
+    assert sampler.sample() == 1
+    assert sampler.sample_many(5) == [1] * 5
+
+
+@pytest.mark.parametrize("draw", ["sample", "sample_many"])
+def test_draws_follow_the_weights(draw):
+    chances = {1: 0.5, 2: 0.3, 3: 0.2, 4: 0.0}
+    sampler = seeded_sampler(chances, seed=7)
+    amount = 20000
+    if draw == "sample":
+        indexes = [sampler.sample() for _ in range(amount)]
+    else:
+        indexes = sampler.sample_many(amount)
+
+    assert len(indexes) == amount
+    assert 4 not in indexes
+    for index, chance in chances.items():
+        assert abs(indexes.count(index) / amount - chance) < 0.015
+
+
+def test_weights_need_not_sum_to_one():
+    sampler = seeded_sampler({5: 3, 6: 1}, seed=3)
+    indexes = sampler.sample_many(8000)
+    assert abs(indexes.count(5) / 8000 - 0.75) < 0.02
+
+
+def test_rebuild_replaces_the_table():
+    sampler = seeded_sampler({1: 1.0})
+    sampler.rebuild({7: 1.0})
+    assert sampler.sample() == 7
+    assert set(sampler.sample_many(50)) == {7}
+
+
+def test_same_seed_same_draws():
+    chances = {1: 0.6, 2: 0.25, 3: 0.15}
+    first, second = seeded_sampler(chances, seed=11), seeded_sampler(chances, seed=11)
+    assert [first.sample() for _ in range(100)] == [second.sample() for _ in range(100)]
+    assert first.sample_many(100) == second.sample_many(100)
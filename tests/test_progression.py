@@ -0,0 +1,51 @@
+import math
+import random
+
+import pytest
+
+from src.game.bignum import BigNumber
+from src.game.progression import UpgradeCost
+
+
+def level_by_level(upgrade_cost, level, amount):
+    return sum(upgrade_cost.base * upgrade_cost.growth ** (level + i) for i in range(amount))
+
+
+@pytest.mark.parametrize("level, amount", [(0, 1), (0, 5), (3, 1), (10, 7), (40, 20)])
+def test_cost_is_the_sum_of_the_levels(level, amount):
+    upgrade_cost = UpgradeCost(base=50, growth=1.35)
+    total = level_by_level(upgrade_cost, level, amount)
+    # rounded up to whole gold
+    assert total * (1 - 1e-12) <= float(upgrade_cost.cost(level, amount)) < total * (1 + 1e-12) + 1
+
+
+def test_cost_of_nothing_is_zero():
+    assert UpgradeCost(base=100, growth=1.6).cost(5, 0) == 0
+
+
+@pytest.mark.parametrize("base, growth", [(50, 1.35), (100, 1.6), (1, 1.01)])
+def test_max_affordable_is_the_largest_amount_paid_for(base, growth):
+    upgrade_cost = UpgradeCost(base=base, growth=growth)
+    rng = random.Random(1)
+    for _ in range(500):
+        level = rng.randrange(0, 200)
+        gold = BigNumber.from_log10(rng.uniform(0, 60))
+        amount = upgrade_cost.max_affordable(level, gold)
+        assert upgrade_cost.cost(level, amount) <= gold
+        assert upgrade_cost.cost(level, amount + 1) > gold
+
+
+def test_max_affordable_exact_budgets():
+    upgrade_cost = UpgradeCost(base=100, growth=1.6)
+    for amount in range(1, 30):
+        price = upgrade_cost.cost(4, amount)
+        assert upgrade_cost.max_affordable(4, price) == amount
+        assert upgrade_cost.max_affordable(4, price - 1) == amount - 1
+
+
+def test_prices_past_the_float_range():
+    upgrade_cost = UpgradeCost(base=100, growth=1.6)
+    price = upgrade_cost.cost(3000, 1)
+    assert price.log10() == pytest.approx(2 + 3000 * math.log10(1.6))
+    assert upgrade_cost.max_affordable(3000, price * 10) >= 1
+    assert upgrade_cost.max_affordable(3000, price / 2) == 0
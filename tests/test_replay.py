@@ -0,0 +1,27 @@
+import sys
+
+import headless
+
+
+def run_headless(monkeypatch, capsys, *args) -> str:
+    monkeypatch.setattr(sys, "argv", ["headless.py", *args])
+    headless.main()
+    return capsys.readouterr().out
+
+
+def test_recorded_run_replays_identically(tmp_path, monkeypatch, capsys):
+    trace = str(tmp_path / "run.trace")
+    recorded = run_headless(monkeypatch, capsys, "--seed", "4", "--caves", "1", "--miners", "1", "--record", trace)
+    replayed = run_headless(monkeypatch, capsys, "--miners", "1", "--replay", trace)
+
+    assert "replay matched the recording" in replayed
+    gold = [line for line in recorded.splitlines() if line.startswith("gold:")]
+    assert gold and gold[0] in replayed.splitlines()
+
+
+def test_replay_notices_a_different_run(tmp_path, monkeypatch, capsys):
+    trace = str(tmp_path / "run.trace")
+    run_headless(monkeypatch, capsys, "--seed", "4", "--caves", "1", "--miners", "1", "--record", trace)
+    replayed = run_headless(monkeypatch, capsys, "--miners", "2", "--replay", trace)
+
+    assert "diverged from the recording" in replayed
@@ -0,0 +1,12 @@
+import pytest
+
+from test_miner_engine import snapshots
+
+
+@pytest.mark.parametrize("seed", [3, 4, 5])
+def test_scheduler_matches_polling(seed):
+    polled = snapshots(seed, "polling")
+    scheduled = snapshots(seed, "scheduler")
+    assert polled[-1][2] > 0 # cooldowns carried into a new cave
+    for expected, actual in zip(polled, scheduled):
+        assert actual == expected, f"tick {expected[0]}"